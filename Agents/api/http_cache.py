@@ -0,0 +1,83 @@
+"""Conditional and compressed responses for the REST API."""
+import gzip
+import hashlib
+import json
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is used when missing
+    brotli = None
+
+# Responses smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_ENCODINGS = ("br", "gzip")
+
+
+def make_etag(*parts) -> str:
+    """Build an entity tag from the values a response depends on."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def not_modified(etag: str) -> Response | None:
+    """Answer ``If-None-Match`` before any work is done for the request.
+    
+    Compressed representations carry the tag with an encoding suffix; any of
+    them matching means the client's copy is current.
+    
+    Args:
+        etag: Tag of the current data, as built by make_etag
+        
+    Returns:
+        A 304 response if the client's copy is current, else None
+    """
+    for tag in (etag, *(f"{etag}-{encoding}" for encoding in _ENCODINGS)):
+        if request.if_none_match.contains(tag):
+            response = Response(status=304)
+            response.set_etag(tag)
+            response.headers["Cache-Control"] = "no-cache"
+            response.vary.add("Accept-Encoding")
+            return response
+    return None
+
+
+def _negotiate_encoding() -> str | None:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(response: Response) -> Response:
+    """Compress a JSON response with brotli or gzip when the client accepts it.
+    
+    Meant as an ``after_request`` hook. A strong ETag on the response gets
+    the encoding as a suffix, as the compressed bytes differ.
+    """
+    if (response.status_code != 200 or response.direct_passthrough
+            or "Content-Encoding" in response.headers or response.mimetype != "application/json"):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return response
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+    
+    if encoding == "br":
+        response.set_data(brotli.compress(body, quality=BROTLI_QUALITY))
+    else:
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
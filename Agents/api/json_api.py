@@ -1,31 +1,53 @@
 """JSON API interface for the Farcaster monitoring agent."""
 import json
 import sys
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
-from datetime import datetime
+from typing import Dict, List, Any, Callable, IO, Iterable
+from datetime import datetime, timedelta
 
 # Add parent directory to path to allow imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from core.components import get_database, get_llm_scheduler, get_profiler, get_token_ledger
+from core.deadline import deadline_scope
+from core.llm_scheduler import Priority, llm_priority
+from core.settings import get_read_cache_size
 from monitor import FarcasterMonitor
-from database.violations_db import ViolationsDatabase
 
 
 class MonitoringAPI:
     """API interface for JSON-based communication with frontend."""
     
     def __init__(self):
-        """Initialize the API."""
+        """Initialize the API.
+        
+        Cheap to construct: the LLM client, Neynar connector and database are
+        shared process-wide and only created when an action needs them.
+        """
         self.monitor = FarcasterMonitor()
-        self.database = ViolationsDatabase()
+        # Changes to the shared rule engine are made one request at a time;
+        # scans run concurrently so interactive requests do not queue behind
+        # long ones (LLM requests are arbitrated by the LLM scheduler)
+        self._monitor_lock = threading.Lock()
+        # Read responses by request key, with the write generation they were built at
+        self._read_cache: OrderedDict[tuple, tuple[int, Dict[str, Any]]] = OrderedDict()
+        self._read_cache_size = get_read_cache_size()
+        self._read_cache_lock = threading.Lock()
+    
+    @property
+    def database(self):
+        """Violations database (shared with the monitor)."""
+        return get_database()
     
     def process_request(self, request_json: Dict[str, Any]) -> Dict[str, Any]:
         """Process a JSON request from the frontend.
         
         Expected request format:
         {
-            "action": "monitor" | "get_violations" | "get_all_violations",
+            "action": "monitor" | "rescan" | "get_violations" | "get_all_violations" | "get_summary" | "search_violations" | "llm_stats" | "token_usage",
             "users": [
                 {
                     "user_id": "1398613",
@@ -38,9 +60,14 @@ class MonitoringAPI:
                     ]
                 }
             ],
-            "days": 7  # optional, defaults to 7
+            "days": 7,  # optional, defaults to 7
+            "timeout_s": 60  # optional, monitor and rescan only
         }
         
+        Monitor and re-scan requests stop when ``timeout_s`` (or an enclosing
+        deadline) runs out and answer with ``"partial": true`` and the users
+        and casts left unevaluated.
+        
         Args:
             request_json: Dictionary containing the request
             
@@ -49,20 +76,8 @@ class MonitoringAPI:
         """
         try:
             action = request_json.get("action", "monitor")
-            
-            if action == "monitor":
-                return self._handle_monitor_request(request_json)
-            elif action == "get_violations":
-                return self._handle_get_violations_request(request_json)
-            elif action == "get_all_violations":
-                return self._handle_get_all_violations_request()
-            elif action == "configure_users":
-                return self._handle_configure_users_request(request_json)
-            else:
-                return {
-                    "success": False,
-                    "error": f"Unknown action: {action}"
-                }
+            with get_profiler().profile(f"api-{action}"):
+                return self._dispatch(action, request_json)
         except Exception as e:
             return {
                 "success": False,
@@ -70,6 +85,33 @@ class MonitoringAPI:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def _dispatch(self, action: str, request_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the handler of an action."""
+        if action == "monitor":
+            return self._handle_monitor_request(request_json)
+        elif action == "rescan":
+            return self._handle_rescan_request(request_json)
+        elif action == "get_violations":
+            return self._handle_get_violations_request(request_json)
+        elif action == "get_all_violations":
+            return self._handle_get_all_violations_request()
+        elif action == "get_summary":
+            return self._handle_get_summary_request(request_json)
+        elif action == "search_violations":
+            return self._handle_search_violations_request(request_json)
+        elif action == "configure_users":
+            with self._monitor_lock:
+                return self._handle_configure_users_request(request_json)
+        elif action == "llm_stats":
+            return self._handle_llm_stats_request()
+        elif action == "token_usage":
+            return self._handle_token_usage_request(request_json)
+        else:
+            return {
+                "success": False,
+                "error": f"Unknown action: {action}"
+            }
+    
     def _handle_monitor_request(self, request_json: Dict[str, Any]) -> Dict[str, Any]:
         """Handle a monitoring request.
         
@@ -81,35 +123,88 @@ class MonitoringAPI:
         """
         users = request_json.get("users", [])
         days = request_json.get("days", 7)
+        timeout_s = _timeout_s(request_json)
         
         # Configure users with their rules
-        for user_config in users:
-            user_id = user_config.get("user_id")
-            if not user_id:
-                continue
-            
-            forbidden_words = user_config.get("forbidden_words", [])
-            llm_rules = user_config.get("llm_rules", [])
-            
-            self.monitor.add_user_with_rules(
-                user_id=str(user_id),
-                forbidden_words=forbidden_words,
-                llm_rules=llm_rules
-            )
+        self._configure_users(users)
         
         # Monitor all configured users
-        results = self.monitor.monitor_all_users(days=days)
+        unevaluated: Dict[str, List[str]] = {}
+        with deadline_scope(timeout_s):
+            results = self.monitor.monitor_all_users(days=days, unevaluated=unevaluated)
+        return self._scan_response("monitor", results, unevaluated)
+    
+    def _handle_rescan_request(self, request_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a re-scan request: run rules over stored casts without fetching.
+        
+        Args:
+            request_json: The request dictionary. ``users`` (optional) updates
+                rules and limits the re-scan to those users; ``days``
+                (optional) limits it to recent casts.
+            
+        Returns:
+            Response with re-scan results, shaped like a monitoring response
+        """
+        days = request_json.get("days")
+        timeout_s = _timeout_s(request_json)
+        user_ids = self._configure_users(request_json.get("users", []))
         
+        unevaluated: Dict[str, List[str]] = {}
+        with deadline_scope(timeout_s):
+            if user_ids:
+                results = {}
+                for user_id in user_ids:
+                    results[user_id] = self.monitor.rescan_user(user_id, days=days, unevaluated=unevaluated)
+            else:
+                results = self.monitor.rescan_all_users(days=days, unevaluated=unevaluated)
+        return self._scan_response("rescan", results, unevaluated)
+    
+    def _configure_users(self, users: List[Dict[str, Any]]) -> List[str]:
+        """Add or update the rules of the given users on the monitor.
+        
+        Returns:
+            IDs of the configured users
+        """
+        user_ids = []
+        with self._monitor_lock:
+            for user_config in users:
+                user_id = user_config.get("user_id")
+                if not user_id:
+                    continue
+                
+                forbidden_words = user_config.get("forbidden_words", [])
+                llm_rules = user_config.get("llm_rules", [])
+                local_rules = user_config.get("local_rules", [])
+                
+                self.monitor.add_user_with_rules(
+                    user_id=str(user_id),
+                    forbidden_words=forbidden_words,
+                    llm_rules=llm_rules,
+                    local_rules=local_rules
+                )
+                user_ids.append(str(user_id))
+        return user_ids
+    
+    def _scan_response(self, action: str, results: Dict[str, int],
+                       unevaluated: Dict[str, List[str]] | None = None) -> Dict[str, Any]:
+        """Build the response of a monitor or re-scan run.
+        
+        Args:
+            action: The action that ran
+            results: New violations per user
+            unevaluated: Users the deadline cut short, with their unchecked cast IDs
+        """
         # Get all violations for these users
         all_violations = []
         for user_id in results.keys():
             user_violations = self.database.get_violations_by_author(user_id)
             all_violations.extend(user_violations)
         
-        return {
+        response = {
             "success": True,
-            "action": "monitor",
+            "action": action,
             "timestamp": datetime.now().isoformat(),
+            "partial": bool(unevaluated),
             "summary": {
                 "total_users_monitored": len(results),
                 "total_new_violations": sum(results.values()),
@@ -117,6 +212,45 @@ class MonitoringAPI:
             },
             "violations": all_violations
         }
+        if unevaluated:
+            response["unevaluated"] = {
+                "users": list(unevaluated),
+                "casts": {user_id: post_ids for user_id, post_ids in unevaluated.items() if post_ids},
+                "total_casts": sum(len(post_ids) for post_ids in unevaluated.values())
+            }
+        return response
+    
+    def _cached_read(self, key: tuple, build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Serve a read response from memory while violations are unchanged.
+        
+        Entries are tagged with the database write generation they were built
+        at, so any insert or retention makes them stale. The least recently
+        used entries are dropped beyond READ_CACHE_SIZE.
+        
+        Args:
+            key: Identifies the request
+            build: Builds the response on a miss
+            
+        Returns:
+            The response, with a current timestamp
+        """
+        if not self._read_cache_size:
+            return build()
+        # Read before building: a write during the build leaves the entry stale
+        generation = self.database.get_write_generation()
+        with self._read_cache_lock:
+            entry = self._read_cache.get(key)
+            if entry is not None and entry[0] == generation:
+                self._read_cache.move_to_end(key)
+                return dict(entry[1], timestamp=datetime.now().isoformat())
+        
+        response = build()
+        with self._read_cache_lock:
+            self._read_cache[key] = (generation, response)
+            self._read_cache.move_to_end(key)
+            while len(self._read_cache) > self._read_cache_size:
+                self._read_cache.popitem(last=False)
+        return dict(response)
     
     def _handle_get_violations_request(self, request_json: Dict[str, Any]) -> Dict[str, Any]:
         """Handle a request to get violations for specific users.
@@ -127,8 +261,12 @@ class MonitoringAPI:
         Returns:
             Response with violations data
         """
-        user_ids = request_json.get("user_ids", [])
-        
+        user_ids = [str(user_id) for user_id in request_json.get("user_ids", [])]
+        return self._cached_read(("get_violations", tuple(user_ids)),
+                                 lambda: self._build_violations_response(user_ids))
+    
+    def _build_violations_response(self, user_ids: List[str]) -> Dict[str, Any]:
+        """Query the violations of specific users."""
         violations_by_user = {}
         for user_id in user_ids:
             violations = self.database.get_violations_by_author(str(user_id))
@@ -153,6 +291,10 @@ class MonitoringAPI:
         Returns:
             Response with all violations data
         """
+        return self._cached_read(("get_all_violations",), self._build_all_violations_response)
+    
+    def _build_all_violations_response(self) -> Dict[str, Any]:
+        """Query all violations, grouped by user."""
         all_violations = self.database.get_all_violations()
         
         # Group by user
@@ -173,6 +315,114 @@ class MonitoringAPI:
             "total_users": len(violations_by_user)
         }
     
+    def _handle_get_summary_request(self, request_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a request for violation counts per user, rule and day.
+        
+        Counts come from the daily rollups plus the retained raw rows, so they
+        cover violations already removed by retention.
+        
+        Args:
+            request_json: The request dictionary (optional "user_ids" and "days")
+            
+        Returns:
+            Response with violation counts
+        """
+        user_ids = request_json.get("user_ids")
+        days = request_json.get("days")
+        since_day = None
+        if days:
+            since_day = (datetime.now() - timedelta(days=int(days))).strftime("%Y-%m-%d")
+        
+        counts = self.database.get_violation_counts(
+            author_ids=[str(uid) for uid in user_ids] if user_ids else None,
+            since_day=since_day
+        )
+        
+        counts_by_user = {}
+        for row in counts:
+            user_counts = counts_by_user.setdefault(row["author_id"], {"total": 0, "by_rule": {}, "by_day": {}})
+            user_counts["total"] += row["count"]
+            user_counts["by_rule"][row["rule_violated"]] = user_counts["by_rule"].get(row["rule_violated"], 0) + row["count"]
+            user_counts["by_day"][row["day"]] = user_counts["by_day"].get(row["day"], 0) + row["count"]
+        
+        return {
+            "success": True,
+            "action": "get_summary",
+            "timestamp": datetime.now().isoformat(),
+            "counts_by_user": counts_by_user,
+            "total_violations": sum(c["total"] for c in counts_by_user.values()),
+            "total_users": len(counts_by_user)
+        }
+    
+    def _handle_search_violations_request(self, request_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a keyword search over violation snippets and rule names.
+        
+        Args:
+            request_json: The request dictionary ("query", optional "user_ids",
+                "limit" (max 100) and "offset")
+            
+        Returns:
+            Response with one page of ranked violations
+        """
+        query = str(request_json.get("query") or "").strip()
+        if not query:
+            return {
+                "success": False,
+                "error": "Missing search query"
+            }
+        user_ids = request_json.get("user_ids")
+        limit = max(1, min(int(request_json.get("limit") or 20), 100))
+        offset = max(0, int(request_json.get("offset") or 0))
+        
+        result = self.database.search_violations(
+            query,
+            author_ids=[str(uid) for uid in user_ids] if user_ids else None,
+            limit=limit,
+            offset=offset
+        )
+        
+        return {
+            "success": True,
+            "action": "search_violations",
+            "timestamp": datetime.now().isoformat(),
+            "query": query,
+            "violations": result["violations"],
+            "total_matches": result["total"],
+            "limit": limit,
+            "offset": offset
+        }
+    
+    def _handle_llm_stats_request(self) -> Dict[str, Any]:
+        """Handle a request for LLM scheduler queue depths and wait times.
+        
+        Returns:
+            Response with the scheduler stats
+        """
+        return {
+            "success": True,
+            "action": "llm_stats",
+            "timestamp": datetime.now().isoformat(),
+            "stats": get_llm_scheduler().get_stats()
+        }
+    
+    def _handle_token_usage_request(self, request_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a request for LLM token usage per rule, model and user.
+        
+        Args:
+            request_json: The request dictionary; optional "user_ids" limits
+                the counts to calls made for those users
+            
+        Returns:
+            Response with the usage totals since the process started
+        """
+        user_ids = request_json.get("user_ids")
+        return {
+            "success": True,
+            "action": "token_usage",
+            "timestamp": datetime.now().isoformat(),
+            "usage": get_token_ledger().get_stats(user_ids=user_ids or None)
+        }
+    
     def _handle_configure_users_request(self, request_json: Dict[str, Any]) -> Dict[str, Any]:
         """Handle a request to configure users without monitoring.
         
@@ -192,17 +442,20 @@ class MonitoringAPI:
             
             forbidden_words = user_config.get("forbidden_words", [])
             llm_rules = user_config.get("llm_rules", [])
+            local_rules = user_config.get("local_rules", [])
             
             self.monitor.add_user_with_rules(
                 user_id=str(user_id),
                 forbidden_words=forbidden_words,
-                llm_rules=llm_rules
+                llm_rules=llm_rules,
+                local_rules=local_rules
             )
             
             configured_users.append({
                 "user_id": str(user_id),
                 "forbidden_words_count": len(forbidden_words),
-                "llm_rules_count": len(llm_rules)
+                "llm_rules_count": len(llm_rules),
+                "local_rules_count": len(local_rules)
             })
         
         return {
@@ -214,6 +467,24 @@ class MonitoringAPI:
         }
 
 
+def _timeout_s(request_json: Dict[str, Any]) -> float | None:
+    """Read the optional ``timeout_s`` of a scan request.
+    
+    Raises:
+        ValueError: If it is not a positive number
+    """
+    timeout_s = request_json.get("timeout_s")
+    if timeout_s is None:
+        return None
+    try:
+        timeout_s = float(timeout_s)
+    except (TypeError, ValueError):
+        raise ValueError(f"timeout_s must be a number, got {timeout_s!r}") from None
+    if timeout_s <= 0:
+        raise ValueError("timeout_s must be positive")
+    return timeout_s
+
+
 def process_json_file(input_file: str, output_file: str = None) -> Dict[str, Any]:
     """Process a JSON file and optionally write results to another file.
     
@@ -255,3 +526,68 @@ def process_json_string(json_string: str) -> str:
     request_data = json.loads(json_string)
     response = api.process_request(request_data)
     return json.dumps(response, indent=2, ensure_ascii=False)
+
+
+def process_json_lines(lines: Iterable[str], output: IO[str], concurrency: int = 1,
+                       api: MonitoringAPI | None = None) -> int:
+    """Process newline-delimited JSON requests through one warm API instance.
+    
+    One compact JSON response is written per input line, in input order, as
+    soon as it and all earlier responses are done. Blank lines are skipped;
+    malformed lines produce an error response instead of stopping the batch.
+    
+    Args:
+        lines: Iterable of JSON request lines (e.g. an open file or stdin)
+        output: Stream the JSON response lines are written to
+        concurrency: Number of requests processed in parallel
+        api: API instance to use. If None, a new one is created.
+        
+    Returns:
+        Number of requests that did not succeed
+    """
+    api = api or MonitoringAPI()
+    
+    def handle(line: str) -> Dict[str, Any]:
+        try:
+            request_data = json.loads(line)
+        except json.JSONDecodeError as e:
+            return {
+                "success": False,
+                "error": f"Invalid JSON: {e}",
+                "timestamp": datetime.now().isoformat()
+            }
+        if not isinstance(request_data, dict):
+            return {
+                "success": False,
+                "error": "Request must be a JSON object",
+                "timestamp": datetime.now().isoformat()
+            }
+        # Batch requests yield LLM slots to interactive and fresh work
+        with llm_priority(Priority.BACKFILL):
+            return api.process_request(request_data)
+    
+    failures = 0
+    
+    def emit(response: Dict[str, Any]) -> None:
+        nonlocal failures
+        if not response.get("success", False):
+            failures += 1
+        output.write(json.dumps(response, ensure_ascii=False) + "\n")
+        output.flush()
+    
+    requests_iter = (line for line in lines if line.strip())
+    if concurrency <= 1:
+        for line in requests_iter:
+            emit(handle(line))
+        return failures
+    
+    # Keep a bounded window in flight and emit strictly in input order
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for line in requests_iter:
+            pending.append(pool.submit(handle, line))
+            while pending and (pending[0].done() or len(pending) >= concurrency * 2):
+                emit(pending.popleft().result())
+        while pending:
+            emit(pending.popleft().result())
+    return failures
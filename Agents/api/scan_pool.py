@@ -0,0 +1,101 @@
+"""Bounded pool running long monitor and re-scan requests apart from reads."""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from core.log import get_logger
+from core.settings import get_scan_queue_size, get_scan_workers
+
+logger = get_logger("api.scans")
+
+
+class ScanPoolFull(Exception):
+    """Raised when a scan cannot be accepted; the caller should retry later."""
+
+
+class ScanPool:
+    """Runs scan requests on a few dedicated threads with a bounded queue.
+
+    Request threads wait for their scan's result, but at most
+    ``workers + max_queue`` of them can, so the rest of the server's threads
+    stay free for fast read routes. Further scans are rejected right away.
+    """
+
+    def __init__(self, workers: int | None = None, max_queue: int | None = None):
+        """Initialize the pool.
+
+        Args:
+            workers: Scans running at once. If None, reads from settings.
+            max_queue: Scans waiting for a worker. If None, reads from settings.
+        """
+        self.workers = max(1, workers or get_scan_workers())
+        self.max_queue = max(0, max_queue if max_queue is not None else get_scan_queue_size())
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan")
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self.draining = False
+        self.stats = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a scan on the pool and wait for its result.
+
+        The caller's context variables (such as the LLM priority) are carried
+        over to the worker thread.
+
+        Raises:
+            ScanPoolFull: The pool is full or shutting down
+        """
+        if self.draining or not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise ScanPoolFull("shutting down" if self.draining else "too many scans in progress")
+        with self._lock:
+            self._pending += 1
+            self.stats["accepted"] += 1
+        try:
+            future = self._executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        except RuntimeError:
+            self._done(None)
+            raise ScanPoolFull("shutting down")
+        future.add_done_callback(self._done)
+        return future.result()
+
+    def _done(self, future) -> None:
+        self._slots.release()
+        with self._lock:
+            self._pending -= 1
+            if future is not None:
+                failed = future.cancelled() or future.exception() is not None
+                self.stats["failed" if failed else "completed"] += 1
+            if not self._pending:
+                self._idle.notify_all()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Stop accepting scans and wait for accepted ones to finish.
+
+        Returns:
+            True if no scan is left running
+        """
+        self.draining = True
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; scans still queued are cancelled."""
+        self.draining = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get counters and the number of scans running or waiting."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["pending"] = self._pending
+        stats["workers"] = self.workers
+        stats["max_queue"] = self.max_queue
+        return stats
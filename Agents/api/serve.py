@@ -0,0 +1,120 @@
+"""Production entry point: the REST API under the waitress WSGI server.
+
+Unlike ``python api/server.py`` (Flask's development server with reloader
+and debugger), this serves requests on a fixed pool of threads, bounds the
+connections and queued scans it accepts, and shuts down gracefully on
+SIGTERM or SIGINT: new scans are refused, running ones get
+``SHUTDOWN_GRACE_S`` seconds to finish, then the webhook workers, retention
+and the violation writer are stopped.
+
+    python api/serve.py --host 0.0.0.0 --port 5000
+"""
+import _thread
+import argparse
+import os
+import signal
+import sys
+import threading
+from pathlib import Path
+
+from waitress import create_server
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.server import app, cast_workers, scan_pool, start_retention, stop_retention
+from core.components import reset_components
+from core.log import get_logger, shutdown_logging
+from core.settings import get_scan_queue_size, get_scan_workers, get_server_threads, get_shutdown_grace_s
+
+logger = get_logger("api.serve")
+
+# Threads kept for read routes even when every scan slot is taken
+MIN_READ_THREADS = 2
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Serve the API until a shutdown signal is received."""
+    parser = argparse.ArgumentParser(description="Farcaster Monitoring Agent - production API server")
+    parser.add_argument('--host', default='0.0.0.0', help='Interface to listen on (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=5000, help='Port to listen on (default: 5000)')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='Request threads (default: SERVER_THREADS or 16)')
+    parser.add_argument('--connection-limit', type=int, default=200,
+                        help='Open connections accepted before new ones wait in the backlog (default: 200)')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='Write cProfile stats and tracemalloc snapshots of API actions to DIR (same as PROFILE_DIR)')
+    parser.add_argument('--profile-every', type=int, metavar='N',
+                        help='With --profile, profile one in N actions (same as PROFILE_SAMPLE_EVERY, default: 1)')
+    args = parser.parse_args(argv)
+    # Read when the profiler is created, on the first request
+    if args.profile:
+        os.environ["PROFILE_DIR"] = args.profile
+    if args.profile_every:
+        os.environ["PROFILE_SAMPLE_EVERY"] = str(args.profile_every)
+
+    threads = max(1, args.threads or get_server_threads())
+    scan_slots = get_scan_workers() + get_scan_queue_size()
+    if threads - scan_slots < MIN_READ_THREADS:
+        logger.warning("Few request threads left for reads while scans run", extra={
+            "threads": threads,
+            "scan_slots": scan_slots,
+        })
+
+    server = create_server(app, host=args.host, port=args.port, threads=threads,
+                           connection_limit=args.connection_limit)
+    start_retention()
+    _install_signal_handlers(get_shutdown_grace_s())
+    logger.info("API server started", extra={
+        "host": args.host,
+        "port": server.effective_port,
+        "threads": threads,
+        "scan_workers": scan_pool.workers,
+        "scan_queue": scan_pool.max_queue,
+    })
+    try:
+        # Returns after a KeyboardInterrupt, once waitress stopped its threads
+        server.run()
+    finally:
+        _shutdown(get_shutdown_grace_s())
+    return 0
+
+
+def _install_signal_handlers(grace_s: float) -> None:
+    """Drain on SIGINT/SIGTERM, then stop the server loop in the main thread.
+    
+    A second signal stops the server without waiting for scans.
+    """
+    stopping = threading.Event()
+
+    def drain_and_stop():
+        if not scan_pool.drain(grace_s):
+            logger.warning("Scans still running after the grace period", extra=scan_pool.get_stats())
+        # Delivers SIGINT to the main thread; the handler below then ends server.run()
+        _thread.interrupt_main()
+
+    def handle(signum, frame):
+        if stopping.is_set():
+            # Drained, or a second signal: stop now
+            raise KeyboardInterrupt
+        stopping.set()
+        logger.info("Shutdown signal received, draining scans", extra={"signal": signum})
+        threading.Thread(target=drain_and_stop, name="api-shutdown", daemon=True).start()
+
+    signal.signal(signal.SIGINT, handle)
+    signal.signal(signal.SIGTERM, handle)
+
+
+def _shutdown(grace_s: float) -> None:
+    """Stop background work after the server loop ended."""
+    scan_pool.shutdown()
+    cast_workers.stop(drain=True, timeout=grace_s)
+    stop_retention()
+    # Commits rows still pending in the background writer
+    reset_components()
+    logger.info("API server stopped")
+    shutdown_logging()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
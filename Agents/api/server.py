@@ -1,5 +1,9 @@
 """Flask REST API server for the monitoring agent."""
+import argparse
+import json
+import os
 import sys
+import threading
 from pathlib import Path
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -7,14 +11,104 @@ from flask_cors import CORS
 # Add parent directory to path to allow imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from api.http_cache import compress_response, make_etag, not_modified
 from api.json_api import MonitoringAPI
+from api.scan_pool import ScanPool, ScanPoolFull
+from connectors.neynar_webhook import SIGNATURE_HEADER, parse_cast_event, verify_signature
+from core.components import get_llm_scheduler
+from core.deadline import deadline_scope
+from core.llm_scheduler import Priority, llm_priority
+from core.settings import (
+    get_llm_interactive_deadline_s,
+    get_neynar_webhook_secrets,
+    get_profile_dir,
+    get_scan_deadline_s,
+)
+from database.retention import RetentionManager
+from workers.cast_workers import CastWorkerPool
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
+app.after_request(compress_response)
 
 # Initialize the API
 api = MonitoringAPI()
 
+# Worker pool evaluating casts pushed by Neynar webhooks (started on first event)
+cast_workers = CastWorkerPool(api.monitor)
+
+# Long-running monitor and re-scan requests, kept apart from read routes
+scan_pool = ScanPool()
+
+# Actions that fetch or re-evaluate casts and may run for minutes
+SCAN_ACTIONS = ("monitor", "rescan")
+
+# Seconds a client is asked to wait before retrying a rejected scan
+SCAN_RETRY_AFTER_S = 5
+
+# Periodic retention and compaction of violations and stored casts, built by
+# start_retention() so importing this module opens no database
+_retention: RetentionManager | None = None
+_retention_lock = threading.Lock()
+
+
+def start_retention() -> RetentionManager:
+    """Build and start the retention manager, once per process."""
+    global _retention
+    with _retention_lock:
+        if _retention is None:
+            _retention = RetentionManager(api.database, cast_store=api.monitor.cast_store).start()
+        return _retention
+
+
+def stop_retention() -> None:
+    """Stop the retention manager if this process started one."""
+    global _retention
+    with _retention_lock:
+        if _retention is not None:
+            _retention.stop()
+            _retention = None
+
+
+def interactive_llm_priority():
+    """LLM priority for requests a client is waiting on, with the interactive deadline."""
+    return llm_priority(Priority.INTERACTIVE, deadline_s=get_llm_interactive_deadline_s())
+
+
+def run_scan(request_data: dict):
+    """Run a scan action on the scan pool, at interactive LLM priority.
+    
+    The scan gets ``SCAN_DEADLINE_S`` from now, including time queued in the
+    pool; a shorter ``timeout_s`` in the request applies instead. A scan cut
+    short answers with partial results.
+    
+    Raises:
+        ScanPoolFull: Too many scans are running or waiting
+    """
+    with interactive_llm_priority(), deadline_scope(get_scan_deadline_s()):
+        return scan_pool.run(api.process_request, request_data)
+
+
+def scan_rejected(error: ScanPoolFull):
+    """503 response for a scan the pool could not accept."""
+    return jsonify({
+        "success": False,
+        "error": f"Scan not accepted: {error}"
+    }), 503, {"Retry-After": str(SCAN_RETRY_AFTER_S)}
+
+
+def tagged_response(payload: dict, etag: str):
+    """JSON response for a read, tagged for conditional requests only if it succeeded.
+    
+    The tag is derived from the data, not from the body, so a tagged error
+    would be repeated as 304 until the next write.
+    """
+    response = jsonify(payload)
+    if payload.get("success"):
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -44,8 +138,39 @@ def monitor_users():
     try:
         request_data = request.get_json()
         request_data["action"] = "monitor"
-        response = api.process_request(request_data)
+        response = run_scan(request_data)
+        return jsonify(response)
+    except ScanPoolFull as e:
+        return scan_rejected(e)
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route('/api/rescan', methods=['POST'])
+def rescan_users():
+    """Re-run rules over stored casts without fetching from Neynar.
+    
+    Request body (all optional):
+    {
+        "users": [
+            {
+                "user_id": "1398613",
+                "local_rules": [...]
+            }
+        ],
+        "days": 30
+    }
+    """
+    try:
+        request_data = request.get_json(silent=True) or {}
+        request_data["action"] = "rescan"
+        response = run_scan(request_data)
         return jsonify(response)
+    except ScanPoolFull as e:
+        return scan_rejected(e)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -61,17 +186,23 @@ def get_violations():
     - user_ids: comma-separated list of user IDs
     
     Example: /api/violations?user_ids=1398613,194
+    
+    Successful responses carry an ETag; a matching If-None-Match gets 304 Not Modified.
     """
     try:
         user_ids_param = request.args.get('user_ids', '')
         user_ids = [uid.strip() for uid in user_ids_param.split(',') if uid.strip()]
         
+        etag = make_etag("violations", user_ids, api.database.get_change_token(user_ids))
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        
         request_data = {
             "action": "get_violations",
             "user_ids": user_ids
         }
-        response = api.process_request(request_data)
-        return jsonify(response)
+        return tagged_response(api.process_request(request_data), etag)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -81,9 +212,44 @@ def get_violations():
 
 @app.route('/api/violations/all', methods=['GET'])
 def get_all_violations():
-    """Get all violations from the database."""
+    """Get all violations from the database.
+    
+    Successful responses carry an ETag; a matching If-None-Match gets 304 Not Modified.
+    """
     try:
+        etag = make_etag("violations/all", api.database.get_change_token())
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        
         request_data = {"action": "get_all_violations"}
+        return tagged_response(api.process_request(request_data), etag)
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route('/api/violations/summary', methods=['GET'])
+def get_violation_summary():
+    """Get violation counts per user, rule and day.
+    
+    Query params:
+    - user_ids: comma-separated list of user IDs (optional, default all)
+    - days: only count the last N days (optional)
+    
+    Example: /api/violations/summary?user_ids=1398613&days=30
+    """
+    try:
+        user_ids_param = request.args.get('user_ids', '')
+        user_ids = [uid.strip() for uid in user_ids_param.split(',') if uid.strip()]
+        
+        request_data = {
+            "action": "get_summary",
+            "user_ids": user_ids or None,
+            "days": request.args.get('days', type=int)
+        }
         response = api.process_request(request_data)
         return jsonify(response)
     except Exception as e:
@@ -93,6 +259,38 @@ def get_all_violations():
         }), 500
 
 
+@app.route('/api/violations/search', methods=['GET'])
+def search_violations():
+    """Search violations by keyword, ranked by relevance.
+    
+    Query params:
+    - q: search words; all must match, a trailing * matches a prefix
+    - user_ids: comma-separated list of user IDs (optional)
+    - limit: page size (default 20, max 100)
+    - offset: results to skip (default 0)
+    
+    Example: /api/violations/search?q=airdrop+scam*&limit=20&offset=0
+    """
+    try:
+        user_ids_param = request.args.get('user_ids', '')
+        user_ids = [uid.strip() for uid in user_ids_param.split(',') if uid.strip()]
+        
+        request_data = {
+            "action": "search_violations",
+            "query": request.args.get('q', ''),
+            "user_ids": user_ids or None,
+            "limit": request.args.get('limit', 20, type=int),
+            "offset": request.args.get('offset', 0, type=int)
+        }
+        response = api.process_request(request_data)
+        return jsonify(response), 200 if response.get("success") else 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
 @app.route('/api/configure', methods=['POST'])
 def configure_users():
     """Configure user rules without monitoring.
@@ -128,8 +326,41 @@ def process_generic():
     """
     try:
         request_data = request.get_json()
-        response = api.process_request(request_data)
+        if request_data.get("action", "monitor") in SCAN_ACTIONS:
+            response = run_scan(request_data)
+        else:
+            with interactive_llm_priority():
+                response = api.process_request(request_data)
         return jsonify(response)
+    except ScanPoolFull as e:
+        return scan_rejected(e)
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route('/api/llm/stats', methods=['GET'])
+def llm_scheduler_stats():
+    """LLM scheduler queue depths and wait times per priority class."""
+    return jsonify({
+        "success": True,
+        "stats": get_llm_scheduler().get_stats()
+    })
+
+
+@app.route('/api/llm/usage', methods=['GET'])
+def llm_token_usage():
+    """LLM token usage, latency and cost per rule, model and user.
+    
+    Query params:
+    - user_ids: comma-separated list of user IDs (optional, default all)
+    """
+    try:
+        user_ids_param = request.args.get('user_ids', '')
+        user_ids = [uid.strip() for uid in user_ids_param.split(',') if uid.strip()]
+        return jsonify(api.process_request({"action": "token_usage", "user_ids": user_ids}))
     except Exception as e:
         return jsonify({
             "success": False,
@@ -137,13 +368,97 @@ def process_generic():
         }), 500
 
 
+@app.route('/api/scans/stats', methods=['GET'])
+def scan_pool_stats():
+    """Scan pool counters and the number of scans running or waiting."""
+    return jsonify({
+        "success": True,
+        "stats": scan_pool.get_stats()
+    })
+
+
+@app.route('/api/webhooks/neynar', methods=['POST'])
+def neynar_webhook():
+    """Receive Neynar webhook events and queue created casts for evaluation.
+    
+    The raw body must be signed with one of the NEYNAR_WEBHOOK_SECRET values
+    (HMAC-SHA512, hex) in the X-Neynar-Signature header. Casts from users
+    without configured rules are acknowledged and dropped.
+    """
+    secrets = get_neynar_webhook_secrets()
+    if not secrets:
+        return jsonify({
+            "success": False,
+            "error": "Webhook secret not configured"
+        }), 503
+    
+    body = request.get_data()
+    if not verify_signature(body, request.headers.get(SIGNATURE_HEADER), secrets):
+        return jsonify({
+            "success": False,
+            "error": "Invalid signature"
+        }), 401
+    
+    try:
+        event = json.loads(body)
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": f"Invalid JSON: {e}"
+        }), 400
+    
+    post = parse_cast_event(event)
+    if post is None:
+        return jsonify({"success": True, "queued": False, "reason": "ignored event"})
+    if api.monitor.rule_engine.get_user_rules(post["author_id"]) is None:
+        return jsonify({"success": True, "queued": False, "reason": "author not monitored"})
+    
+    if not cast_workers.start().submit(post):
+        return jsonify({
+            "success": False,
+            "error": "Cast queue full"
+        }), 503
+    return jsonify({"success": True, "queued": True, "post_id": post["post_id"]}), 202
+
+
+@app.route('/api/webhooks/neynar/stats', methods=['GET'])
+def neynar_webhook_stats():
+    """Get webhook worker pool counters and queue depth."""
+    return jsonify({
+        "success": True,
+        "stats": cast_workers.get_stats()
+    })
+
+
 if __name__ == '__main__':
+    # Development server with reloader and debugger; use api/serve.py in production
+    parser = argparse.ArgumentParser(description="Farcaster Monitoring Agent - development API server")
+    parser.add_argument('--profile', metavar='DIR',
+                        help='Write cProfile stats and tracemalloc snapshots of API actions to DIR (same as PROFILE_DIR)')
+    parser.add_argument('--profile-every', type=int, metavar='N',
+                        help='With --profile, profile one in N actions (same as PROFILE_SAMPLE_EVERY, default: 1)')
+    args = parser.parse_args()
+    # Read when the profiler is created, on the first request; the reloader's child inherits them
+    if args.profile:
+        os.environ["PROFILE_DIR"] = args.profile
+    if args.profile_every:
+        os.environ["PROFILE_SAMPLE_EVERY"] = str(args.profile_every)
+    
     print("Starting Farcaster Monitoring API Server...")
     print("API Endpoints:")
     print("  GET  /health - Health check")
     print("  POST /api/monitor - Monitor users and get violations")
     print("  GET  /api/violations?user_ids=... - Get violations for specific users")
     print("  GET  /api/violations/all - Get all violations")
+    print("  GET  /api/violations/summary - Violation counts per user, rule and day")
+    print("  GET  /api/violations/search?q=... - Keyword search over violations")
     print("  POST /api/configure - Configure user rules")
     print("  POST /api/process - Generic endpoint for any action")
+    print("  POST /api/webhooks/neynar - Neynar cast.created webhook receiver")
+    print("  GET  /api/llm/usage - LLM token usage per rule, model and user")
+    print(f"Profiling: {'API actions written to ' + get_profile_dir() if get_profile_dir() else 'off (set PROFILE_DIR or --profile DIR)'}")
+    # The reloader runs this block in a watcher and in the serving child;
+    # only the child (WERKZEUG_RUN_MAIN set) serves, so only it runs retention
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_retention()
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -1,8 +1,9 @@
 """CLI interface for JSON-based monitoring."""
 import argparse
 import json
+import os
 import sys
-from api.json_api import MonitoringAPI, process_json_file
+from api.json_api import MonitoringAPI, process_json_file, process_json_lines
 
 
 def main():
@@ -13,16 +14,47 @@ def main():
     parser.add_argument(
         '--input',
         '-i',
-        required=True,
-        help='Path to input JSON file with configuration'
+        help="Path to input JSON file with configuration ('-' or omitted reads stdin in batch mode)"
     )
     parser.add_argument(
         '--output',
         '-o',
         help='Path to output JSON file for results (optional, prints to stdout if not provided)'
     )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Read newline-delimited JSON requests and write one JSON response per line'
+    )
+    parser.add_argument(
+        '--concurrency',
+        '-c',
+        type=int,
+        default=1,
+        help='Number of batch requests processed in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='DIR',
+        help='Write cProfile stats and tracemalloc snapshots of each request to DIR (same as PROFILE_DIR)'
+    )
+    parser.add_argument(
+        '--profile-every',
+        type=int,
+        metavar='N',
+        help='With --profile, profile one in N requests (same as PROFILE_SAMPLE_EVERY, default: 1)'
+    )
     
     args = parser.parse_args()
+    if args.profile:
+        os.environ["PROFILE_DIR"] = args.profile
+    if args.profile_every:
+        os.environ["PROFILE_SAMPLE_EVERY"] = str(args.profile_every)
+    
+    if args.batch:
+        sys.exit(run_batch(args.input, args.output, args.concurrency))
+    if not args.input:
+        parser.error('--input is required unless --batch is given')
     
     try:
         # Process the request
@@ -46,5 +78,23 @@ def main():
         sys.exit(1)
 
 
+def run_batch(input_path: str | None, output_path: str | None, concurrency: int) -> int:
+    """Run a JSONL batch and return the process exit code."""
+    try:
+        source = sys.stdin if input_path in (None, '-') else open(input_path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        print(f"Error: Input file '{input_path}' not found.", file=sys.stderr)
+        return 1
+    sink = sys.stdout if output_path in (None, '-') else open(output_path, 'w', encoding='utf-8')
+    try:
+        failures = process_json_lines(source, sink, concurrency=max(1, concurrency))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 0 if failures == 0 else 1
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1 @@
+"""Offline benchmarks with local stand-ins for the Neynar and OpenRouter APIs."""
@@ -0,0 +1,166 @@
+"""Offline end-to-end benchmark.
+
+Starts local Neynar and OpenRouter stand-ins, points the application at them
+and measures throughput and latency percentiles of
+``FarcasterMonitor.monitor_all_users``, ``MonitoringAPI.process_request`` and
+the Flask routes. Run from the Agents directory:
+
+    python -m benchmarks.e2e --users 20 --casts 100 --output e2e.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.stats import summarize_latencies, write_results
+from benchmarks.stubs import StubNeynarServer, StubOpenRouterServer
+from benchmarks.synthetic import DEFAULT_FORBIDDEN_WORDS
+
+
+def configure_environment(neynar: StubNeynarServer, openrouter: StubOpenRouterServer,
+                          db_path: str) -> None:
+    """Point the application settings at the stubs and a scratch database."""
+    os.environ.update({
+        "NEYNAR_API_KEY": "benchmark",
+        "OPENROUTER_API_KEY": "benchmark",
+        "NEYNAR_BASE_URL": neynar.base_url,
+        "OPENROUTER_BASE_URL": openrouter.base_url,
+        "DATABASE_PATH": db_path,
+        "FALLBACK_MODELS": "",
+        "LLM_ATTEMPTS_PER_MODEL": "1",
+        "LLM_RETRY_DELAYS_S": "0",
+    })
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def user_configs(users: int, llm_rules: int, first_fid: int = 1000) -> List[Dict]:
+    """Build the ``users`` section of a monitor request."""
+    return [
+        {
+            "user_id": str(first_fid + i),
+            "forbidden_words": DEFAULT_FORBIDDEN_WORDS,
+            "llm_rules": [
+                {"name": f"Rule {r}", "description": f"Synthetic LLM rule number {r}"}
+                for r in range(llm_rules)
+            ],
+        }
+        for i in range(users)
+    ]
+
+
+def _measure(fn: Callable[[], bool], iterations: int) -> Dict:
+    """Run ``fn`` repeatedly; it returns False (or raises) on failure."""
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        try:
+            ok = fn()
+        except Exception:
+            ok = False
+        latencies.append(time.perf_counter() - t0)
+        errors += 0 if ok else 1
+    return summarize_latencies(latencies, time.perf_counter() - started, errors)
+
+
+def bench_monitor_all_users(configs: List[Dict], days: int, iterations: int) -> Dict:
+    """Benchmark full sweeps of ``FarcasterMonitor.monitor_all_users``."""
+    from monitor import FarcasterMonitor
+
+    monitor = FarcasterMonitor()
+    for config in configs:
+        monitor.add_user_with_rules(
+            user_id=config["user_id"],
+            forbidden_words=config["forbidden_words"],
+            llm_rules=config["llm_rules"],
+        )
+    result = _measure(lambda: bool(monitor.monitor_all_users(days=days)), iterations)
+    result["users_per_sweep"] = len(configs)
+    result["users_per_s"] = round(
+        len(configs) * result["count"] / result["wall_time_s"], 2) if result["wall_time_s"] else 0.0
+    return result
+
+
+def bench_process_request(configs: List[Dict], days: int, iterations: int) -> Dict:
+    """Benchmark ``MonitoringAPI.process_request`` for each action."""
+    from api.json_api import MonitoringAPI
+
+    api = MonitoringAPI()
+    user_ids = [c["user_id"] for c in configs]
+    requests_by_action = {
+        "monitor": {"action": "monitor", "users": configs, "days": days},
+        "get_violations": {"action": "get_violations", "user_ids": user_ids},
+        "get_all_violations": {"action": "get_all_violations"},
+        "configure_users": {"action": "configure_users", "users": configs},
+    }
+    return {
+        action: _measure(lambda req=req: api.process_request(dict(req)).get("success", False),
+                         1 if action == "monitor" else iterations)
+        for action, req in requests_by_action.items()
+    }
+
+
+def bench_flask_routes(configs: List[Dict], days: int, iterations: int) -> Dict:
+    """Benchmark the Flask routes through the WSGI test client."""
+    from api.server import app
+
+    client = app.test_client()
+    user_ids = ",".join(c["user_id"] for c in configs)
+    routes = {
+        "GET /health": lambda: client.get("/health"),
+        "GET /api/violations": lambda: client.get(f"/api/violations?user_ids={user_ids}"),
+        "GET /api/violations/all": lambda: client.get("/api/violations/all"),
+        "POST /api/monitor": lambda: client.post("/api/monitor", json={"users": configs, "days": days}),
+    }
+    return {
+        route: _measure(lambda call=call: call().status_code < 400,
+                        1 if route == "POST /api/monitor" else iterations)
+        for route, call in routes.items()
+    }
+
+
+def main():
+    """CLI entry point for the end-to-end benchmark."""
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark")
+    parser.add_argument('--users', type=int, default=10, help='Number of monitored users')
+    parser.add_argument('--casts', type=int, default=50, help='Casts in each user feed')
+    parser.add_argument('--llm-rules', type=int, default=1, help='LLM rules per user')
+    parser.add_argument('--days', type=int, default=7, help='Look-back window in days')
+    parser.add_argument('--iterations', type=int, default=3, help='Repetitions per measurement')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Injected upstream latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Injected upstream error rate')
+    parser.add_argument('--seed', type=int, default=1234, help='Random seed')
+    parser.add_argument('--output', '-o', help='Path to output JSON file (default: stdout)')
+    args = parser.parse_args()
+
+    stub_options = {"latency_s": args.latency_ms / 1000.0, "error_rate": args.error_rate, "seed": args.seed}
+    with tempfile.TemporaryDirectory() as tmp, \
+            StubNeynarServer(casts_per_user=args.casts, **stub_options) as neynar, \
+            StubOpenRouterServer(**stub_options) as openrouter:
+        configure_environment(neynar, openrouter, os.path.join(tmp, "violations.db"))
+        configs = user_configs(args.users, args.llm_rules)
+
+        results = {
+            "config": vars(args),
+            "benchmarks": {
+                "monitor_all_users": bench_monitor_all_users(configs, args.days, args.iterations),
+                "process_request": bench_process_request(configs, args.days, args.iterations),
+                "flask_routes": bench_flask_routes(configs, args.days, args.iterations),
+            },
+            "upstream": {
+                "neynar_requests": neynar.request_count,
+                "neynar_errors": neynar.error_count,
+                "openrouter_requests": openrouter.request_count,
+                "openrouter_errors": openrouter.error_count,
+            },
+        }
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""HTTP load test of the REST API.
+
+Seeds a scratch database with violations, starts the Neynar and OpenRouter
+stand-ins, serves the Flask app on localhost (waitress, as in production, or
+Werkzeug's threaded server) and drives it with concurrent closed-loop
+clients over keep-alive connections. Each client picks its next route from
+a weighted mix. Throughput, p50/p95/p99 latency, error rates and status
+codes are reported per route as JSON. Run from the Agents directory:
+
+    python -m benchmarks.load_test --clients 16 --duration 30 \\
+        --mix violations=70,violations_all=20,monitor=10 -o load.json
+    python -m benchmarks.load_test -b load.json --server werkzeug
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.e2e import configure_environment, user_configs
+from benchmarks.stats import compare_to_baseline, summarize_latencies, write_results
+from benchmarks.stubs import StubNeynarServer, StubOpenRouterServer
+from benchmarks.synthetic import SyntheticCastGenerator
+
+# Route names usable in --mix
+ROUTES = ("violations", "violations_all", "summary", "search", "monitor", "health")
+DEFAULT_MIX = "violations=70,violations_all=20,monitor=10"
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse ``route=weight,...`` into route weights."""
+    mix = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        route, _, weight = part.partition("=")
+        route = route.strip()
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route in mix: {route} (choose from {', '.join(ROUTES)})")
+        mix[route] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Request mix needs at least one route with a positive weight")
+    return mix
+
+
+def seed_database(db_path: str, authors: int, violations: int, seed: int) -> List[str]:
+    """Fill a scratch database with synthetic violations.
+
+    Returns:
+        The author IDs that have violations
+    """
+    from database.violations_db import ViolationsDatabase
+
+    generator = SyntheticCastGenerator(seed=seed)
+    author_ids = [str(10000 + i) for i in range(authors)]
+    per_author = max(1, violations // max(1, authors))
+    db = ViolationsDatabase(db_path, background_writer=False)
+    for author_id in author_ids:
+        casts = generator.casts_for_user(int(author_id), per_author)
+        db.add_violations([
+            (cast["hash"], author_id, "Forbidden words: spam", cast["timestamp"], cast["text"])
+            for cast in casts
+        ])
+    return author_ids
+
+
+class LocalServer:
+    """Serves the Flask app on an ephemeral localhost port in a background thread."""
+
+    def __init__(self, app, kind: str, threads: int):
+        self.kind = kind
+        if kind == "waitress":
+            from waitress import create_server
+
+            self._server = create_server(app, host="127.0.0.1", port=0, threads=threads,
+                                         connection_limit=max(100, threads * 4))
+            self.port = self._server.effective_port
+            self._thread = threading.Thread(target=self._server.run, name="load-test-server", daemon=True)
+        else:
+            from werkzeug.serving import WSGIRequestHandler, make_server
+
+            class QuietHandler(WSGIRequestHandler):
+                def log_request(self, *args, **kwargs):
+                    pass
+
+            self._server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+            self.port = self._server.server_port
+            self._thread = threading.Thread(target=self._server.serve_forever, name="load-test-server",
+                                            daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "LocalServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.kind == "waitress":
+            self._server.task_dispatcher.shutdown()
+            self._server.close()
+        else:
+            self._server.shutdown()
+        self._thread.join(timeout=5)
+
+
+def build_requests(author_ids: List[str], monitor_fids: List[str], days: int,
+                   rng: random.Random) -> Dict[str, Callable[[], tuple]]:
+    """Request factories per route: each returns (method, path, json_body)."""
+    def some_authors() -> str:
+        return ",".join(rng.sample(author_ids, min(len(author_ids), rng.randint(1, 3))))
+
+    return {
+        "violations": lambda: ("GET", f"/api/violations?user_ids={some_authors()}", None),
+        "violations_all": lambda: ("GET", "/api/violations/all", None),
+        "summary": lambda: ("GET", f"/api/violations/summary?user_ids={some_authors()}", None),
+        "search": lambda: ("GET", f"/api/violations/search?q={rng.choice(['spam', 'airdrop', 'gm'])}", None),
+        "monitor": lambda: ("POST", "/api/monitor", {
+            "users": user_configs(1, 1, first_fid=int(rng.choice(monitor_fids))),
+            "days": days,
+        }),
+        "health": lambda: ("GET", "/health", None),
+    }
+
+
+def run_load(base_url: str, mix: Dict[str, float], clients: int, duration_s: float,
+             factories_for: Callable[[random.Random], Dict[str, Callable[[], tuple]]],
+             seed: int, conditional: bool, timeout_s: float) -> Dict:
+    """Drive the server with closed-loop clients for a fixed time.
+
+    Args:
+        base_url: Server to load
+        mix: Route weights
+        clients: Concurrent clients, each with its own keep-alive session
+        duration_s: Seconds to keep sending requests
+        factories_for: Builds the request factories for a client's random source
+        seed: Base seed; client i uses seed + i
+        conditional: Resend each URL's last ETag in If-None-Match, like a polling dashboard
+        timeout_s: Per-request timeout
+
+    Returns:
+        Per-route and overall latency summaries and status code counts
+    """
+    import requests
+
+    routes = list(mix.keys())
+    weights = [mix[route] for route in routes]
+    lock = threading.Lock()
+    latencies: Dict[str, List[float]] = {route: [] for route in routes}
+    errors: Counter = Counter()
+    statuses: Dict[str, Counter] = {route: Counter() for route in routes}
+    start = threading.Event()
+    deadline = [0.0]
+
+    def client(index: int) -> None:
+        rng = random.Random(seed + index)
+        factories = factories_for(rng)
+        etags: Dict[str, str] = {}
+        with requests.Session() as session:
+            start.wait()
+            while time.perf_counter() < deadline[0]:
+                route = rng.choices(routes, weights)[0]
+                method, path, body = factories[route]()
+                headers = {"Accept-Encoding": "gzip"}
+                if conditional and path in etags:
+                    headers["If-None-Match"] = etags[path]
+                t0 = time.perf_counter()
+                try:
+                    response = session.request(method, base_url + path, json=body, headers=headers,
+                                               timeout=timeout_s)
+                    status = str(response.status_code)
+                    failed = response.status_code >= 400
+                    if conditional and response.headers.get("ETag"):
+                        etags[path] = response.headers["ETag"]
+                except requests.RequestException as e:
+                    status, failed = type(e).__name__, True
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    latencies[route].append(elapsed)
+                    statuses[route][status] += 1
+                    if failed:
+                        errors[route] += 1
+
+    threads = [threading.Thread(target=client, args=(i,), name=f"load-client-{i}") for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+    deadline[0] = started + duration_s
+    start.set()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    results = {"routes": {}}
+    for route in routes:
+        summary = summarize_latencies(latencies[route], wall, errors[route])
+        summary["status_codes"] = dict(statuses[route])
+        results["routes"][route] = summary
+    results["overall"] = summarize_latencies([v for values in latencies.values() for v in values], wall,
+                                             sum(errors.values()))
+    return results
+
+
+def main():
+    """CLI entry point for the HTTP load test."""
+    parser = argparse.ArgumentParser(description="HTTP load test of the REST API")
+    parser.add_argument('--clients', '-c', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--duration', '-d', type=float, default=10.0, help='Seconds of load')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f'Route weights, from {", ".join(ROUTES)} (default: {DEFAULT_MIX})')
+    parser.add_argument('--server', choices=("waitress", "werkzeug"), default="waitress",
+                        help='Server the app runs under (default: waitress)')
+    parser.add_argument('--threads', type=int, default=16, help='Server request threads (waitress)')
+    parser.add_argument('--url', help='Load an already running server instead (no seeding or stubs)')
+    parser.add_argument('--authors', type=int, default=50, help='Authors in the seeded database')
+    parser.add_argument('--violations', type=int, default=20000, help='Violations in the seeded database')
+    parser.add_argument('--monitor-users', type=int, default=5, help='Distinct FIDs monitor requests use')
+    parser.add_argument('--casts', type=int, default=20, help='Casts in each stub user feed')
+    parser.add_argument('--days', type=int, default=7, help='Look-back window of monitor requests')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Injected upstream latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Injected upstream error rate')
+    parser.add_argument('--conditional', action='store_true',
+                        help='Send If-None-Match with the last ETag per URL, like a polling dashboard')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=1234, help='Random seed')
+    parser.add_argument('--baseline', '-b', help='Compare against a previous result file')
+    parser.add_argument('--output', '-o', help='Path to output JSON file (default: stdout)')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    monitor_fids = [str(20000 + i) for i in range(max(1, args.monitor_users))]
+
+    if args.url:
+        author_ids = [str(10000 + i) for i in range(args.authors)]
+        results = run_load(args.url.rstrip("/"), mix, args.clients, args.duration,
+                           lambda rng: build_requests(author_ids, monitor_fids, args.days, rng),
+                           args.seed, args.conditional, args.timeout)
+        upstream = None
+    else:
+        stub_options = {"latency_s": args.latency_ms / 1000.0, "error_rate": args.error_rate, "seed": args.seed}
+        with tempfile.TemporaryDirectory() as tmp, \
+                StubNeynarServer(casts_per_user=args.casts, **stub_options) as neynar, \
+                StubOpenRouterServer(**stub_options) as openrouter:
+            db_path = os.path.join(tmp, "violations.db")
+            configure_environment(neynar, openrouter, db_path)
+            author_ids = seed_database(db_path, args.authors, args.violations, args.seed)
+            # Imported after the environment points at the stubs and scratch database
+            from api.server import app, scan_pool
+
+            with LocalServer(app, args.server, args.threads) as server:
+                results = run_load(server.base_url, mix, args.clients, args.duration,
+                                   lambda rng: build_requests(author_ids, monitor_fids, args.days, rng),
+                                   args.seed, args.conditional, args.timeout)
+            results["scan_pool"] = scan_pool.get_stats()
+            upstream = {
+                "neynar_requests": neynar.request_count,
+                "neynar_errors": neynar.error_count,
+                "openrouter_requests": openrouter.request_count,
+                "openrouter_errors": openrouter.error_count,
+            }
+
+    document = {
+        "config": {**vars(args), "mix": mix},
+        "benchmarks": {"load": results},
+    }
+    if upstream is not None:
+        document["upstream"] = upstream
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        document["comparison"] = compare_to_baseline(document["benchmarks"], baseline.get("benchmarks", {}))
+    write_results(document, args.output)
+
+
+if __name__ == "__main__":
+    main()
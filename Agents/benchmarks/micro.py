@@ -0,0 +1,211 @@
+"""Micro-benchmarks and scale tests for the rule engine and violations storage.
+
+Covers rule matching over large synthetic cast sets with word lists of
+increasing size, bulk insert and read on a violations table with millions of
+rows, and memory use per configured user in ``RuleEngine``. Results are JSON
+so a run can be compared against a saved baseline. Run from the Agents
+directory:
+
+    python -m benchmarks.micro --output micro.json
+    python -m benchmarks.micro --baseline micro.json
+"""
+import argparse
+import gc
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.stats import compare_to_baseline, summarize_latencies, write_results
+from benchmarks.synthetic import SyntheticCastGenerator
+
+# Rows per transaction when bulk loading the violations table
+BULK_BATCH_ROWS = 50_000
+
+
+def word_list(size: int) -> List[str]:
+    """Build a forbidden word list of the given size that includes real hits."""
+    base = ["spam", "scam", "kinda", "dunno"]
+    return (base + [f"word{i:05d}" for i in range(size)])[:size]
+
+
+def bench_rule_matching(posts: List[Dict], list_sizes: List[int], max_seconds: float | None = None) -> Dict:
+    """Benchmark ``ForbiddenWordsRule.check``, the equivalent local
+    ``PhraseRule`` and ``RuleEngine.check_post``.
+
+    Every case evaluates all casts unless ``max_seconds`` is given; a case
+    cut short by it is marked ``truncated``, and its rates are computed over
+    the ``casts_evaluated`` reported alongside.
+    """
+    from rules.rule_engine import ForbiddenWordsRule, PhraseRule, RuleEngine
+
+    results = {}
+    for size in list_sizes:
+        rule = ForbiddenWordsRule(word_list(size))
+        phrase_rule = PhraseRule(word_list(size))
+        engine = RuleEngine()
+        for author_id in {p["author_id"] for p in posts}:
+            engine.add_user_rules(author_id, [rule])
+
+        case = {}
+        for name, check in (("forbidden_words_rule_check", rule.check),
+                            ("phrase_rule_check", phrase_rule.check),
+                            ("rule_engine_check_post", engine.check_post)):
+            evaluated, hits = 0, 0
+            deadline = time.perf_counter() + max_seconds if max_seconds is not None else None
+            started = time.perf_counter()
+            for post in posts:
+                hits += 1 if check(post) else 0
+                evaluated += 1
+                if deadline is not None and evaluated % 256 == 0 and time.perf_counter() > deadline:
+                    break
+            elapsed = time.perf_counter() - started
+            case[name] = {
+                "casts_evaluated": evaluated,
+                "truncated": evaluated < len(posts),
+                "matches": hits,
+                "elapsed_s": round(elapsed, 4),
+                "casts_per_s": round(evaluated / elapsed, 1) if elapsed else 0.0,
+                "us_per_cast": round(elapsed / evaluated * 1e6, 3) if evaluated else 0.0,
+            }
+        results[f"words_{size}"] = case
+    return results
+
+
+def bench_storage(rows: int, authors: int, single_inserts: int, reads: int) -> Dict:
+    """Benchmark ``ViolationsDatabase`` writes and reads at scale."""
+    from database.violations_db import ViolationsDatabase
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ViolationsDatabase(os.path.join(tmp, "violations.db"))
+        snippet = "x" * 120
+
+        # Per-row latency of the normal insert path (connect, insert, commit)
+        latencies = []
+        for i in range(single_inserts):
+            t0 = time.perf_counter()
+            db.add_violation(f"single-{i}", str(i % authors), "Rule", "2025-10-22T15:30:00.000Z", snippet)
+            latencies.append(time.perf_counter() - t0)
+        results["add_violation"] = summarize_latencies(latencies)
+
+        # Bulk load of the table in large transactions
+        def generate():
+            for i in range(rows):
+                yield (f"0x{i:040x}", str(i % authors), f"Rule {i % 7}",
+                       f"2025-10-{1 + i % 28:02d}T{i % 24:02d}:00:00.000Z", snippet)
+
+        t0 = time.perf_counter()
+        batches = generate()
+        while batch := list(itertools.islice(batches, BULK_BATCH_ROWS)):
+            db.add_violations(batch)
+        elapsed = time.perf_counter() - t0
+        results["bulk_insert"] = {
+            "rows": rows,
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_s": round(rows / elapsed, 1) if elapsed else 0.0,
+        }
+        results["database_bytes"] = os.path.getsize(db.db_path)
+
+        author_ids = [str(i % authors) for i in range(reads)]
+        latencies = []
+        for author_id in author_ids:
+            t0 = time.perf_counter()
+            db.get_violations_by_author(author_id)
+            latencies.append(time.perf_counter() - t0)
+        results["get_violations_by_author"] = summarize_latencies(latencies)
+        results["get_violations_by_author"]["rows_per_author"] = rows // max(1, authors)
+
+        t0 = time.perf_counter()
+        total = len(db.get_all_violations())
+        results["get_all_violations"] = {
+            "rows": total,
+            "elapsed_s": round(time.perf_counter() - t0, 3),
+        }
+    return results
+
+
+def bench_rule_engine_memory(users: int, words_per_user: int, llm_rules_per_user: int) -> Dict:
+    """Measure memory retained per configured user in ``RuleEngine``."""
+    from core.base_agent import BaseAgent
+    from rules.rule_engine import ForbiddenWordsRule, LLMBasedRule, RuleEngine
+
+    agent = BaseAgent(model="benchmark", api_key="benchmark")
+    words = word_list(words_per_user)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    engine = RuleEngine()
+    for i in range(users):
+        rules = [ForbiddenWordsRule(words)]
+        rules.extend(
+            LLMBasedRule(agent=agent, rule_description=f"Synthetic rule {r} for user {i}",
+                         rule_name=f"Rule {r}")
+            for r in range(llm_rules_per_user)
+        )
+        engine.add_user_rules(str(i), rules)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "users": users,
+        "words_per_user": words_per_user,
+        "llm_rules_per_user": llm_rules_per_user,
+        "retained_bytes": retained,
+        "bytes_per_user": round(retained / users, 1) if users else 0.0,
+    }
+
+
+def main():
+    """CLI entry point for the micro-benchmarks."""
+    parser = argparse.ArgumentParser(description="Rule engine and storage micro-benchmarks")
+    parser.add_argument('--casts', type=int, default=100_000, help='Synthetic casts for rule matching')
+    parser.add_argument('--word-lists', default="10,100,1000,10000",
+                        help='Comma-separated forbidden word list sizes')
+    parser.add_argument('--max-seconds', type=float,
+                        help='Time budget per rule matching case (default: evaluate every cast)')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows in the violations table')
+    parser.add_argument('--authors', type=int, default=1000, help='Distinct authors in the table')
+    parser.add_argument('--single-inserts', type=int, default=1000, help='Rows inserted one by one')
+    parser.add_argument('--reads', type=int, default=50, help='Per-author reads')
+    parser.add_argument('--memory-users', type=int, default=1000, help='Users configured for memory test')
+    parser.add_argument('--memory-words', type=int, default=50, help='Forbidden words per user')
+    parser.add_argument('--memory-llm-rules', type=int, default=2, help='LLM rules per user')
+    parser.add_argument('--only', choices=["rules", "storage", "memory"], action='append',
+                        help='Run only the given suite (repeatable)')
+    parser.add_argument('--seed', type=int, default=1234, help='Random seed')
+    parser.add_argument('--output', '-o', help='Path to output JSON file (default: stdout)')
+    parser.add_argument('--baseline', '-b', help='Previous results file to compare against')
+    args = parser.parse_args()
+
+    suites = set(args.only or ["rules", "storage", "memory"])
+    benchmarks = {}
+    if "rules" in suites:
+        posts = SyntheticCastGenerator(seed=args.seed).posts(args.casts)
+        sizes = [int(s) for s in args.word_lists.split(",") if s.strip()]
+        benchmarks["rule_matching"] = bench_rule_matching(posts, sizes, args.max_seconds)
+    if "storage" in suites:
+        benchmarks["storage"] = bench_storage(args.rows, args.authors, args.single_inserts, args.reads)
+    if "memory" in suites:
+        benchmarks["rule_engine_memory"] = bench_rule_engine_memory(
+            args.memory_users, args.memory_words, args.memory_llm_rules)
+
+    results = {"config": vars(args), "benchmarks": benchmarks}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        results["comparison"] = compare_to_baseline(benchmarks, baseline.get("benchmarks", {}))
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Latency statistics and result output shared by the benchmarks."""
+import json
+import math
+import platform
+import sys
+from datetime import datetime
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(latencies_s: List[float], wall_time_s: float | None = None,
+                        errors: int = 0) -> Dict:
+    """Summarize a list of per-operation latencies.
+
+    Args:
+        latencies_s: Latency of each operation in seconds
+        wall_time_s: Total elapsed time; defaults to the sum of latencies
+        errors: Number of failed operations
+
+    Returns:
+        Dictionary with count, throughput and latency percentiles in milliseconds
+    """
+    values = sorted(latencies_s)
+    wall = wall_time_s if wall_time_s is not None else sum(values)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "wall_time_s": round(wall, 4),
+        "throughput_per_s": round(count / wall, 2) if wall > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(sum(values) / count * 1000, 3) if count else 0.0,
+            "p50": round(percentile(values, 50) * 1000, 3),
+            "p95": round(percentile(values, 95) * 1000, 3),
+            "p99": round(percentile(values, 99) * 1000, 3),
+            "max": round(values[-1] * 1000, 3) if values else 0.0,
+        },
+    }
+
+
+# Metric name suffixes where a larger value is an improvement; for any other
+# compared metric (latencies, elapsed times, bytes) smaller is better.
+_HIGHER_IS_BETTER = ("per_s",)
+_COMPARED_SUFFIXES = ("per_s", "_ms", "elapsed_s", "us_per_cast", "bytes", "bytes_per_user",
+                      "p50", "p95", "p99", "mean", "max")
+
+
+def _flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare_to_baseline(current: Dict, baseline: Dict) -> Dict[str, Dict]:
+    """Compare benchmark metrics present in both result trees.
+
+    Args:
+        current: ``benchmarks`` section of the current run
+        baseline: ``benchmarks`` section of the baseline run
+
+    Returns:
+        Mapping of dotted metric path to baseline, current, relative change
+        and whether the change is an improvement
+    """
+    now, before = _flatten(current), _flatten(baseline)
+    comparison = {}
+    for path in sorted(now.keys() & before.keys()):
+        if not path.endswith(_COMPARED_SUFFIXES) or not before[path]:
+            continue
+        change = (now[path] - before[path]) / before[path]
+        higher_is_better = path.endswith(_HIGHER_IS_BETTER)
+        comparison[path] = {
+            "baseline": before[path],
+            "current": now[path],
+            "change_pct": round(change * 100, 2),
+            "improved": change > 0 if higher_is_better else change < 0,
+        }
+    return comparison
+
+
+def write_results(results: Dict, output: str | None) -> None:
+    """Attach run metadata and write results as JSON to a file or stdout."""
+    document = {
+        "generated_at": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        **results,
+    }
+    text = json.dumps(document, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        print(f"Results written to: {output}")
+    else:
+        print(text)
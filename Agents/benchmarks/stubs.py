@@ -0,0 +1,185 @@
+"""Local HTTP stand-ins for the Neynar and OpenRouter APIs.
+
+Both servers run in a background thread on an ephemeral localhost port and
+support configurable latency and error rates, so the full fetch → rules → LLM
+→ database path can be exercised offline.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+from .synthetic import SyntheticCastGenerator
+
+
+class _StubServer:
+    """Base class running a ThreadingHTTPServer in a daemon thread."""
+
+    def __init__(self, latency_s: float = 0.0, error_rate: float = 0.0, seed: int = 1234):
+        self.latency_s = latency_s
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "_StubServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Buffer headers and body into one write to avoid Nagle stalls
+            wbufsize = -1
+
+            def do_GET(self):
+                stub._dispatch(self, "GET")
+
+            def do_POST(self):
+                stub._dispatch(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        with self._lock:
+            self.request_count += 1
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.error_count += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        if fail:
+            status, payload = 500, {"message": "stub injected error"}
+        else:
+            status, payload = self.handle(method, urlparse(handler.path), body)
+
+        data = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def handle(self, method: str, url, body: bytes) -> tuple[int, Dict]:
+        raise NotImplementedError
+
+
+class StubNeynarServer(_StubServer):
+    """Serves ``GET /feed/user/casts`` and ``GET /feed`` (fids filter) from synthetic casts."""
+
+    def __init__(self, casts_per_user: int = 100, generator: SyntheticCastGenerator | None = None,
+                 **kwargs):
+        """Initialize the stub.
+
+        Args:
+            casts_per_user: Number of casts each FID has in its feed
+            generator: Cast generator (default: seeded SyntheticCastGenerator)
+            **kwargs: latency_s, error_rate and seed, see _StubServer
+        """
+        super().__init__(**kwargs)
+        self.casts_per_user = casts_per_user
+        self.generator = generator or SyntheticCastGenerator()
+        self._feeds: Dict[int, List[Dict]] = {}
+
+    @property
+    def base_url(self) -> str:
+        return super().base_url + "/v2/farcaster"
+
+    def _feed(self, fid: int) -> List[Dict]:
+        with self._lock:
+            if fid not in self._feeds:
+                self._feeds[fid] = self.generator.casts_for_user(fid, self.casts_per_user)
+            return self._feeds[fid]
+
+    def handle(self, method, url, body):
+        query = parse_qs(url.query)
+        if method == "GET" and url.path.endswith("/feed/user/casts"):
+            feed = self._feed(int(query.get("fid", ["0"])[0]))
+        elif method == "GET" and url.path.endswith("/feed") and query.get("filter_type") == ["fids"]:
+            fids = [int(f) for f in query.get("fids", [""])[0].split(",") if f]
+            if len(fids) > 100:
+                return 400, {"message": "at most 100 fids per request"}
+            feed = sorted((c for fid in fids for c in self._feed(fid)),
+                          key=lambda c: c["timestamp"], reverse=True)
+        else:
+            return 404, {"message": f"unknown endpoint {url.path}"}
+        limit = int(query.get("limit", ["25"])[0])
+        offset = int(query.get("cursor", ["0"])[0] or 0)
+        page = feed[offset:offset + limit]
+        next_offset = offset + limit
+        cursor = str(next_offset) if next_offset < len(feed) else None
+        return 200, {"casts": page, "next": {"cursor": cursor}}
+
+
+class StubOpenRouterServer(_StubServer):
+    """Serves ``POST /chat/completions`` with OpenAI-format JSON verdicts."""
+
+    def __init__(self, violation_rate: float = 0.1, **kwargs):
+        """Initialize the stub.
+
+        Args:
+            violation_rate: Fraction of completions answering ``violates: true``
+            **kwargs: latency_s, error_rate and seed, see _StubServer
+        """
+        super().__init__(**kwargs)
+        self.violation_rate = violation_rate
+
+    @property
+    def base_url(self) -> str:
+        return super().base_url + "/api/v1"
+
+    def handle(self, method, url, body):
+        if method != "POST" or not url.path.endswith("/chat/completions"):
+            return 404, {"message": f"unknown endpoint {url.path}"}
+        request = json.loads(body or b"{}")
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in request.get("messages", []))
+        with self._lock:
+            violates = self._rng.random() < self.violation_rate
+        content = json.dumps({"violates": violates, "reason": "stub verdict"})
+        return 200, {
+            "id": "stub-completion",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_chars // 4 + len(content) // 4,
+            },
+        }
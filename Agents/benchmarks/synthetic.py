@@ -0,0 +1,89 @@
+"""Synthetic Farcaster cast generator for benchmarks."""
+import hashlib
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+_VOCABULARY = (
+    "gm frame base onchain mint wallet builders shipping today looks great "
+    "thinking about the new protocol upgrade cast channel follow reply thread "
+    "launch token airdrop community hackathon demo weekend coffee music song "
+    "love hate honestly really tired again why does this keep happening"
+).split()
+
+DEFAULT_FORBIDDEN_WORDS = ["spam", "scam", "kinda", "dunno"]
+
+
+class SyntheticCastGenerator:
+    """Deterministic generator of casts in the Neynar REST response format."""
+
+    def __init__(self, seed: int = 1234, words_per_cast: tuple[int, int] = (6, 40),
+                 forbidden_words: List[str] | None = None, violation_rate: float = 0.1):
+        """Initialize the generator.
+
+        Args:
+            seed: Random seed, so runs are comparable
+            words_per_cast: Inclusive (min, max) number of words per cast
+            forbidden_words: Words injected into violating casts
+            violation_rate: Fraction of casts containing a forbidden word
+        """
+        self.seed = seed
+        self.words_per_cast = words_per_cast
+        self.forbidden_words = forbidden_words or DEFAULT_FORBIDDEN_WORDS
+        self.violation_rate = violation_rate
+
+    def text(self, rng: random.Random) -> str:
+        """Generate the text of a single cast."""
+        words = rng.choices(_VOCABULARY, k=rng.randint(*self.words_per_cast))
+        if self.forbidden_words and rng.random() < self.violation_rate:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(self.forbidden_words))
+        return " ".join(words)
+
+    def casts_for_user(self, fid: int, count: int, days: int = 7,
+                       now: datetime | None = None) -> List[Dict]:
+        """Generate casts for one user, newest first.
+
+        Args:
+            fid: Author FID
+            count: Number of casts
+            days: Casts are spread evenly over this many days
+            now: Reference time (default: current UTC time)
+
+        Returns:
+            List of raw cast dictionaries as returned by Neynar
+        """
+        rng = random.Random(f"{self.seed}:{fid}")
+        now = now or datetime.now(timezone.utc)
+        step = timedelta(days=days) / max(1, count)
+        casts = []
+        for i in range(count):
+            created = now - step * i
+            digest = hashlib.sha1(f"{self.seed}:{fid}:{i}".encode()).hexdigest()
+            casts.append({
+                "hash": f"0x{digest[:40]}",
+                "author": {"fid": fid},
+                "text": self.text(rng),
+                "timestamp": created.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            })
+        return casts
+
+    def posts(self, count: int, authors: int = 100) -> List[Dict]:
+        """Generate already formatted post dictionaries, as used by the rule engine.
+
+        Args:
+            count: Number of posts
+            authors: Number of distinct author ids to spread posts over
+
+        Returns:
+            List of post dictionaries
+        """
+        rng = random.Random(self.seed)
+        return [
+            {
+                "post_id": f"0x{i:040x}",
+                "author_id": str(i % authors + 1),
+                "content": self.text(rng),
+                "timestamp": "2025-10-22T15:30:00.000Z",
+            }
+            for i in range(count)
+        ]
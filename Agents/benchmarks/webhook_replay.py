@@ -0,0 +1,109 @@
+"""Replay signed Neynar webhook events against a running API server.
+
+Events come from a JSONL file (one webhook payload per line) or are generated
+from synthetic casts. Each one is signed like Neynar does and POSTed to the
+webhook endpoint; per-request latency and status codes are reported. Run from
+the Agents directory:
+
+    python -m benchmarks.webhook_replay --secret s3cret --synthetic-users 5 --casts 20
+    python -m benchmarks.webhook_replay --secret s3cret --events events.jsonl --rate 50
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.stats import summarize_latencies, write_results
+from benchmarks.synthetic import DEFAULT_FORBIDDEN_WORDS, SyntheticCastGenerator
+from connectors.neynar_webhook import CAST_CREATED, SIGNATURE_HEADER, sign_payload
+
+
+def synthetic_events(users: int, casts: int, seed: int, first_fid: int = 1000) -> Iterator[Dict]:
+    """Generate ``cast.created`` events for synthetic users."""
+    generator = SyntheticCastGenerator(seed=seed)
+    for i in range(users):
+        for cast in generator.casts_for_user(first_fid + i, casts):
+            yield {"created_at": int(time.time()), "type": CAST_CREATED, "data": cast}
+
+
+def file_events(path: str) -> Iterator[Dict]:
+    """Read webhook events from a JSONL file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    """CLI entry point for the webhook replayer."""
+    parser = argparse.ArgumentParser(description="Replay signed Neynar webhook events")
+    parser.add_argument('--url', default="http://localhost:5000", help='API server base URL')
+    parser.add_argument('--secret', required=True, help='Webhook signing secret')
+    parser.add_argument('--events', help='JSONL file of webhook payloads')
+    parser.add_argument('--synthetic-users', type=int, default=5, help='Users for generated events')
+    parser.add_argument('--casts', type=int, default=20, help='Generated casts per user')
+    parser.add_argument('--configure', action='store_true',
+                        help='Configure forbidden word rules for the generated users first')
+    parser.add_argument('--rate', type=float, default=0.0, help='Events per second (0 = unthrottled)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent senders')
+    parser.add_argument('--seed', type=int, default=1234, help='Random seed')
+    parser.add_argument('--output', '-o', help='Path to output JSON file (default: stdout)')
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip("/")
+    if args.configure and not args.events:
+        users = [{"user_id": str(1000 + i), "forbidden_words": DEFAULT_FORBIDDEN_WORDS}
+                 for i in range(args.synthetic_users)]
+        requests.post(f"{base_url}/api/configure", json={"users": users}).raise_for_status()
+
+    events: List[Dict] = list(file_events(args.events) if args.events
+                              else synthetic_events(args.synthetic_users, args.casts, args.seed))
+    session = requests.Session()
+    statuses: Counter = Counter()
+
+    def send(event: Dict) -> float:
+        body = json.dumps(event).encode("utf-8")
+        headers = {"Content-Type": "application/json", SIGNATURE_HEADER: sign_payload(body, args.secret)}
+        t0 = time.perf_counter()
+        try:
+            status = session.post(f"{base_url}/api/webhooks/neynar", data=body, headers=headers).status_code
+        except requests.RequestException:
+            status = 0
+        statuses[status] += 1
+        return time.perf_counter() - t0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        futures = []
+        for i, event in enumerate(events):
+            if args.rate > 0:
+                delay = started + i / args.rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(pool.submit(send, event))
+        latencies = [f.result() for f in futures]
+    wall = time.perf_counter() - started
+
+    errors = sum(n for status, n in statuses.items() if status == 0 or status >= 400)
+    results = {
+        "config": vars(args),
+        "replay": summarize_latencies(latencies, wall, errors),
+        "status_codes": {str(k): v for k, v in sorted(statuses.items())},
+    }
+    try:
+        results["server_stats"] = session.get(f"{base_url}/api/webhooks/neynar/stats").json().get("stats")
+    except (requests.RequestException, ValueError):
+        pass
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
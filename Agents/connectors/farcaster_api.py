@@ -1,8 +1,38 @@
 """Farcaster API connector using Neynar."""
-import requests
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict
-from core.settings import get_neynar_api_key
+from typing import Dict, Iterator, List
+from core.deadline import DeadlineExceeded, current_deadline
+from core.log import get_logger
+from core.models import Post
+from core.settings import get_neynar_api_key, get_neynar_base_url, get_neynar_feed_chunk_size
+
+logger = get_logger("farcaster_api")
+
+# Seconds a Neynar request may take; shortened to the time left under a request deadline
+REQUEST_TIMEOUT_S = 30.0
+
+
+def format_cast(cast: Dict) -> Post:
+    """Convert a raw Neynar cast object into a post record.
+
+    Args:
+        cast: Cast object as returned by the Neynar API or webhooks
+
+    Returns:
+        Post with post_id, author_id, content and timestamp
+    """
+    return Post(
+        post_id=cast['hash'],
+        author_id=str(cast['author']['fid']),
+        content=cast['text'],
+        timestamp=cast['timestamp']
+    )
+
+
+def _cast_time(cast: Dict) -> datetime:
+    """Parse a cast's ISO timestamp into a naive datetime."""
+    return datetime.fromisoformat(cast['timestamp'].replace('Z', '+00:00')).replace(tzinfo=None)
 
 
 class FarcasterAPI:
@@ -14,47 +44,214 @@ class FarcasterAPI:
         Args:
             api_key: Neynar API key. If None, reads from settings.
         """
-        self.api_key = api_key or get_neynar_api_key()
-        self.base_url = "https://api.neynar.com/v2/farcaster"
+        self._api_key = api_key
+        self.base_url = get_neynar_base_url()
+        self._session = None
+        self._session_lock = threading.Lock()
     
-    def get_user_casts(self, fid: int, days: int = 7, limit: int = 150) -> List[Dict]:
-        """Fetch casts for a Farcaster ID (fid).
+    @property
+    def api_key(self) -> str:
+        """Neynar API key, read from settings on first use if not given."""
+        if self._api_key is None:
+            self._api_key = get_neynar_api_key()
+        return self._api_key
+    
+    @property
+    def session(self):
+        """Shared HTTP session (keep-alive), created and ``requests`` imported on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    self._session = requests.Session()
+        return self._session
+    
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "accept": "application/json",
+            "x-api-key": self.api_key
+        }
+    
+    def _get_json(self, url: str, params: Dict) -> Dict:
+        """GET a Neynar endpoint within the request deadline, if any.
+        
+        Raises:
+            DeadlineExceeded: The deadline passed before or during the request
+            requests.RequestException: The request failed
+        """
+        deadline = current_deadline()
+        timeout = REQUEST_TIMEOUT_S
+        if deadline is not None:
+            deadline.check("fetching casts")
+            timeout = deadline.timeout(REQUEST_TIMEOUT_S)
+        try:
+            response = self.session.get(url, headers=self._headers(), params=params, timeout=timeout)
+            response.raise_for_status()
+        except Exception as e:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded("deadline passed while fetching casts") from e
+            raise
+        return response.json()
+    
+    def iter_user_casts(self, fid: int, days: int = 7, limit: int = 150,
+                        page_size: int = 150) -> Iterator[Post]:
+        """Stream a user's casts page by page, newest first.
+        
+        Only one page is held at a time. Pagination stops at ``limit`` casts
+        or once a page reaches casts older than the look-back window.
         
         Args:
             fid: Farcaster user ID
             days: Number of days to look back
-            limit: Maximum number of casts to retrieve
+            limit: Maximum number of casts to yield
+            page_size: Casts per request (Neynar allows up to 150)
             
-        Returns:
-            List of formatted post dictionaries
+        Yields:
+            Post records
         """
         url = f"{self.base_url}/feed/user/casts"
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
         params = {
             "fid": fid,
-            "limit": limit
+            "limit": max(1, min(page_size, limit))
         }
+        time_threshold = datetime.now() - timedelta(days=days)
+        yielded = 0
+        pages = 0
+        
+        while yielded < limit:
+            logger.debug("Fetching casts", extra={"fid": fid, "limit": params["limit"], "page": pages + 1})
+            data = self._get_json(url, params)
+            pages += 1
+            
+            casts = data.get("casts", [])
+            reached_threshold = False
+            for cast in casts:
+                if _cast_time(cast) < time_threshold:
+                    reached_threshold = True
+                    continue
+                if yielded < limit:
+                    yielded += 1
+                    yield format_cast(cast)
+            
+            cursor = (data.get("next") or {}).get("cursor")
+            if not casts or not cursor or reached_threshold:
+                break
+            params["cursor"] = cursor
+        
+        logger.debug("Fetched casts", extra={"fid": fid, "casts": yielded, "pages": pages, "days": days})
+    
+    def get_user_casts(self, fid: int, days: int = 7, limit: int = 150) -> List[Post]:
+        """Fetch casts for a Farcaster ID (fid).
+        
+        Args:
+            fid: Farcaster user ID
+            days: Number of days to look back
+            limit: Maximum number of casts to retrieve
+            
+        Returns:
+            List of post records
+        """
+        return list(self.iter_user_casts(fid, days=days, limit=limit))
+    
+    def iter_feed_pages(
+        self,
+        fids: List[int],
+        days: int = 7,
+        limit: int = 150,
+        chunk_size: int | None = None,
+        page_size: int = 100
+    ) -> Iterator[List[Post]]:
+        """Stream recent casts of many FIDs with the filtered feed endpoint.
         
-        print(f"Fetching casts for Farcaster user FID: {fid} via REST API...")
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
+        FIDs are requested in chunks, each as one paginated feed filtered to
+        those FIDs, instead of one request per user. Pagination stops once a
+        page reaches casts older than the look-back window. Each yielded page
+        is released before the next one is fetched.
         
-        formatted_posts = []
+        Args:
+            fids: Farcaster user IDs
+            days: Number of days to look back
+            limit: Maximum number of casts kept per user
+            chunk_size: FIDs per feed request. If None, reads from settings.
+            page_size: Casts per page (Neynar allows up to 100)
+            
+        Yields:
+            Lists of post records, one per fetched page
+        """
+        url = f"{self.base_url}/feed"
+        chunk_size = max(1, chunk_size or get_neynar_feed_chunk_size())
         time_threshold = datetime.now() - timedelta(days=days)
         
-        for cast in data.get("casts", []):
-            cast_timestamp = datetime.fromisoformat(cast['timestamp'].replace('Z', '+00:00'))
-            if cast_timestamp.replace(tzinfo=None) >= time_threshold:
-                formatted_posts.append({
-                    "post_id": cast['hash'],
-                    "author_id": str(cast['author']['fid']),
-                    "content": cast['text'],
-                    "timestamp": cast['timestamp']
-                })
-        
-        print(f"Found and filtered {len(formatted_posts)} casts from the last {days} days.")
-        return formatted_posts
+        for start in range(0, len(fids), chunk_size):
+            chunk = fids[start:start + chunk_size]
+            # Casts kept per author; a counter instead of the casts themselves
+            kept = {str(fid): 0 for fid in chunk}
+            params = {
+                "feed_type": "filter",
+                "filter_type": "fids",
+                "fids": ",".join(str(fid) for fid in chunk),
+                "limit": page_size
+            }
+            pages = 0
+            while True:
+                data = self._get_json(url, params)
+                pages += 1
+                
+                casts = data.get("casts", [])
+                reached_threshold = False
+                page = []
+                for cast in casts:
+                    if _cast_time(cast) < time_threshold:
+                        reached_threshold = True
+                        continue
+                    author_id = str(cast['author']['fid'])
+                    if kept.get(author_id, 0) < limit:
+                        kept[author_id] = kept.get(author_id, 0) + 1
+                        page.append(format_cast(cast))
+                if page:
+                    yield page
+                
+                cursor = (data.get("next") or {}).get("cursor")
+                chunk_full = all(kept[str(fid)] >= limit for fid in chunk)
+                if not casts or not cursor or reached_threshold or chunk_full:
+                    break
+                params["cursor"] = cursor
+            
+            logger.debug("Fetched feed chunk", extra={"fids": len(chunk), "pages": pages})
+    
+    def get_casts_for_fids(
+        self,
+        fids: List[int],
+        days: int = 7,
+        limit: int = 150,
+        chunk_size: int | None = None,
+        page_size: int = 100
+    ) -> Dict[str, List[Post]]:
+        """Fetch recent casts for many FIDs with the filtered feed endpoint.
+        
+        Collects ``iter_feed_pages``; prefer streaming the pages when the
+        result does not need to be held at once.
+        
+        Args:
+            fids: Farcaster user IDs
+            days: Number of days to look back
+            limit: Maximum number of casts kept per user
+            chunk_size: FIDs per feed request. If None, reads from settings.
+            page_size: Casts per page (Neynar allows up to 100)
+            
+        Returns:
+            Dictionary mapping author_id to post records, newest first;
+            every requested FID has an entry
+        """
+        posts_by_author: Dict[str, List[Post]] = {str(fid): [] for fid in fids}
+        for page in self.iter_feed_pages(fids, days=days, limit=limit, chunk_size=chunk_size,
+                                         page_size=page_size):
+            for post in page:
+                posts_by_author.setdefault(post.author_id, []).append(post)
+        
+        logger.debug("Fetched casts for FIDs", extra={
+            "fids": len(fids),
+            "casts": sum(len(posts) for posts in posts_by_author.values()),
+            "days": days
+        })
+        return posts_by_author
@@ -0,0 +1,56 @@
+"""Neynar webhook verification and event parsing."""
+import hashlib
+import hmac
+from typing import Dict, Iterable
+
+from .farcaster_api import format_cast
+
+SIGNATURE_HEADER = "X-Neynar-Signature"
+CAST_CREATED = "cast.created"
+
+
+def sign_payload(body: bytes, secret: str) -> str:
+    """Compute the signature Neynar sends for a webhook body.
+
+    Args:
+        body: Raw request body
+        secret: Webhook signing secret
+
+    Returns:
+        Hex-encoded HMAC-SHA512 digest
+    """
+    return hmac.new(secret.encode("utf-8"), body, hashlib.sha512).hexdigest()
+
+
+def verify_signature(body: bytes, signature: str | None, secrets: Iterable[str]) -> bool:
+    """Check a webhook body against its signature header.
+
+    Args:
+        body: Raw request body, exactly as received
+        signature: Value of the X-Neynar-Signature header
+        secrets: Accepted signing secrets (several may be active during rotation)
+
+    Returns:
+        True if the signature matches one of the secrets
+    """
+    if not signature:
+        return False
+    signature = signature.strip().lower()
+    return any(hmac.compare_digest(sign_payload(body, secret), signature) for secret in secrets)
+
+
+def parse_cast_event(event: Dict) -> Dict | None:
+    """Extract the post from a ``cast.created`` webhook event.
+
+    Args:
+        event: Decoded webhook payload
+
+    Returns:
+        Post dictionary, or None for other event types and malformed casts
+    """
+    if event.get("type") != CAST_CREATED:
+        return None
+    try:
+        return format_cast(event["data"])
+    except (KeyError, TypeError):
+        return None
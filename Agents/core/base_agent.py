@@ -1,8 +1,16 @@
 """Base agent class for LLM interactions."""
 import json
+import threading
 import time
-from openai import OpenAI
-from .settings import get_fast_model, get_fallback_models
+from .components import get_llm_scheduler, get_token_ledger
+from .deadline import DeadlineExceeded, current_deadline
+from .log import get_logger
+from .settings import get_fast_model, get_fallback_models, get_openrouter_base_url
+
+logger = get_logger("llm")
+
+# Raw LLM output is only logged at DEBUG, and only this much of it
+_RAW_RESPONSE_LOG_CHARS = 500
 
 
 class BaseAgent:
@@ -30,12 +38,9 @@ class BaseAgent:
         except Exception:
             self.retry_delays_s = [15.0, 20.0]
 
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key,
-            timeout=self.request_timeout_s,
-            max_retries=self.max_retries,
-        )
+        self.api_key = api_key
+        self._client = None
+        self._client_lock = threading.Lock()
         # If no model is provided, default to the centrally configured fast model
         self.model = model or get_fast_model()
         self.extra_headers = {}
@@ -43,44 +48,105 @@ class BaseAgent:
             self.extra_headers["HTTP-Referer"] = site_url
         if site_name:
             self.extra_headers["X-Title"] = site_name
+        # OpenRouter reports each call's cost in ``usage`` when asked to
+        self.extra_body = {"usage": {"include": True}} if "openrouter.ai" in get_openrouter_base_url() else {}
+
+    @property
+    def client(self):
+        """OpenAI-compatible client, created (and ``openai`` imported) on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(
+                        base_url=get_openrouter_base_url(),
+                        api_key=self.api_key,
+                        timeout=self.request_timeout_s,
+                        max_retries=self.max_retries,
+                    )
+        return self._client
+
+    def _send_llm_request(self, messages: list[dict], user_id: str | None = None,
+                          rule: str | None = None) -> dict | None:
+        """Sends a request to the LLM and returns a parsed JSON object.
 
-    def _send_llm_request(self, messages: list[dict]) -> dict | None:
-        """Sends a request to the LLM and returns a parsed JSON object."""
+        Each attempt waits for a slot from the shared LLM scheduler, in the
+        priority class of the calling context, queued fairly per ``user_id``.
+        Under a request deadline, request timeouts and retry delays are fitted
+        into the time left. The token usage of every answered attempt is
+        added to the shared token ledger under ``rule``, the model and
+        ``user_id``.
+        
+        Raises:
+            DeadlineExceeded: The request deadline passed before an answer
+        """
         response_content = None
         models_to_try: list[str] = [self.model] + [m for m in get_fallback_models() if m and m != self.model]
         last_error: Exception | None = None
+        deadline = current_deadline()
         
         for idx, model_name in enumerate(models_to_try, start=1):
             if idx > 1:
-                print(f"Retrying with fallback model {idx-1}: {model_name}")
+                logger.warning("Retrying with fallback model", extra={"fallback_index": idx - 1, "model": model_name})
 
             attempts = max(1, int(self.attempts_per_model or 1))
             for attempt in range(1, attempts + 1):
+                request_options = {}
+                if self.extra_body:
+                    request_options["extra_body"] = self.extra_body
+                if deadline is not None:
+                    deadline.check("LLM request")
+                    request_options["timeout"] = deadline.timeout(self.request_timeout_s)
                 try:
-                    completion = self.client.chat.completions.create(
-                        extra_headers=self.extra_headers,
-                        model=model_name,
-                        messages=messages,
-                        response_format={"type": "json_object"},
-                    )
+                    with get_llm_scheduler().slot(user_id):
+                        started = time.perf_counter()
+                        completion = self.client.chat.completions.create(
+                            extra_headers=self.extra_headers,
+                            model=model_name,
+                            messages=messages,
+                            response_format={"type": "json_object"},
+                            **request_options,
+                        )
+                        latency_s = time.perf_counter() - started
+                    # Tokens are billed even if the answer turns out unusable
+                    get_token_ledger().record(rule, model_name, user_id, getattr(completion, "usage", None),
+                                              latency_s)
                     response_content = completion.choices[0].message.content
                     if not response_content:
-                        print("LLM returned empty content.")
+                        logger.warning("LLM returned empty content", extra={"model": model_name})
                         raise ValueError("empty content")
                     return json.loads(response_content)
+                except DeadlineExceeded:
+                    raise
                 except json.JSONDecodeError as e:
                     last_error = e
-                    print(f"Error decoding LLM response from {model_name} (attempt {attempt}/{attempts}): {e}\nRaw response: {response_content}")
+                    logger.warning(
+                        "Error decoding LLM response",
+                        extra={"model": model_name, "attempt": attempt, "attempts": attempts, "error": str(e)},
+                    )
+                    logger.debug(
+                        "Undecodable LLM response",
+                        extra={"model": model_name, "raw_response": (response_content or "")[:_RAW_RESPONSE_LOG_CHARS]},
+                    )
                 except Exception as e:
                     last_error = e
-                    err_str = str(e)
-                    print(f"LLM request failed on {model_name} (attempt {attempt}/{attempts}): {err_str}")
+                    logger.warning(
+                        "LLM request failed",
+                        extra={"model": model_name, "attempt": attempt, "attempts": attempts, "error": str(e)},
+                    )
 
                 # If more attempts remain for this model, wait before retrying
                 if attempt < attempts:
                     delay_idx = min(attempt - 1, max(0, len(self.retry_delays_s) - 1))
                     delay_s = float(self.retry_delays_s[delay_idx]) if self.retry_delays_s else 15.0
-                    print(f"Waiting {delay_s:.0f}s before retrying model {model_name}...")
+                    if deadline is not None and delay_s >= deadline.remaining():
+                        logger.warning("No time left to retry LLM request", extra={
+                            "model": model_name,
+                            "delay_s": delay_s,
+                            "remaining_s": round(deadline.remaining(), 1),
+                        })
+                        raise DeadlineExceeded("deadline passed before the LLM request could be retried")
+                    logger.info("Waiting before retrying model", extra={"model": model_name, "delay_s": delay_s})
                     try:
                         time.sleep(delay_s)
                     except Exception:
@@ -88,18 +154,28 @@ class BaseAgent:
                 else:
                     break
                     
-        # Exhausted all models
+        # Exhausted all models; if the deadline cut them short the post is unevaluated, not clean
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded("deadline passed during the LLM request")
         if last_error:
-            print(f"All model attempts failed. Last error: {last_error}")
+            logger.error("All model attempts failed", extra={"error": str(last_error)})
         return None
 
-    def safe_llm_json(self, messages: list[dict], fallback: dict | list | None = None) -> dict | list | None:
-        """Helper: never raise, always return JSON or fallback."""
+    def safe_llm_json(self, messages: list[dict], fallback: dict | list | None = None,
+                      user_id: str | None = None, rule: str | None = None) -> dict | list | None:
+        """Helper: return JSON or fallback, raising only ``DeadlineExceeded``.
+        
+        A passed request deadline is raised rather than answered with the
+        fallback, so callers can tell an unevaluated post from a clean one.
+        ``rule`` labels the call's token usage.
+        """
         try:
-            result = self._send_llm_request(messages)
+            result = self._send_llm_request(messages, user_id=user_id, rule=rule)
             if result is None:
                 return fallback if fallback is not None else {}
             return result
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            print(f"safe_llm_json error: {e}")
+            logger.exception("safe_llm_json error")
             return fallback if fallback is not None else {}
@@ -0,0 +1,96 @@
+"""Lazily created, process-wide shared components.
+
+The LLM agent, the LLM request scheduler, the token ledger, the Neynar
+connector, the violations database and the near-duplicate verdict index are
+created on first use and then shared by every monitor and API instance in
+the process. Heavy third-party modules (``openai``, ``requests``) are only
+imported when a component that needs them is first used, so read-only
+entry points never load the LLM stack.
+"""
+import threading
+from typing import Callable, Dict, Tuple
+
+_lock = threading.RLock()
+_instances: Dict[Tuple, object] = {}
+
+
+def _get_or_create(key: Tuple, factory: Callable[[], object]):
+    instance = _instances.get(key)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(key)
+            if instance is None:
+                instance = factory()
+                _instances[key] = instance
+    return instance
+
+
+def get_agent():
+    """Get the shared BaseAgent, configured from settings."""
+    from .base_agent import BaseAgent
+    from .settings import get_openrouter_api_key
+
+    return _get_or_create(("agent",), lambda: BaseAgent(model=None, api_key=get_openrouter_api_key()))
+
+
+def get_llm_scheduler():
+    """Get the shared LLM request scheduler."""
+    from .llm_scheduler import LLMScheduler
+
+    return _get_or_create(("llm_scheduler",), LLMScheduler)
+
+
+def get_token_ledger():
+    """Get the shared ledger of LLM token usage."""
+    from .token_usage import TokenLedger
+
+    return _get_or_create(("token_ledger",), TokenLedger)
+
+
+def get_profiler():
+    """Get the shared profiler, configured from settings (off unless PROFILE_DIR is set)."""
+    from .profiling import Profiler
+
+    return _get_or_create(("profiler",), Profiler)
+
+
+def get_farcaster_api():
+    """Get the shared Neynar connector."""
+    from connectors.farcaster_api import FarcasterAPI
+
+    return _get_or_create(("farcaster_api",), FarcasterAPI)
+
+
+def get_verdict_index():
+    """Get the shared near-duplicate verdict index."""
+    from rules.near_duplicate import NearDuplicateIndex
+
+    return _get_or_create(("verdict_index",), NearDuplicateIndex)
+
+
+def get_database(db_path: str | None = None):
+    """Get the shared ViolationsDatabase for a path (default: settings path)."""
+    from database.violations_db import ViolationsDatabase
+    from .settings import get_database_path
+
+    path = db_path or get_database_path()
+    return _get_or_create(("database", path), lambda: ViolationsDatabase(path))
+
+
+def get_cast_store(db_path: str | None = None):
+    """Get the shared CastStore for a path (default: settings path)."""
+    from database.cast_store import CastStore
+    from .settings import get_database_path
+
+    path = db_path or get_database_path()
+    return _get_or_create(("cast_store", path), lambda: CastStore(path))
+
+
+def reset_components() -> None:
+    """Forget all shared instances, e.g. after settings changed."""
+    with _lock:
+        for instance in _instances.values():
+            stop_writer = getattr(instance, "stop_writer", None)
+            if stop_writer is not None:
+                stop_writer()
+        _instances.clear()
@@ -0,0 +1,121 @@
+"""Request-level deadlines shared by every stage of a scan.
+
+A deadline is set once per request with ``deadline_scope`` and read from
+the calling context by the stages below it: the Neynar connector, the
+monitor, the rule engine and the LLM agent fit their timeouts and retries
+into the time left and raise ``DeadlineExceeded`` once it is gone, so the
+caller can return partial results instead of hanging.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request's time budget runs out before its work is done."""
+
+
+class Deadline:
+    """A point in time by which a request's work must be finished."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds: float):
+        """Initialize the deadline.
+
+        Args:
+            seconds: Time budget from now
+        """
+        self.expires_at = time.monotonic() + max(0.0, seconds)
+
+    def remaining(self) -> float:
+        """Get the seconds left, 0 once expired."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Check if the time budget is used up."""
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self, limit: float | None) -> float:
+        """Fit a stage's own timeout into the time left.
+
+        Args:
+            limit: The stage's timeout in seconds (None = no own limit)
+
+        Returns:
+            The smaller of the limit and the time left
+        """
+        remaining = self.remaining()
+        return remaining if limit is None else min(limit, remaining)
+
+    def check(self, stage: str = "") -> None:
+        """Raise if the time budget is used up.
+
+        Raises:
+            DeadlineExceeded: The deadline has passed
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"deadline passed{' before ' + stage if stage else ''}")
+
+
+_current: ContextVar[Deadline | None] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[Deadline | None]:
+    """Run a block under a time budget.
+
+    A nested scope can only shorten an enclosing deadline. Context variables
+    are not inherited by plain thread pool workers; submit work with
+    ``contextvars.copy_context().run`` to carry the deadline over.
+
+    Args:
+        seconds: Time budget from now (None or <= 0 = keep an enclosing
+            deadline, if any)
+
+    Yields:
+        The deadline in effect for the block, or None
+    """
+    current = _current.get()
+    if seconds is None or seconds <= 0:
+        yield current
+        return
+    deadline = Deadline(seconds)
+    if current is not None and current.expires_at <= deadline.expires_at:
+        deadline = current
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current_deadline() -> Deadline | None:
+    """Get the deadline of the calling context, if any."""
+    return _current.get()
+
+
+def check_deadline(stage: str = "") -> None:
+    """Raise if the calling context's deadline has passed; no-op without one.
+
+    Raises:
+        DeadlineExceeded: The deadline has passed
+    """
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def time_left(limit: float | None = None) -> float | None:
+    """Fit a timeout into the calling context's deadline.
+
+    Args:
+        limit: The stage's own timeout in seconds (None = no own limit)
+
+    Returns:
+        The smaller of the limit and the time left; the limit unchanged
+        without a deadline
+    """
+    deadline = _current.get()
+    return limit if deadline is None else deadline.timeout(limit)
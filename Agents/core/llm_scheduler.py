@@ -0,0 +1,226 @@
+"""Priority and fairness scheduling of LLM requests.
+
+Every LLM request waits for one of ``LLM_MAX_CONCURRENCY`` process-wide
+slots. Waiting requests are served by priority class first (interactive,
+then fresh casts, then backfill) and round-robin across users within a
+class, so one user's backlog cannot hold up everyone else. The class and
+an optional deadline are taken from the calling context, set with
+``llm_priority``; a request deadline (see ``core.deadline``) also ends the
+wait.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Deque, Dict, Iterator, List
+
+from .deadline import DeadlineExceeded, current_deadline
+from .log import get_logger
+from .settings import get_llm_max_concurrency
+
+logger = get_logger("llm.scheduler")
+
+# Wait times kept per class for the percentile stats
+WAIT_SAMPLES = 1000
+
+
+class Priority(IntEnum):
+    """LLM work classes, most urgent first."""
+    INTERACTIVE = 0
+    FRESH = 1
+    BACKFILL = 2
+
+
+class LLMDeadlineExceeded(DeadlineExceeded):
+    """Raised when a request's deadline passes before it gets an LLM slot."""
+
+
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.BACKFILL)
+_deadline: ContextVar[float | None] = ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def llm_priority(priority: Priority, deadline_s: float | None = None) -> Iterator[None]:
+    """Run a block's LLM requests in a priority class.
+
+    Context variables are not inherited by thread pool workers, so set the
+    priority inside the function a worker runs.
+
+    Args:
+        priority: Class of the block's LLM requests
+        deadline_s: Seconds from now after which requests still waiting for
+            a slot give up (None = keep an enclosing deadline, if any)
+    """
+    priority_token = _priority.set(priority)
+    deadline_token = None
+    if deadline_s is not None:
+        deadline = time.monotonic() + deadline_s
+        current = _deadline.get()
+        deadline_token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        if deadline_token is not None:
+            _deadline.reset(deadline_token)
+        _priority.reset(priority_token)
+
+
+def current_priority() -> Priority:
+    """Get the priority class of the calling context."""
+    return _priority.get()
+
+
+class _Ticket:
+    __slots__ = ("user_id", "priority", "enqueued_at", "granted")
+
+    def __init__(self, user_id: str, priority: Priority, enqueued_at: float):
+        self.user_id = user_id
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        self.granted = False
+
+
+class LLMScheduler:
+    """Grants LLM request slots by priority class and per-user fairness."""
+
+    def __init__(self, max_concurrency: int | None = None):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Requests allowed to run at once. If None, reads from settings.
+        """
+        self.max_concurrency = max(1, max_concurrency or get_llm_max_concurrency())
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        # Per class: user_id -> waiting tickets; users are served in insertion order
+        self._queues: List[OrderedDict[str, Deque[_Ticket]]] = [OrderedDict() for _ in Priority]
+        self._queued = [0] * len(Priority)
+        self._granted = [0] * len(Priority)
+        self._expired = [0] * len(Priority)
+        self._waits: List[Deque[float]] = [deque(maxlen=WAIT_SAMPLES) for _ in Priority]
+
+    @contextmanager
+    def slot(self, user_id: str | None = None) -> Iterator[None]:
+        """Hold an LLM slot for the duration of a block.
+
+        Args:
+            user_id: User the request is made for; users share a class fairly
+
+        Raises:
+            LLMDeadlineExceeded: The context's deadline passed while waiting
+        """
+        deadline = _deadline.get()
+        request_deadline = current_deadline()
+        if request_deadline is not None:
+            deadline = request_deadline.expires_at if deadline is None else min(deadline, request_deadline.expires_at)
+        self._acquire(str(user_id) if user_id is not None else "", _priority.get(), deadline)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._dispatch()
+
+    def _acquire(self, user_id: str, priority: Priority, deadline: float | None) -> None:
+        now = time.monotonic()
+        with self._cond:
+            if self._in_flight < self.max_concurrency and not any(self._queued):
+                self._in_flight += 1
+                self._record_grant(priority, 0.0)
+                return
+
+            ticket = _Ticket(user_id, priority, now)
+            self._queues[priority].setdefault(user_id, deque()).append(ticket)
+            self._queued[priority] += 1
+            self._dispatch()
+            while not ticket.granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._remove(ticket)
+                    self._expired[priority] += 1
+                    logger.warning("LLM request deadline passed while queued", extra={
+                        "user_id": user_id,
+                        "priority": priority.name.lower(),
+                        "waited_ms": round((time.monotonic() - now) * 1000, 1),
+                    })
+                    raise LLMDeadlineExceeded("deadline passed while waiting for an LLM slot")
+                self._cond.wait(remaining)
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting tickets; the condition must be held."""
+        granted = False
+        while self._in_flight < self.max_concurrency:
+            ticket = self._next_ticket()
+            if ticket is None:
+                break
+            ticket.granted = True
+            self._in_flight += 1
+            self._record_grant(ticket.priority, time.monotonic() - ticket.enqueued_at)
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _next_ticket(self) -> _Ticket | None:
+        for priority, users in enumerate(self._queues):
+            if not users:
+                continue
+            # Take the longest-waiting user's oldest ticket and move the user to the back
+            user_id, tickets = users.popitem(last=False)
+            ticket = tickets.popleft()
+            if tickets:
+                users[user_id] = tickets
+            self._queued[priority] -= 1
+            return ticket
+        return None
+
+    def _remove(self, ticket: _Ticket) -> None:
+        users = self._queues[ticket.priority]
+        tickets = users.get(ticket.user_id)
+        if tickets is not None:
+            tickets.remove(ticket)
+            if not tickets:
+                del users[ticket.user_id]
+        self._queued[ticket.priority] -= 1
+
+    def _record_grant(self, priority: Priority, waited_s: float) -> None:
+        self._granted[priority] += 1
+        self._waits[priority].append(waited_s)
+
+    def get_stats(self) -> Dict:
+        """Get queue depths and wait times.
+
+        Returns:
+            Dictionary with the concurrency cap, running and queued requests,
+            and per class the queued, granted and expired counts and the
+            p50/p95/max wait in milliseconds over recent requests
+        """
+        with self._cond:
+            classes = {}
+            for priority in Priority:
+                waits = sorted(self._waits[priority])
+                classes[priority.name.lower()] = {
+                    "queued": self._queued[priority],
+                    "queued_users": len(self._queues[priority]),
+                    "granted": self._granted[priority],
+                    "expired": self._expired[priority],
+                    "wait_ms": {
+                        "p50": _percentile_ms(waits, 50),
+                        "p95": _percentile_ms(waits, 95),
+                        "max": round(waits[-1] * 1000, 1) if waits else 0.0,
+                    },
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "queued": sum(self._queued),
+                "classes": classes,
+            }
+
+
+def _percentile_ms(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return round(sorted_values[index] * 1000, 1)
@@ -0,0 +1,186 @@
+"""Structured, non-blocking logging for the monitoring agent.
+
+Every module gets its logger from :func:`get_logger`. Records are rendered as
+JSON lines and handed to a background thread through a bounded queue, so hot
+paths (fetching casts, logging violations, LLM retries) never block on stdout.
+Repeated messages are sampled so a retry storm cannot flood the log pipeline.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Tuple
+
+from .settings import (
+    get_log_level,
+    get_log_queue_size,
+    get_log_sample_burst,
+    get_log_sample_every,
+    get_log_sample_window_s,
+)
+
+ROOT_LOGGER_NAME = "farcaster_monitor"
+
+# Attributes present on every LogRecord; anything else was passed via ``extra``
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_configure_lock = threading.Lock()
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Render log records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Sample repeated DEBUG and INFO messages.
+
+    Within each time window the first ``burst`` records sharing a message
+    template and subject (the ``fid``, ``user_id`` or ``author_id`` passed in
+    ``extra``) are passed through, after that only one in ``every``. The
+    number of records dropped since the last emitted one is attached as
+    ``suppressed``. Warnings and errors are never sampled.
+    """
+
+    # ``extra`` fields naming whom a record is about; records for different subjects are not repeats
+    SUBJECT_KEYS = ("fid", "user_id", "author_id")
+    # Counters kept before those of finished windows are discarded
+    MAX_KEYS = 10_000
+
+    def __init__(self, burst: int, every: int, window_s: float):
+        super().__init__()
+        self.burst = max(0, burst)
+        self.every = max(1, every)
+        self.window_s = window_s
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        subject = tuple(str(getattr(record, name, "")) for name in self.SUBJECT_KEYS)
+        key = (record.name, record.levelno, str(record.msg), subject)
+        now = time.monotonic()
+        with self._lock:
+            if len(self._counters) >= self.MAX_KEYS:
+                self._counters = {k: v for k, v in self._counters.items() if now - v[0] < self.window_s}
+            state = self._counters.get(key)
+            if state is None or now - state[0] >= self.window_s:
+                # [window_start, seen, suppressed]
+                state = [now, 0, state[2] if state else 0]
+                self._counters[key] = state
+            state[1] += 1
+            seen = state[1]
+            if seen > self.burst and (seen - self.burst) % self.every != 0:
+                state[2] += 1
+                return False
+            suppressed, state[2] = state[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level: str | int | None = None, stream=None, force: bool = False) -> logging.Logger:
+    """Install the JSON queue handler on the application's root logger.
+
+    Safe to call repeatedly; only the first call (or a call with ``force``)
+    changes the configuration.
+
+    Args:
+        level: Log level name or number. If None, reads LOG_LEVEL from settings.
+        stream: Output stream for the background writer (default: stderr)
+        force: Replace an existing configuration
+
+    Returns:
+        The application's root logger
+    """
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    with _configure_lock:
+        if _listener is not None and not force:
+            if level is not None:
+                root.setLevel(level)
+            return root
+
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter())
+
+        log_queue: queue.Queue = queue.Queue(maxsize=get_log_queue_size())
+        queue_handler = DroppingQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(
+            burst=get_log_sample_burst(),
+            every=get_log_sample_every(),
+            window_s=get_log_sample_window_s(),
+        ))
+
+        root.addHandler(queue_handler)
+        root.setLevel(level if level is not None else get_log_level())
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+    return root
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a child of the application logger, configuring logging on first use.
+
+    Args:
+        name: Component name, e.g. ``"database"``
+
+    Returns:
+        Logger instance
+    """
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+atexit.register(shutdown_logging)
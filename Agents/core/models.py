@@ -0,0 +1,36 @@
+"""Compact record types shared across the pipeline."""
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict
+
+
+@dataclass(frozen=True, slots=True)
+class Post:
+    """A cast as seen by the rule engine.
+
+    Slotted and immutable, so large batches stay small in memory. Rules and
+    callers written against post dictionaries keep working: ``post["content"]``
+    and ``post.get("content", "")`` read the fields.
+    """
+    post_id: str
+    author_id: str
+    content: str
+    timestamp: str
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _POST_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in _POST_FIELDS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Read a field like ``dict.get``."""
+        return getattr(self, key) if key in _POST_FIELDS else default
+
+    def to_dict(self) -> Dict[str, str]:
+        """Convert to a plain post dictionary."""
+        return asdict(self)
+
+
+_POST_FIELDS = frozenset(f.name for f in fields(Post))
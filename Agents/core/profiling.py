@@ -0,0 +1,149 @@
+"""Optional cProfile and tracemalloc capture around monitor runs and requests.
+
+Profiling is off unless ``PROFILE_DIR`` is set (``--profile DIR`` on
+``main.py``, ``api_cli.py``, ``api/serve.py`` and ``api/server.py`` sets
+it). Each profiled unit of work (a sweep, a daemon poll, an API action)
+then writes to that directory:
+
+- ``<stem>.prof``: cProfile call stats, for ``python -m pstats`` or snakeviz
+- ``<stem>.tracemalloc``: the allocation snapshot at the end, for
+  ``tracemalloc.Snapshot.load``
+- ``<stem>.txt``: the slowest functions by cumulative time and the source
+  lines whose allocations grew most during the run
+
+With ``PROFILE_SAMPLE_EVERY=N`` only one in N units is profiled. Only the
+thread running the unit is profiled, and profiles do not overlap: a unit
+starting while another one is profiled runs unprofiled.
+"""
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator
+
+from .log import get_logger
+from .settings import get_profile_dir, get_profile_sample_every
+
+logger = get_logger("profiling")
+
+# Stack frames kept per traced allocation
+TRACEMALLOC_FRAMES = 10
+
+# Rows in the text summary
+SUMMARY_FUNCTIONS = 40
+SUMMARY_ALLOCATIONS = 25
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# Allocations made by tracemalloc itself are left out of the summary
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class Profiler:
+    """Captures call stats and allocation snapshots around units of work."""
+
+    def __init__(self, directory: str | None = None, sample_every: int | None = None):
+        """Initialize the profiler.
+
+        Args:
+            directory: Where profiles are written (None = read from settings;
+                empty = profiling off)
+            sample_every: Profile one in this many units. If None, reads from settings.
+        """
+        self.directory = directory if directory is not None else get_profile_dir()
+        self.sample_every = max(1, sample_every or get_profile_sample_every())
+        self._calls = itertools.count()
+        self._active = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"profiled": 0, "skipped_busy": 0, "failed": 0}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether profiles are written at all."""
+        return bool(self.directory)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """Profile a block if profiling is on and the block is sampled.
+
+        Args:
+            name: Names the unit of work in the file names, e.g. "sweep"
+        """
+        if not self.directory or next(self._calls) % self.sample_every:
+            yield
+            return
+        if not self._active.acquire(blocking=False):
+            self._count("skipped_busy")
+            yield
+            return
+        try:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                elapsed_s = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+                self._write(name, profiler, before, after, elapsed_s, peak)
+        finally:
+            self._active.release()
+
+    def _write(self, name: str, profiler: cProfile.Profile, before: tracemalloc.Snapshot,
+               after: tracemalloc.Snapshot, elapsed_s: float, peak: int) -> None:
+        """Write one profile's files; failures are logged, never raised."""
+        try:
+            with self._stats_lock:
+                self.stats["profiled"] += 1
+                sequence = self.stats["profiled"]
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+            safe_name = _UNSAFE_CHARS.sub("_", str(name)).strip("_") or "run"
+            os.makedirs(self.directory, exist_ok=True)
+            stem = os.path.join(self.directory, f"{stamp}-{safe_name}-{os.getpid()}-{sequence}")
+
+            profiler.dump_stats(stem + ".prof")
+            after = after.filter_traces(_SNAPSHOT_FILTERS)
+            after.dump(stem + ".tracemalloc")
+
+            calls = io.StringIO()
+            pstats.Stats(profiler, stream=calls).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_FUNCTIONS)
+            growth = after.compare_to(before.filter_traces(_SNAPSHOT_FILTERS), "lineno")[:SUMMARY_ALLOCATIONS]
+            with open(stem + ".txt", "w", encoding="utf-8") as f:
+                f.write(f"{name}: {elapsed_s * 1000:.1f} ms, peak traced memory {peak / 1024:.1f} KiB\n\n")
+                f.write(f"Allocation growth by line (top {SUMMARY_ALLOCATIONS}):\n")
+                f.writelines(f"  {stat}\n" for stat in growth)
+                f.write("\n")
+                f.write(calls.getvalue())
+            logger.info("Profile written", extra={
+                "unit": name,
+                "path": stem,
+                "elapsed_ms": round(elapsed_s * 1000, 1),
+                "peak_kib": round(peak / 1024, 1),
+            })
+        except Exception as e:
+            self._count("failed")
+            logger.warning("Failed to write profile", extra={"unit": name, "error": str(e)})
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
@@ -33,6 +33,218 @@ def get_neynar_api_key() -> str:
     return api_key
 
 
+def get_neynar_base_url() -> str:
+    """Returns the Neynar Farcaster API base URL."""
+    return os.getenv("NEYNAR_BASE_URL", "https://api.neynar.com/v2/farcaster").rstrip("/")
+
+
+def get_openrouter_base_url() -> str:
+    """Returns the OpenRouter (OpenAI-compatible) API base URL."""
+    return os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
+
+
+def get_neynar_webhook_secrets() -> list[str]:
+    """Returns the Neynar webhook signing secrets (comma-separated, empty if unset)."""
+    secrets_str = os.getenv("NEYNAR_WEBHOOK_SECRET", "")
+    return [s.strip() for s in secrets_str.split(",") if s.strip()]
+
+
 def get_database_path() -> str:
     """Returns the database file path."""
     return os.getenv("DATABASE_PATH", "violations.db")
+
+
+def _get_int(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back on bad values."""
+    try:
+        return int(os.getenv(name, str(default)).strip())
+    except ValueError:
+        return default
+
+
+def _get_float(name: str, default: float) -> float:
+    """Read a float environment variable, falling back on bad values."""
+    try:
+        return float(os.getenv(name, str(default)).strip())
+    except ValueError:
+        return default
+
+
+def get_log_level() -> str:
+    """Returns the log level. Per-cast and per-violation messages are DEBUG."""
+    return os.getenv("LOG_LEVEL", "INFO").strip().upper()
+
+
+def get_log_queue_size() -> int:
+    """Returns the maximum number of log records buffered before dropping."""
+    return _get_int("LOG_QUEUE_SIZE", 10000)
+
+
+def get_log_sample_burst() -> int:
+    """Returns how many repeats of a message are logged per window before sampling."""
+    return _get_int("LOG_SAMPLE_BURST", 10)
+
+
+def get_log_sample_every() -> int:
+    """Returns the sampling rate (1 in N) for messages past the burst."""
+    return _get_int("LOG_SAMPLE_EVERY", 100)
+
+
+def get_log_sample_window_s() -> float:
+    """Returns the length of the sampling window in seconds."""
+    return _get_float("LOG_SAMPLE_WINDOW_S", 60.0)
+
+
+def get_webhook_workers() -> int:
+    """Returns the number of worker threads evaluating webhook casts."""
+    return _get_int("WEBHOOK_WORKERS", 4)
+
+
+def get_webhook_queue_size() -> int:
+    """Returns the maximum number of webhook casts waiting for evaluation."""
+    return _get_int("WEBHOOK_QUEUE_SIZE", 10000)
+
+
+def get_scheduler_min_interval_s() -> float:
+    """Returns the shortest per-user poll interval of the daemon in seconds."""
+    return _get_float("SCHEDULER_MIN_INTERVAL_S", 60.0)
+
+
+def get_scheduler_max_interval_s() -> float:
+    """Returns the longest per-user poll interval of the daemon in seconds."""
+    return _get_float("SCHEDULER_MAX_INTERVAL_S", 3600.0)
+
+
+def get_scheduler_target_casts_per_poll() -> float:
+    """Returns how many new casts the daemon aims to find per poll."""
+    return _get_float("SCHEDULER_TARGET_CASTS_PER_POLL", 3.0)
+
+
+def get_scheduler_jitter() -> float:
+    """Returns the relative random jitter applied to poll intervals."""
+    return _get_float("SCHEDULER_JITTER", 0.1)
+
+
+def get_shard_processes() -> int:
+    """Returns the number of worker processes for sharded monitoring."""
+    return max(1, _get_int("SHARD_PROCESSES", os.cpu_count() or 1))
+
+
+def get_writer_batch_size() -> int:
+    """Returns the maximum number of violations committed in one transaction."""
+    return max(1, _get_int("VIOLATION_WRITER_BATCH_SIZE", 500))
+
+
+def get_writer_flush_interval_s() -> float:
+    """Returns the longest time a queued violation waits before being committed."""
+    return _get_float("VIOLATION_WRITER_FLUSH_S", 0.5)
+
+
+def get_writer_enabled() -> bool:
+    """Returns whether violation inserts go through the background writer thread."""
+    return os.getenv("VIOLATION_WRITER_ENABLED", "false").strip().lower() in ("1", "true", "yes")
+
+
+def get_retention_days() -> int:
+    """Returns how many days of raw violation rows to keep (0 = keep everything)."""
+    return _get_int("VIOLATION_RETENTION_DAYS", 0)
+
+
+def get_retention_interval_s() -> float:
+    """Returns how often retention and compaction run in long-lived processes."""
+    return _get_float("RETENTION_INTERVAL_S", 3600.0)
+
+
+def get_vacuum_pages() -> int:
+    """Returns the maximum pages freed per incremental vacuum (0 = all)."""
+    return _get_int("VACUUM_PAGES", 1000)
+
+
+def get_neynar_feed_chunk_size() -> int:
+    """Returns how many FIDs are requested per bulk feed request."""
+    return max(1, _get_int("NEYNAR_FEED_CHUNK_SIZE", 100))
+
+
+def get_near_duplicate_enabled() -> bool:
+    """Returns whether LLM verdicts are reused for near-duplicate casts."""
+    return os.getenv("NEAR_DUPLICATE_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+
+
+def get_near_duplicate_max_distance() -> int:
+    """Returns the largest SimHash bit distance treated as a near-duplicate."""
+    return max(0, _get_int("NEAR_DUPLICATE_MAX_DISTANCE", 2))
+
+
+def get_near_duplicate_max_entries() -> int:
+    """Returns how many recent verdicts the near-duplicate index keeps."""
+    return max(1, _get_int("NEAR_DUPLICATE_MAX_ENTRIES", 50000))
+
+
+def get_near_duplicate_ttl_s() -> float:
+    """Returns how long, in seconds, a verdict can be reused."""
+    return _get_float("NEAR_DUPLICATE_TTL_S", 86400.0)
+
+
+def get_cast_store_enabled() -> bool:
+    """Returns whether fetched casts are kept in the local cast store."""
+    return os.getenv("CAST_STORE_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+
+
+def get_cast_retention_days() -> int:
+    """Returns how many days of stored casts to keep (0 = keep everything)."""
+    return max(0, _get_int("CAST_RETENTION_DAYS", 30))
+
+
+def get_llm_max_concurrency() -> int:
+    """Returns how many LLM requests may run at once in a process."""
+    return max(1, _get_int("LLM_MAX_CONCURRENCY", 4))
+
+
+def get_llm_interactive_deadline_s() -> float:
+    """Returns how long, in seconds, interactive requests wait for an LLM slot."""
+    return _get_float("LLM_INTERACTIVE_DEADLINE_S", 30.0)
+
+
+def get_read_cache_size() -> int:
+    """Returns how many read responses the JSON API caches (0 = no cache)."""
+    return max(0, _get_int("READ_CACHE_SIZE", 256))
+
+
+def get_server_threads() -> int:
+    """Returns the number of request threads of the production server."""
+    return max(1, _get_int("SERVER_THREADS", 16))
+
+
+def get_scan_workers() -> int:
+    """Returns how many monitor or re-scan requests the API runs at once."""
+    return max(1, _get_int("SCAN_WORKERS", 2))
+
+
+def get_scan_queue_size() -> int:
+    """Returns how many scan requests may wait before the API answers 503."""
+    return max(0, _get_int("SCAN_QUEUE_SIZE", 4))
+
+
+def get_scan_deadline_s() -> float:
+    """Returns the time budget, in seconds, of API monitor and re-scan requests (0 = none)."""
+    return max(0.0, _get_float("SCAN_DEADLINE_S", 120.0))
+
+
+def get_shutdown_grace_s() -> float:
+    """Returns how long, in seconds, shutdown waits for running requests."""
+    return _get_float("SHUTDOWN_GRACE_S", 30.0)
+
+
+def get_profile_dir() -> str:
+    """Returns where profiles of runs and requests are written (empty = profiling off)."""
+    return os.getenv("PROFILE_DIR", "").strip()
+
+
+def get_profile_sample_every() -> int:
+    """Returns N, when one in N runs or requests is profiled."""
+    return max(1, _get_int("PROFILE_SAMPLE_EVERY", 1))
+
+
+def get_llm_cast_token_budget() -> int:
+    """Returns the estimated tokens of cast text sent with each LLM rule check (0 = no limit)."""
+    return max(0, _get_int("LLM_CAST_TOKEN_BUDGET", 256))
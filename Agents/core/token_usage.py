@@ -0,0 +1,147 @@
+"""Token accounting for LLM calls.
+
+Every completion's ``usage`` block is added to a ledger keyed by rule,
+model and user, together with the call's latency and, when the provider
+reports it (OpenRouter does), its cost. The process-wide ledger is
+``get_token_ledger()``; the API serves it as the ``token_usage`` action and
+``GET /api/llm/usage``. Sharded sweeps merge their workers' ledgers into the
+coordinator's.
+"""
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+# Rule or user recorded for calls made without one
+UNLABELED = "unlabeled"
+
+_COUNTERS = ("calls", "prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens", "cost", "latency_ms")
+
+# Position of each grouping in a ledger key
+_GROUPS = (("by_rule", 0), ("by_model", 1), ("by_user", 2))
+
+UsageKey = Tuple[str, str, str]
+
+
+def _field(source, name: str):
+    if source is None:
+        return None
+    if isinstance(source, dict):
+        return source.get(name)
+    return getattr(source, name, None)
+
+
+def usage_counts(usage) -> Dict[str, float]:
+    """Read the token counts of a completion's ``usage``.
+
+    Args:
+        usage: The ``usage`` of an OpenAI-format completion, as an object or
+            a dictionary; None and missing fields count as 0
+
+    Returns:
+        Dictionary with prompt, completion, total and cached tokens and cost
+    """
+    prompt_tokens = int(_field(usage, "prompt_tokens") or 0)
+    completion_tokens = int(_field(usage, "completion_tokens") or 0)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": int(_field(usage, "total_tokens") or prompt_tokens + completion_tokens),
+        "cached_tokens": int(_field(_field(usage, "prompt_tokens_details"), "cached_tokens") or 0),
+        "cost": float(_field(usage, "cost") or 0.0),
+    }
+
+
+def _summary(counts: Dict[str, float]) -> Dict[str, float]:
+    calls = counts["calls"]
+    return {
+        "calls": int(calls),
+        "prompt_tokens": int(counts["prompt_tokens"]),
+        "completion_tokens": int(counts["completion_tokens"]),
+        "total_tokens": int(counts["total_tokens"]),
+        "cached_tokens": int(counts["cached_tokens"]),
+        "cost": round(counts["cost"], 6),
+        "avg_prompt_tokens": round(counts["prompt_tokens"] / calls, 1) if calls else 0.0,
+        "avg_latency_ms": round(counts["latency_ms"] / calls, 1) if calls else 0.0,
+    }
+
+
+class TokenLedger:
+    """Thread-safe totals of LLM token usage per rule, model and user."""
+
+    def __init__(self):
+        """Initialize an empty ledger."""
+        self._lock = threading.Lock()
+        self._entries: Dict[UsageKey, Dict[str, float]] = {}
+
+    def record(self, rule: str | None, model: str, user_id: str | None, usage,
+               latency_s: float = 0.0) -> None:
+        """Add one completion's usage.
+
+        Args:
+            rule: Rule the call checked (None = unlabeled)
+            model: Model that answered
+            user_id: User the call was made for (None = unlabeled)
+            usage: The completion's ``usage``, see usage_counts
+            latency_s: Time the request took, without scheduler queueing
+        """
+        counts = usage_counts(usage)
+        counts["calls"] = 1
+        counts["latency_ms"] = latency_s * 1000
+        key = (rule or UNLABELED, model, str(user_id) if user_id is not None else UNLABELED)
+        self._add(key, counts)
+
+    def _add(self, key: UsageKey, counts: Dict[str, float]) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = dict.fromkeys(_COUNTERS, 0)
+            for name in _COUNTERS:
+                entry[name] += counts.get(name, 0)
+
+    def entries(self) -> List[Tuple[UsageKey, Dict[str, float]]]:
+        """Get a copy of the raw (rule, model, user) entries, e.g. to merge elsewhere."""
+        with self._lock:
+            return [(key, dict(counts)) for key, counts in self._entries.items()]
+
+    def merge(self, entries: Iterable[Tuple[UsageKey, Dict[str, float]]]) -> None:
+        """Add entries taken from another ledger."""
+        for key, counts in entries:
+            self._add(tuple(key), counts)
+
+    def reset(self) -> None:
+        """Forget all recorded usage."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self, user_ids: List[str] | None = None) -> Dict:
+        """Get usage totals.
+
+        Args:
+            user_ids: Only count calls made for these users (None = all)
+
+        Returns:
+            Dictionary with the "totals" and the same summary "by_rule",
+            "by_model" and "by_user": calls, prompt, completion, total and
+            cached tokens, cost, and average prompt tokens and latency per call
+        """
+        entries = self.entries()
+        if user_ids is not None:
+            wanted = {str(user_id) for user_id in user_ids}
+            entries = [(key, counts) for key, counts in entries if key[2] in wanted]
+
+        totals = dict.fromkeys(_COUNTERS, 0)
+        groups: Dict[str, Dict[str, Dict[str, float]]] = {name: {} for name, _ in _GROUPS}
+        for key, counts in entries:
+            for name in _COUNTERS:
+                totals[name] += counts[name]
+            for group, position in _GROUPS:
+                bucket = groups[group].setdefault(key[position], dict.fromkeys(_COUNTERS, 0))
+                for name in _COUNTERS:
+                    bucket[name] += counts[name]
+
+        stats: Dict = {"totals": _summary(totals)}
+        for group, buckets in groups.items():
+            stats[group] = {
+                label: _summary(counts)
+                for label, counts in sorted(buckets.items(), key=lambda item: -item[1]["total_tokens"])
+            }
+        return stats
@@ -0,0 +1,205 @@
+"""Local store of fetched casts, for re-evaluating rules without refetching."""
+import hashlib
+import itertools
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+from core.log import get_logger
+from core.models import Post
+from core.settings import get_cast_retention_days, get_database_path
+
+logger = get_logger("database.casts")
+
+# Seconds a connection waits on SQLite's write lock before failing
+BUSY_TIMEOUT_S = 30.0
+
+# Rows read per query when streaming stored casts
+READ_PAGE_SIZE = 500
+
+
+def content_hash(content: str) -> str:
+    """Hash cast content for deduplicated storage."""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CastStore:
+    """Stores fetched casts in the SQLite database.
+
+    Casts are keyed by post ID, so re-fetched casts are stored once. Their
+    text is kept in a separate table keyed by content hash, so copy-pasted
+    casts share one copy. Casts older than the retention window are removed
+    together with text no cast refers to anymore.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """Initialize the store.
+
+        Args:
+            db_path: Path to the database file. If None, uses settings default.
+        """
+        self.db_path = db_path or get_database_path()
+        self.initialize()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection that waits on the write lock instead of failing."""
+        return sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_S)
+
+    def initialize(self) -> None:
+        """Create the cast tables if they don't exist."""
+        con = self._connect()
+        con.execute("PRAGMA journal_mode=WAL")
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS cast_contents (
+                hash TEXT PRIMARY KEY,
+                content TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS casts (
+                post_id TEXT PRIMARY KEY,
+                author_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_casts_author_timestamp
+            ON casts (author_id, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_casts_timestamp
+            ON casts (timestamp);
+            CREATE INDEX IF NOT EXISTS idx_casts_content_hash
+            ON casts (content_hash);
+        """)
+        con.commit()
+        con.close()
+
+    def add_casts(self, posts: List[Post]) -> int:
+        """Store fetched casts, skipping ones already stored.
+
+        Args:
+            posts: Post records (or dictionaries) with post_id, author_id,
+                content and timestamp
+
+        Returns:
+            Number of casts newly stored
+        """
+        if not posts:
+            return 0
+        contents = {}
+        rows = []
+        for post in posts:
+            content = post.get("content") or ""
+            digest = content_hash(content)
+            contents[digest] = content
+            rows.append((post["post_id"], str(post["author_id"]), post["timestamp"], digest))
+
+        con = self._connect()
+        try:
+            cur = con.cursor()
+            cur.executemany("INSERT OR IGNORE INTO cast_contents (hash, content) VALUES (?, ?)",
+                            contents.items())
+            before = con.total_changes
+            cur.executemany(
+                """INSERT OR IGNORE INTO casts (post_id, author_id, timestamp, content_hash)
+                   VALUES (?, ?, ?, ?)""",
+                rows
+            )
+            added = con.total_changes - before
+            con.commit()
+        finally:
+            con.close()
+        logger.debug("Casts stored", extra={"casts": len(rows), "new": added})
+        return added
+
+    def iter_casts(self, author_id: str, days: int | None = None,
+                   page_size: int = READ_PAGE_SIZE) -> Iterator[Post]:
+        """Stream stored casts of an author, newest first.
+
+        Casts are read in keyset-paginated pages, each with its own short
+        connection, so no read transaction stays open while the caller works.
+
+        Args:
+            author_id: The author's FID as string
+            days: Only casts from the last N days (None = all stored)
+            page_size: Rows read per query
+
+        Yields:
+            Post records, as produced by the Farcaster connector
+        """
+        sql = """SELECT c.post_id, c.author_id, t.content, c.timestamp
+                 FROM casts c JOIN cast_contents t ON t.hash = c.content_hash
+                 WHERE c.author_id = ?"""
+        params: list = [str(author_id)]
+        if days is not None:
+            sql += " AND c.timestamp >= ?"
+            params.append((datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S"))
+
+        last = None
+        while True:
+            page_sql, page_params = sql, list(params)
+            if last is not None:
+                page_sql += " AND (c.timestamp, c.post_id) < (?, ?)"
+                page_params.extend(last)
+            page_sql += " ORDER BY c.timestamp DESC, c.post_id DESC LIMIT ?"
+            page_params.append(page_size)
+
+            con = self._connect()
+            try:
+                rows = con.execute(page_sql, page_params).fetchall()
+            finally:
+                con.close()
+            for row in rows:
+                yield Post(*row)
+            if len(rows) < page_size:
+                return
+            last = (rows[-1][3], rows[-1][0])
+
+    def get_casts(self, author_id: str, days: int | None = None, limit: int | None = None) -> List[Post]:
+        """Get stored casts of an author, newest first.
+
+        Args:
+            author_id: The author's FID as string
+            days: Only casts from the last N days (None = all stored)
+            limit: Maximum number of casts (None = no limit)
+
+        Returns:
+            List of post records, as produced by the Farcaster connector
+        """
+        casts = self.iter_casts(author_id, days=days)
+        if limit is None:
+            return list(casts)
+        return list(itertools.islice(casts, limit))
+
+    def apply_retention(self, retention_days: int | None = None) -> int:
+        """Delete casts older than the retention window.
+
+        Args:
+            retention_days: Days of casts to keep. If None, reads from
+                settings; 0 keeps everything.
+
+        Returns:
+            Number of casts removed
+        """
+        days = retention_days if retention_days is not None else get_cast_retention_days()
+        if days <= 0:
+            return 0
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S")
+        con = self._connect()
+        try:
+            cur = con.cursor()
+            cur.execute("DELETE FROM casts WHERE timestamp < ?", (cutoff,))
+            removed = cur.rowcount
+            if removed:
+                cur.execute("""DELETE FROM cast_contents
+                               WHERE NOT EXISTS (SELECT 1 FROM casts WHERE content_hash = cast_contents.hash)""")
+            con.commit()
+        finally:
+            con.close()
+        logger.info("Cast retention applied", extra={"retention_days": days, "casts_removed": removed})
+        return removed
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the number of stored casts and distinct texts."""
+        con = self._connect()
+        try:
+            casts = con.execute("SELECT COUNT(*) FROM casts").fetchone()[0]
+            contents = con.execute("SELECT COUNT(*) FROM cast_contents").fetchone()[0]
+        finally:
+            con.close()
+        return {"casts": casts, "distinct_contents": contents}
@@ -0,0 +1,74 @@
+"""Scheduled retention and compaction for the violations database and cast store."""
+import threading
+
+from core.log import get_logger
+from core.settings import get_cast_retention_days, get_retention_days, get_retention_interval_s
+
+logger = get_logger("database.retention")
+
+
+class RetentionManager:
+    """Background thread applying retention and incremental vacuum periodically."""
+
+    def __init__(self, database, retention_days: int | None = None, interval_s: float | None = None,
+                 cast_store=None, cast_retention_days: int | None = None):
+        """Initialize the retention manager.
+
+        Args:
+            database: ViolationsDatabase to maintain
+            retention_days: Days of raw rows to keep. If None, reads from settings.
+            interval_s: Seconds between runs. If None, reads from settings.
+            cast_store: CastStore to trim as well (optional)
+            cast_retention_days: Days of stored casts to keep. If None, reads from settings.
+        """
+        self.database = database
+        self.retention_days = retention_days if retention_days is not None else get_retention_days()
+        self.interval_s = interval_s if interval_s is not None else get_retention_interval_s()
+        self.cast_store = cast_store
+        self.cast_retention_days = (cast_retention_days if cast_retention_days is not None
+                                    else get_cast_retention_days())
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> int:
+        """Apply retention and compact the file once.
+
+        Returns:
+            Number of raw rows removed
+        """
+        removed = self.database.apply_retention(self.retention_days)
+        casts_removed = 0
+        if self.cast_store is not None:
+            casts_removed = self.cast_store.apply_retention(self.cast_retention_days)
+        if removed or casts_removed:
+            self.database.compact()
+        return removed
+
+    def start(self) -> "RetentionManager":
+        """Start the background thread; does nothing when retention is disabled."""
+        casts_enabled = self.cast_store is not None and self.cast_retention_days > 0
+        if (self.retention_days <= 0 and not casts_enabled) or self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run, name="violations-retention", daemon=True)
+        self._thread.start()
+        logger.info("Retention manager started", extra={
+            "retention_days": self.retention_days,
+            "cast_retention_days": self.cast_retention_days if self.cast_store is not None else None,
+            "interval_s": self.interval_s,
+        })
+        return self
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Retention run failed")
+            self._stop.wait(self.interval_s)
@@ -1,39 +1,452 @@
-"""Database operations for violations tracking."""
+"""Database operations for violations tracking.
+
+Schema v2 stores violations compactly: author IDs are integer FIDs (any
+other author ID is kept as text in the same column), times are epoch
+milliseconds (UTC) and rule names are interned in a ``rules`` table. The
+``violation_rows`` view decodes rows back into the shape the API returns
+(string author IDs, ISO 8601 timestamps, rule names). A file in the
+original all-TEXT layout is migrated once, on open.
+"""
+import re
 import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta, timezone
 from typing import Optional
-from core.settings import get_database_path
+from core.log import get_logger
+from core.settings import (
+    get_database_path,
+    get_retention_days,
+    get_vacuum_pages,
+    get_writer_batch_size,
+    get_writer_enabled,
+    get_writer_flush_interval_s,
+)
+from .writer import ViolationWriter, WriterClosed
+
+logger = get_logger("database")
+
+# Seconds a connection waits on SQLite's write lock before failing
+BUSY_TIMEOUT_S = 30.0
+
+# Stored in PRAGMA user_version; files without it use the original TEXT layout
+SCHEMA_VERSION = 2
+
+_MS_PER_DAY = 86_400_000
+_INT64_MAX = 2**63 - 1
+
+# Text SQLite turns into a number when it is stored in an INTEGER column
+_NUMERIC = re.compile(r"\s*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*", re.ASCII)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Columns of violation_rows returned by reads, in the original column order
+_ROW_COLUMNS = ("id", "post_id", "author_id", "rule_violated", "timestamp", "content_snippet")
+_ROW_SELECT = ", ".join(f"v.{column}" for column in _ROW_COLUMNS)
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS rules (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )""",
+    """CREATE TABLE IF NOT EXISTS violations (
+        id INTEGER PRIMARY KEY,
+        post_id TEXT NOT NULL,
+        author_id INTEGER NOT NULL,
+        rule_id INTEGER NOT NULL REFERENCES rules (id),
+        created_at INTEGER NOT NULL,
+        content_snippet TEXT,
+        UNIQUE (post_id, rule_id)
+    )""",
+    # Covering indexes (the rowid is part of every index): per-author reads,
+    # counts and change tokens; time-ordered reads, retention and totals
+    """CREATE INDEX IF NOT EXISTS idx_violations_author_created
+       ON violations (author_id, created_at, rule_id)""",
+    """CREATE INDEX IF NOT EXISTS idx_violations_created
+       ON violations (created_at, author_id, rule_id)""",
+    # Daily per-author, per-rule counts of rows removed by retention; day is
+    # days since the Unix epoch (UTC)
+    """CREATE TABLE IF NOT EXISTS violation_daily_counts (
+        day INTEGER NOT NULL,
+        author_id INTEGER NOT NULL,
+        rule_id INTEGER NOT NULL REFERENCES rules (id),
+        count INTEGER NOT NULL,
+        PRIMARY KEY (day, author_id, rule_id)
+    ) WITHOUT ROWID""",
+    # Everything created before rolled_up_before has been rolled up by
+    # retention; older rows are not inserted again
+    """CREATE TABLE IF NOT EXISTS retention_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        rolled_up_before INTEGER NOT NULL
+    )""",
+    # Rows as the API returns them; fid and created_at are kept for filtering
+    # and ordering on the indexed columns
+    """CREATE VIEW IF NOT EXISTS violation_rows AS
+       SELECT v.id AS id,
+              v.post_id AS post_id,
+              CAST(v.author_id AS TEXT) AS author_id,
+              r.name AS rule_violated,
+              strftime('%Y-%m-%dT%H:%M:%fZ', v.created_at / 1000.0, 'unixepoch') AS timestamp,
+              v.content_snippet AS content_snippet,
+              v.author_id AS fid,
+              v.created_at AS created_at
+       FROM violations v
+       JOIN rules r ON r.id = v.rule_id""",
+    # Verdicts copied from a near-duplicate post instead of asking the LLM
+    """CREATE TABLE IF NOT EXISTS verdict_reuse (
+        id INTEGER PRIMARY KEY,
+        post_id TEXT NOT NULL,
+        author_id TEXT NOT NULL,
+        rule TEXT NOT NULL,
+        source_post_id TEXT,
+        distance INTEGER NOT NULL,
+        violates INTEGER NOT NULL,
+        reused_at TEXT NOT NULL,
+        UNIQUE(post_id, rule)
+    )""",
+    """CREATE INDEX IF NOT EXISTS idx_verdict_reuse_source
+       ON verdict_reuse (source_post_id)""",
+)
+
+
+# Inserts one encoded row plus its rule ID; the created_at value is bound twice
+_INSERT_ROW = """INSERT {conflict} INTO violations
+    (post_id, author_id, rule_id, created_at, content_snippet)
+    SELECT ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (SELECT 1 FROM retention_state WHERE rolled_up_before > ?)"""
+
+
+def _to_author(author_id) -> int | str:
+    """Convert an author ID to the value it is stored as.
+    
+    Numeric IDs (FIDs) are stored as integers, so "007" and "7" are the same
+    author. Any other ID is stored as the text itself, in the same column,
+    and read back unchanged.
+    
+    Raises:
+        ValueError: The ID is empty, not a string or integer, or a number
+            that is not a whole 64-bit integer (SQLite would store it as a
+            different number)
+    """
+    if isinstance(author_id, int) and not isinstance(author_id, bool):
+        fid = author_id
+    elif isinstance(author_id, str) and author_id.strip():
+        if not _NUMERIC.fullmatch(author_id):
+            return author_id
+        try:
+            fid = int(author_id)
+        except ValueError:
+            raise ValueError(f"Numeric author ID must be a whole number, got {author_id!r}") from None
+    else:
+        raise ValueError(f"Author ID must be a non-empty string or an integer, got {author_id!r}")
+    if not -_INT64_MAX - 1 <= fid <= _INT64_MAX:
+        raise ValueError(f"Numeric author ID is out of range, got {author_id!r}")
+    return fid
+
+
+def _to_epoch_ms(timestamp) -> int:
+    """Convert an ISO 8601 timestamp to epoch milliseconds (UTC).
+    
+    Timestamps without an offset are taken as UTC; sub-millisecond digits
+    are dropped.
+    
+    Raises:
+        ValueError: The timestamp cannot be parsed
+    """
+    if isinstance(timestamp, datetime):
+        moment = timestamp
+    else:
+        text = str(timestamp).strip()
+        if text.endswith(("Z", "z")):
+            text = text[:-1] + "+00:00"
+        try:
+            moment = datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f"Timestamp must be ISO 8601, got {timestamp!r}") from None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // timedelta(milliseconds=1)
+
+
+def _author_keys(author_ids: list[str]) -> list[int | str]:
+    """Convert author IDs for a filter; IDs that cannot be stored cannot match and are dropped."""
+    keys = []
+    for author_id in author_ids:
+        try:
+            keys.append(_to_author(author_id))
+        except ValueError:
+            continue
+    return keys
 
 
 class ViolationsDatabase:
     """Manages the violations database."""
     
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, background_writer: Optional[bool] = None):
         """Initialize database connection.
         
         Args:
             db_path: Path to the database file. If None, uses settings default.
+            background_writer: Commit inserts in batches on a writer thread.
+                If None, reads from settings.
         """
         self.db_path = db_path or get_database_path()
+        self.writer: ViolationWriter | None = None
+        self.fts_enabled = False
+        # Interned rule names; IDs are never reused, so entries stay valid
+        self._rule_ids: dict[str, int] = {}
+        self._rule_lock = threading.Lock()
+        # Bumped on every change to violations; read caches key on it
+        self._write_generation = 0
+        # Change tokens per author (None = all), valid while data_version is unchanged
+        self._change_lock = threading.Lock()
+        self._change_con: sqlite3.Connection | None = None
+        self._data_version: int | None = None
+        self._change_tokens: dict[str | None, tuple[int, int]] = {}
         self.initialize()
+        if background_writer if background_writer is not None else get_writer_enabled():
+            self.start_writer()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection that waits on the write lock instead of failing."""
+        return sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_S)
     
     def initialize(self) -> None:
-        """Create the violations table if it doesn't exist."""
-        con = sqlite3.connect(self.db_path)
+        """Create the tables if they don't exist, migrating an old-layout file first."""
+        con = self._connect()
+        # Only takes effect on a new file; compact() converts existing ones
+        con.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # WAL lets readers proceed while a write transaction is open
+        con.execute("PRAGMA journal_mode=WAL")
+        migrated = False
+        if con.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            migrated = self._migrate_v1(con)
         cur = con.cursor()
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS violations (
-                id INTEGER PRIMARY KEY,
-                post_id TEXT NOT NULL,
-                author_id TEXT NOT NULL,
-                rule_violated TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                content_snippet TEXT,
-                UNIQUE(post_id, rule_violated)
-            )
-        """)
+        for statement in _SCHEMA:
+            cur.execute(statement)
+        cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         con.commit()
+        self.fts_enabled = self._initialize_fts(con)
         con.close()
-        print(f"Database initialized successfully at: {self.db_path}")
+        if migrated:
+            self._bump_write_generation()
+        logger.info("Database initialized", extra={"db_path": self.db_path, "schema_version": SCHEMA_VERSION})
+    
+    def _migrate_v1(self, con: sqlite3.Connection) -> bool:
+        """Convert a file in the original all-TEXT layout to schema v2.
+        
+        Runs as one transaction, so a failure leaves the old tables intact.
+        Row IDs are kept. Author IDs are stored through the column's integer
+        affinity, the same as new inserts: numeric IDs become integers, any
+        other ID stays text. IDs that read back differently (e.g. "007") are
+        counted in the log. Timestamps SQLite cannot parse are stored as 0
+        (1970-01-01) and counted in the log.
+        
+        Returns:
+            True if a migration ran
+        """
+        # Taking the write lock first makes a second process wait, then see v2
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row[1] for row in con.execute("PRAGMA table_info(violations)")}
+            if "rule_violated" not in columns:
+                # New file, or migrated by another process meanwhile
+                con.rollback()
+                return False
+            started = time.perf_counter()
+            has_rollups = con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'violation_daily_counts'"
+            ).fetchone() is not None
+            
+            # The full-text index is rebuilt over the new tables afterwards
+            for trigger in ("violations_fts_insert", "violations_fts_delete", "violations_fts_update"):
+                con.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            if con.execute("SELECT 1 FROM sqlite_master WHERE name = 'violations_fts'").fetchone():
+                con.execute("DROP TABLE violations_fts")
+            con.execute("DROP INDEX IF EXISTS idx_violations_timestamp")
+            con.execute("DROP INDEX IF EXISTS idx_violations_author_timestamp")
+            con.execute("ALTER TABLE violations RENAME TO violations_v1")
+            if has_rollups:
+                con.execute("ALTER TABLE violation_daily_counts RENAME TO violation_daily_counts_v1")
+            for statement in _SCHEMA:
+                con.execute(statement)
+            
+            con.execute("INSERT OR IGNORE INTO rules (name) SELECT DISTINCT rule_violated FROM violations_v1")
+            # julianday() reads the same ISO 8601 forms the API stores; 2440587.5 is the Unix epoch
+            cur = con.execute(
+                """INSERT INTO violations (id, post_id, author_id, rule_id, created_at, content_snippet)
+                   SELECT o.id, o.post_id, o.author_id, r.id,
+                          COALESCE(CAST(ROUND((julianday(o.timestamp) - 2440587.5) * 86400000) AS INTEGER), 0),
+                          o.content_snippet
+                   FROM violations_v1 o
+                   JOIN rules r ON r.name = o.rule_violated
+                   ORDER BY o.id"""
+            )
+            rows = cur.rowcount
+            unparsed = con.execute(
+                "SELECT COUNT(*) FROM violations_v1 WHERE julianday(timestamp) IS NULL"
+            ).fetchone()[0]
+            text_authors = con.execute(
+                "SELECT COUNT(*) FROM violations WHERE typeof(author_id) = 'text'"
+            ).fetchone()[0]
+            changed_authors = con.execute(
+                """SELECT COUNT(*) FROM violations v JOIN violations_v1 o ON o.id = v.id
+                   WHERE CAST(v.author_id AS TEXT) IS NOT o.author_id"""
+            ).fetchone()[0]
+            rollups = 0
+            if has_rollups:
+                con.execute(
+                    "INSERT OR IGNORE INTO rules (name) SELECT DISTINCT rule_violated FROM violation_daily_counts_v1"
+                )
+                cur = con.execute(
+                    # IDs that are equal once stored (e.g. "7" and "007") are added up
+                    """INSERT INTO violation_daily_counts (day, author_id, rule_id, count)
+                       SELECT CAST(julianday(o.day) - 2440587.5 AS INTEGER), o.author_id, r.id, SUM(o.count)
+                       FROM violation_daily_counts_v1 o
+                       JOIN rules r ON r.name = o.rule_violated
+                       WHERE julianday(o.day) IS NOT NULL
+                       GROUP BY 1, 2, 3
+                       ON CONFLICT (day, author_id, rule_id)
+                       DO UPDATE SET count = count + excluded.count"""
+                )
+                rollups = cur.rowcount
+                con.execute("DROP TABLE violation_daily_counts_v1")
+            con.execute("DROP TABLE violations_v1")
+            con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        logger.info("Database migrated to schema v2", extra={
+            "db_path": self.db_path,
+            "rows": rows,
+            "rollup_rows": rollups,
+            "unparsed_timestamps": unparsed,
+            "text_author_ids": text_authors,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+        if unparsed:
+            logger.warning("Violations with unparseable timestamps stored as 1970-01-01",
+                           extra={"rows": unparsed})
+        if changed_authors:
+            logger.warning("Violations with numeric author IDs stored in normalized form",
+                           extra={"rows": changed_authors})
+        return True
+    
+    def _initialize_fts(self, con: sqlite3.Connection) -> bool:
+        """Create the full-text index over snippets and rule names, kept in sync by triggers.
+        
+        Returns:
+            True if FTS5 is available in this SQLite build
+        """
+        exists = con.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'violations_fts'"
+        ).fetchone()
+        try:
+            con.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS violations_fts USING fts5(
+                    content_snippet, rule_violated,
+                    content='violation_rows', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS violations_fts_insert AFTER INSERT ON violations BEGIN
+                    INSERT INTO violations_fts (rowid, content_snippet, rule_violated)
+                    VALUES (new.id, new.content_snippet, (SELECT name FROM rules WHERE id = new.rule_id));
+                END;
+                CREATE TRIGGER IF NOT EXISTS violations_fts_delete AFTER DELETE ON violations BEGIN
+                    INSERT INTO violations_fts (violations_fts, rowid, content_snippet, rule_violated)
+                    VALUES ('delete', old.id, old.content_snippet, (SELECT name FROM rules WHERE id = old.rule_id));
+                END;
+                CREATE TRIGGER IF NOT EXISTS violations_fts_update AFTER UPDATE ON violations BEGIN
+                    INSERT INTO violations_fts (violations_fts, rowid, content_snippet, rule_violated)
+                    VALUES ('delete', old.id, old.content_snippet, (SELECT name FROM rules WHERE id = old.rule_id));
+                    INSERT INTO violations_fts (rowid, content_snippet, rule_violated)
+                    VALUES (new.id, new.content_snippet, (SELECT name FROM rules WHERE id = new.rule_id));
+                END;
+            """)
+        except sqlite3.OperationalError as e:
+            logger.warning("Full-text search unavailable, falling back to LIKE", extra={"error": str(e)})
+            return False
+        if not exists:
+            # Index rows written before the index existed
+            con.execute("INSERT INTO violations_fts (violations_fts) VALUES ('rebuild')")
+            con.commit()
+        return True
+    
+    def start_writer(self, batch_size: int | None = None, flush_interval_s: float | None = None) -> None:
+        """Route inserts through a background group-commit writer thread.
+        
+        Args:
+            batch_size: Maximum rows per transaction. If None, reads from settings.
+            flush_interval_s: Maximum wait before committing. If None, reads from settings.
+        """
+        if self.writer is not None:
+            return
+        self.writer = ViolationWriter(
+            self,
+            batch_size=batch_size or get_writer_batch_size(),
+            flush_interval_s=flush_interval_s if flush_interval_s is not None else get_writer_flush_interval_s(),
+        )
+        logger.info("Background writer started", extra={"db_path": self.db_path})
+    
+    def stop_writer(self) -> None:
+        """Commit pending rows and return to direct inserts."""
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.stop()
+            logger.info("Background writer stopped", extra=writer.stats)
+    
+    @staticmethod
+    def encode_row(row: tuple) -> tuple[str, int | str, str, int, str]:
+        """Convert a (post_id, author_id, rule, timestamp, content) row to its stored form.
+        
+        Rows are encoded by the caller, before they are queued, so a bad row
+        fails on its own instead of failing a writer batch.
+        
+        Returns:
+            (post_id, author, rule, epoch_ms, snippet) tuple
+            
+        Raises:
+            ValueError: The author ID is invalid (see ``_to_author``) or the
+                timestamp is not ISO 8601
+        """
+        post_id, author_id, rule, timestamp, content = row
+        return post_id, _to_author(author_id), rule, _to_epoch_ms(timestamp), (content or "")[:200]
+    
+    def submit_violation(
+        self,
+        post_id: str,
+        author_id: str,
+        rule: str,
+        timestamp: str,
+        content: str
+    ) -> Future:
+        """Queue a violation without waiting for it to be committed.
+        
+        Without a background writer the row is inserted immediately.
+        
+        Args:
+            post_id: Unique identifier for the post
+            author_id: The author's FID (or any other non-empty ID)
+            rule: Description of the rule violated
+            timestamp: When the violation occurred (ISO 8601)
+            content: Content snippet (will be truncated to 200 chars)
+            
+        Returns:
+            Future resolving to True if the violation was added, False if it already existed
+            
+        Raises:
+            ValueError: The author ID is invalid or the timestamp is not ISO 8601
+        """
+        # One read: stop_writer() may clear the attribute at any time
+        writer = self.writer
+        if writer is not None:
+            try:
+                return writer.submit(self.encode_row((post_id, author_id, rule, timestamp, content)))
+            except WriterClosed:
+                pass
+        future: Future = Future()
+        future.set_result(self.add_violation(post_id, author_id, rule, timestamp, content))
+        return future
     
     def add_violation(
         self,
@@ -47,25 +460,39 @@ class ViolationsDatabase:
         
         Args:
             post_id: Unique identifier for the post
-            author_id: Unique identifier for the author
+            author_id: The author's FID (or any other non-empty ID)
             rule: Description of the rule violated
-            timestamp: When the violation occurred
+            timestamp: When the violation occurred (ISO 8601)
             content: Content snippet (will be truncated to 200 chars)
             
         Returns:
-            True if violation was added, False if it already exists
+            True if violation was added, False if it already exists or is
+            older than what retention has already rolled up
+            
+        Raises:
+            ValueError: The author ID is invalid or the timestamp is not ISO 8601
         """
-        con = sqlite3.connect(self.db_path)
+        row = self.encode_row((post_id, author_id, rule, timestamp, content))
+        # One read: stop_writer() may clear the attribute at any time
+        writer = self.writer
+        if writer is not None:
+            try:
+                return writer.submit(row, waiting=True).result()
+            except WriterClosed:
+                # Stopped meanwhile; insert directly below
+                pass
+        
+        con = self._connect()
         cur = con.cursor()
         try:
-            cur.execute(
-                """INSERT INTO violations 
-                   (post_id, author_id, rule_violated, timestamp, content_snippet) 
-                   VALUES (?, ?, ?, ?, ?)""",
-                (post_id, author_id, rule, timestamp, content[:200])
-            )
+            rule_id = self._rule_ids_for(con, [rule])[rule]
+            cur.execute(_INSERT_ROW.format(conflict=""), (row[0], row[1], rule_id, row[3], row[4], row[3]))
             con.commit()
-            print(f"✅ VIOLATION LOGGED for post {post_id} -> Rule: {rule}")
+            if cur.rowcount != 1:
+                logger.debug("Violation older than retention skipped", extra={"post_id": post_id, "rule": rule})
+                return False
+            self._bump_write_generation()
+            logger.debug("Violation logged", extra={"post_id": post_id, "author_id": author_id, "rule": rule})
             return True
         except sqlite3.IntegrityError:
             # Violation already exists
@@ -73,6 +500,66 @@ class ViolationsDatabase:
         finally:
             con.close()
     
+    def add_violations(self, rows: list[tuple[str, str, str, str, str]]) -> list[bool]:
+        """Add many violations in a single transaction.
+        
+        Args:
+            rows: Tuples of (post_id, author_id, rule, timestamp, content),
+                in the same order as the add_violation arguments
+            
+        Returns:
+            For each row, True if it was added, False if it already existed
+            or is older than what retention has already rolled up
+            
+        Raises:
+            ValueError: A row's author ID is invalid or its timestamp is not
+                ISO 8601; nothing is added
+        """
+        if not rows:
+            return []
+        encoded = [self.encode_row(row) for row in rows]
+        con = self._connect()
+        try:
+            return self._insert_rows(con, encoded)
+        finally:
+            con.close()
+    
+    def _rule_ids_for(self, con: sqlite3.Connection, names) -> dict[str, int]:
+        """Get the IDs of rule names, adding new names to the rules table.
+        
+        New names are committed before the caller's insert, so a rolled-back
+        insert cannot leave a cached ID that does not exist.
+        """
+        with self._rule_lock:
+            missing = sorted({name for name in names if name not in self._rule_ids})
+            if missing:
+                con.executemany("INSERT OR IGNORE INTO rules (name) VALUES (?)", [(name,) for name in missing])
+                con.commit()
+                placeholders = ",".join("?" * len(missing))
+                for rule_id, name in con.execute(f"SELECT id, name FROM rules WHERE name IN ({placeholders})",
+                                                 missing):
+                    self._rule_ids[name] = rule_id
+            return {name: self._rule_ids[name] for name in names}
+    
+    def _insert_rows(self, con: sqlite3.Connection, rows: list[tuple[str, int | str, str, int, str]]) -> list[bool]:
+        """Insert encoded violation rows and commit them as one transaction on an open connection."""
+        rule_ids = self._rule_ids_for(con, {row[2] for row in rows})
+        cur = con.cursor()
+        inserted = []
+        try:
+            for post_id, author, rule, created_at, snippet in rows:
+                cur.execute(_INSERT_ROW.format(conflict="OR IGNORE"),
+                            (post_id, author, rule_ids[rule], created_at, snippet, created_at))
+                inserted.append(cur.rowcount == 1)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        if any(inserted):
+            self._bump_write_generation()
+        logger.debug("Violations batch committed", extra={"rows": len(rows), "inserted": sum(inserted)})
+        return inserted
+    
     def get_violations_by_author(self, author_id: str) -> list[dict]:
         """Get all violations for a specific author.
         
@@ -82,14 +569,17 @@ class ViolationsDatabase:
         Returns:
             List of violation dictionaries
         """
-        con = sqlite3.connect(self.db_path)
+        authors = _author_keys([author_id])
+        if not authors:
+            return []
+        con = self._connect()
         con.row_factory = sqlite3.Row
         cur = con.cursor()
         cur.execute(
-            """SELECT * FROM violations 
-               WHERE author_id = ? 
-               ORDER BY timestamp DESC""",
-            (author_id,)
+            f"""SELECT {_ROW_SELECT} FROM violation_rows v
+                WHERE v.fid = ? 
+                ORDER BY v.created_at DESC""",
+            (authors[0],)
         )
         rows = cur.fetchall()
         con.close()
@@ -101,10 +591,354 @@ class ViolationsDatabase:
         Returns:
             List of all violation dictionaries
         """
-        con = sqlite3.connect(self.db_path)
+        con = self._connect()
+        con.row_factory = sqlite3.Row
+        cur = con.cursor()
+        cur.execute(f"SELECT {_ROW_SELECT} FROM violation_rows v ORDER BY v.created_at DESC")
+        rows = cur.fetchall()
+        con.close()
+        return [dict(row) for row in rows]
+    
+    def _bump_write_generation(self) -> None:
+        with self._change_lock:
+            self._write_generation += 1
+            self._change_tokens.clear()
+    
+    def _check_data_version(self) -> sqlite3.Connection:
+        """Notice commits by other connections; the change lock must be held.
+        
+        Returns:
+            The connection used for change detection
+        """
+        if self._change_con is None:
+            self._change_con = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+        data_version = self._change_con.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            if self._data_version is not None:
+                self._write_generation += 1
+            self._data_version = data_version
+            self._change_tokens.clear()
+        return self._change_con
+    
+    def get_write_generation(self) -> int:
+        """Get a counter that increases whenever violations may have changed.
+        
+        It is bumped by inserts and retention in this process, and when SQLite's
+        ``PRAGMA data_version`` shows a commit from another connection or
+        process. Reading it runs no query on the tables.
+        """
+        with self._change_lock:
+            self._check_data_version()
+            return self._write_generation
+    
+    def get_change_token(self, author_ids: list[str] | None = None) -> tuple:
+        """Get a value that changes whenever the given authors' violations change.
+        
+        Each author's token is the newest violation ID and the row count, so
+        inserts and deletions both change it. Tokens are cached until the
+        database file is committed to by any connection, in any process,
+        which is detected with ``PRAGMA data_version``; while nothing is
+        written, no table is read.
+        
+        Args:
+            author_ids: Authors to cover; None covers all violations
+            
+        Returns:
+            Hashable token, equal between calls only if nothing changed
+        """
+        keys: list[str | None] = [None] if author_ids is None else [str(a) for a in author_ids]
+        with self._change_lock:
+            con = self._check_data_version()
+            for key in keys:
+                if key in self._change_tokens:
+                    continue
+                if key is None:
+                    row = con.execute("SELECT MAX(id), COUNT(*) FROM violations").fetchone()
+                else:
+                    authors = _author_keys([key])
+                    if not authors:
+                        # An ID that cannot be stored has no violations
+                        self._change_tokens[key] = (0, 0)
+                        continue
+                    row = con.execute("SELECT MAX(id), COUNT(*) FROM violations WHERE author_id = ?",
+                                      (authors[0],)).fetchone()
+                self._change_tokens[key] = (row[0] or 0, row[1])
+            return tuple(self._change_tokens[key] for key in keys)
+    
+    def record_verdict_reuse(self, post_id: str, author_id: str, rule: str, source_post_id: str | None,
+                             distance: int, violates: bool) -> bool:
+        """Record that a verdict was copied from a near-duplicate post.
+        
+        Args:
+            post_id: Post that received the reused verdict
+            author_id: Author of that post
+            rule: Rule the verdict is for
+            source_post_id: Post the verdict was originally made for
+            distance: SimHash distance between the two posts in bits
+            violates: The reused verdict
+            
+        Returns:
+            True if recorded, False if already recorded for this post and rule
+        """
+        con = self._connect()
+        try:
+            cur = con.cursor()
+            cur.execute(
+                """INSERT OR IGNORE INTO verdict_reuse
+                   (post_id, author_id, rule, source_post_id, distance, violates, reused_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (post_id, author_id, rule, source_post_id, distance, int(bool(violates)),
+                 datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
+            )
+            con.commit()
+            return cur.rowcount == 1
+        finally:
+            con.close()
+    
+    def get_verdict_reuse(self, post_id: str | None = None, source_post_id: str | None = None,
+                          limit: int = 100) -> list[dict]:
+        """Get recorded verdict reuses, newest first.
+        
+        Args:
+            post_id: Only reuses for this post
+            source_post_id: Only reuses of verdicts made for this post
+            limit: Maximum rows returned
+            
+        Returns:
+            List of verdict reuse dictionaries
+        """
+        clauses, params = [], []
+        if post_id is not None:
+            clauses.append("post_id = ?")
+            params.append(post_id)
+        if source_post_id is not None:
+            clauses.append("source_post_id = ?")
+            params.append(source_post_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        con = self._connect()
+        con.row_factory = sqlite3.Row
+        try:
+            rows = con.execute(
+                f"SELECT * FROM verdict_reuse {where} ORDER BY id DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        finally:
+            con.close()
+        return [dict(row) for row in rows]
+    
+    def apply_retention(self, retention_days: int | None = None) -> int:
+        """Roll up and delete violations older than the retention window.
+        
+        Rows are added to the daily per-author, per-rule counts before they
+        are deleted, in the same transaction, and the cutoff is recorded:
+        violations from before it, e.g. found again by a re-scan of stored
+        casts, are no longer inserted, so they are never counted twice.
+        Verdict reuse records older than the window are dropped too.
+        
+        Args:
+            retention_days: Days of raw rows to keep. If None, reads from
+                settings; 0 keeps everything.
+            
+        Returns:
+            Number of raw rows removed
+        """
+        days = retention_days if retention_days is not None else get_retention_days()
+        if days <= 0:
+            return 0
+        cutoff_time = datetime.now(timezone.utc) - timedelta(days=days)
+        cutoff = cutoff_time.strftime("%Y-%m-%dT%H:%M:%S")
+        cutoff_ms = _to_epoch_ms(cutoff_time)
+        con = self._connect()
+        try:
+            cur = con.cursor()
+            cur.execute(
+                """INSERT INTO violation_daily_counts (day, author_id, rule_id, count)
+                   SELECT created_at / ?, author_id, rule_id, COUNT(*)
+                   FROM violations
+                   WHERE created_at < ?
+                   GROUP BY 1, 2, 3
+                   ON CONFLICT (day, author_id, rule_id)
+                   DO UPDATE SET count = count + excluded.count""",
+                (_MS_PER_DAY, cutoff_ms)
+            )
+            cur.execute("DELETE FROM violations WHERE created_at < ?", (cutoff_ms,))
+            removed = cur.rowcount
+            # Never moves back, even if the window is made longer later
+            cur.execute(
+                """INSERT INTO retention_state (id, rolled_up_before) VALUES (1, ?)
+                   ON CONFLICT (id) DO UPDATE SET rolled_up_before = MAX(rolled_up_before, excluded.rolled_up_before)""",
+                (cutoff_ms,)
+            )
+            cur.execute("DELETE FROM verdict_reuse WHERE reused_at < ?", (cutoff,))
+            con.commit()
+        finally:
+            con.close()
+        if removed:
+            self._bump_write_generation()
+        logger.info("Retention applied", extra={"retention_days": days, "rows_removed": removed})
+        return removed
+    
+    def compact(self, pages: int | None = None) -> None:
+        """Return free pages to the filesystem with an incremental vacuum.
+        
+        A database created before incremental auto-vacuum was enabled is
+        converted once with a full VACUUM.
+        
+        Args:
+            pages: Maximum pages to free. If None, reads from settings; 0 frees all.
+        """
+        pages = pages if pages is not None else get_vacuum_pages()
+        con = self._connect()
+        try:
+            mode = con.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if mode != 2:
+                con.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                con.execute("VACUUM")
+                logger.info("Database converted to incremental auto-vacuum", extra={"db_path": self.db_path})
+            con.commit()
+            # The pragma frees one page per step and execute() only steps once;
+            # executescript() runs it to completion
+            con.executescript(f"PRAGMA incremental_vacuum({int(pages)});" if pages > 0 else "PRAGMA incremental_vacuum;")
+            # Truncate the WAL so the freed space actually leaves the disk
+            con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            con.close()
+    
+    def get_violation_counts(self, author_ids: list[str] | None = None, since_day: str | None = None) -> list[dict]:
+        """Get daily violation counts per author and rule.
+        
+        Combines the rolled-up counts with the raw rows still retained, so the
+        totals cover the full history.
+        
+        Args:
+            author_ids: Restrict to these authors (None = all)
+            since_day: Only days on or after this YYYY-MM-DD date (None = all)
+            
+        Returns:
+            List of dictionaries with day, author_id, rule_violated and count
+        """
+        def where(day_column: str, since) -> tuple[str, list]:
+            # Filters are built per branch so the raw branch can use its indexes
+            filters, params = [], []
+            if authors is not None:
+                filters.append(f"author_id IN ({','.join('?' * len(authors))})")
+                params.extend(authors)
+            if since is not None:
+                filters.append(f"{day_column} >= ?")
+                params.append(since)
+            return (f"WHERE {' AND '.join(filters)}" if filters else ""), params
+        
+        authors = _author_keys(author_ids) if author_ids is not None else None
+        if authors is not None and not authors:
+            return []
+        since = (date.fromisoformat(since_day[:10]) - _EPOCH.date()).days if since_day else None
+        rollup_where, rollup_params = where("day", since)
+        raw_where, raw_params = where("created_at", since * _MS_PER_DAY if since is not None else None)
+        
+        con = self._connect()
         con.row_factory = sqlite3.Row
         cur = con.cursor()
-        cur.execute("SELECT * FROM violations ORDER BY timestamp DESC")
+        cur.execute(
+            f"""SELECT date(c.day * 86400, 'unixepoch') AS day, CAST(c.author_id AS TEXT) AS author_id,
+                       r.name AS rule_violated, SUM(c.count) AS count
+                FROM (
+                    SELECT day, author_id, rule_id, count
+                    FROM violation_daily_counts
+                    {rollup_where}
+                    UNION ALL
+                    SELECT created_at / {_MS_PER_DAY} AS day, author_id, rule_id, COUNT(*) AS count
+                    FROM violations
+                    {raw_where}
+                    GROUP BY 1, 2, 3
+                ) c
+                JOIN rules r ON r.id = c.rule_id
+                GROUP BY c.day, c.author_id, c.rule_id
+                ORDER BY c.day DESC""",
+            rollup_params + raw_params
+        )
         rows = cur.fetchall()
         con.close()
         return [dict(row) for row in rows]
+    
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """Turn free text into an FTS5 query matching all words (``word*`` for prefixes)."""
+        terms = []
+        for word in text.split():
+            prefix = word.endswith("*")
+            word = word.rstrip("*").replace('"', '""')
+            if word:
+                terms.append(f'"{word}"*' if prefix else f'"{word}"')
+        return " ".join(terms)
+    
+    def search_violations(
+        self,
+        query: str,
+        author_ids: list[str] | None = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> dict:
+        """Search violation snippets and rule names by keyword.
+        
+        Every word must match; a trailing ``*`` matches a prefix. Results are
+        ranked by relevance (BM25), best first.
+        
+        Args:
+            query: Search text
+            author_ids: Restrict to these authors (None = all)
+            limit: Page size
+            offset: Number of results to skip
+            
+        Returns:
+            Dictionary with the page of "violations" and the "total" match count
+        """
+        fts_query = self._fts_query(query)
+        authors = _author_keys(author_ids) if author_ids is not None else None
+        if not fts_query or (authors is not None and not authors):
+            return {"violations": [], "total": 0}
+        
+        author_filter, params = "", []
+        if authors is not None:
+            author_filter = f"AND v.fid IN ({','.join('?' * len(authors))})"
+            params = authors
+        
+        con = self._connect()
+        con.row_factory = sqlite3.Row
+        cur = con.cursor()
+        if self.fts_enabled and author_ids is None:
+            # Rank and page inside the index, then fetch only the page's rows
+            cur.execute("SELECT COUNT(*) FROM violations_fts WHERE violations_fts MATCH ?", (fts_query,))
+            total = cur.fetchone()[0]
+            cur.execute(
+                f"""SELECT {_ROW_SELECT} FROM (
+                       SELECT rowid, rank FROM violations_fts
+                       WHERE violations_fts MATCH ?
+                       ORDER BY rank LIMIT ? OFFSET ?
+                   ) f
+                   JOIN violation_rows v ON v.id = f.rowid
+                   ORDER BY f.rank""",
+                (fts_query, limit, offset)
+            )
+        else:
+            if self.fts_enabled:
+                source = """FROM violations_fts f
+                            JOIN violation_rows v ON v.id = f.rowid
+                            WHERE violations_fts MATCH ?"""
+                order = "ORDER BY f.rank"
+                match_params = [fts_query]
+            else:
+                words = [w.rstrip("*") for w in query.split() if w.rstrip("*")]
+                source = "FROM violation_rows v WHERE " + " AND ".join(
+                    "(v.content_snippet LIKE ? OR v.rule_violated LIKE ?)" for _ in words)
+                order = "ORDER BY v.created_at DESC"
+                match_params = [p for w in words for p in (f"%{w}%", f"%{w}%")]
+            
+            cur.execute(f"SELECT COUNT(*) {source} {author_filter}", match_params + params)
+            total = cur.fetchone()[0]
+            cur.execute(
+                f"SELECT {_ROW_SELECT} {source} {author_filter} {order} LIMIT ? OFFSET ?",
+                match_params + params + [limit, offset]
+            )
+        rows = cur.fetchall()
+        con.close()
+        return {"violations": [dict(row) for row in rows], "total": total}
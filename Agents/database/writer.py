@@ -0,0 +1,147 @@
+"""Background group-commit writer for the violations database."""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from core.log import get_logger
+
+logger = get_logger("database.writer")
+
+# Sentinel telling the writer thread to exit
+_STOP = object()
+
+
+class WriterClosed(RuntimeError):
+    """Raised when a row is submitted to a writer that was stopped."""
+
+
+class ViolationWriter:
+    """Single thread committing queued violation rows in batches.
+
+    Rows are committed once ``batch_size`` rows are pending or the oldest has
+    waited ``flush_interval_s``. When a blocked caller is waiting on a row in
+    the batch, the batch is committed as soon as the queue runs dry instead,
+    so synchronous inserts only wait for rows that arrived concurrently.
+    """
+
+    def __init__(self, database, batch_size: int, flush_interval_s: float):
+        """Initialize the writer.
+
+        Args:
+            database: ViolationsDatabase used for the batched inserts
+            batch_size: Maximum rows per transaction
+            flush_interval_s: Maximum time a row waits before being committed
+        """
+        self.database = database
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self.queue: queue.Queue = queue.Queue()
+        self.stats = {"rows": 0, "inserted": 0, "batches": 0, "errors": 0}
+        # Set under the lock by stop(), so no row is queued behind _STOP
+        self._closed = False
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="violations-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: tuple, waiting: bool = False) -> Future:
+        """Queue a row for insertion.
+
+        Args:
+            row: (post_id, author_id, rule, timestamp, content) tuple
+            waiting: The caller blocks on the result, so do not linger
+
+        Returns:
+            Future resolving to True if the row was newly inserted
+
+        Raises:
+            WriterClosed: The writer was stopped; insert the row directly
+        """
+        future: Future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise WriterClosed("violation writer is stopped")
+            self.queue.put((row, future, waiting))
+        return future
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Commit everything queued so far and stop the thread."""
+        with self._submit_lock:
+            if not self._closed:
+                self._closed = True
+                self.queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        # The writer keeps one connection open for its whole lifetime
+        self._con = None
+        try:
+            self._con = self.database._connect()
+            self._loop()
+        except Exception:
+            logger.exception("Violation writer failed")
+        finally:
+            with self._submit_lock:
+                self._closed = True
+            self._drain()
+            if self._con is not None:
+                self._con.close()
+
+    def _drain(self) -> None:
+        """Settle every row still queued once the loop has ended, so no caller waits forever."""
+        leftover = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        if not leftover:
+            return
+        if self._con is not None:
+            self._commit(leftover)
+            return
+        error = WriterClosed("violation writer stopped before committing the row")
+        for _, future, _ in leftover:
+            future.set_exception(error)
+
+    def _loop(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            urgent = item[2]
+            deadline = time.monotonic() + self.flush_interval_s
+            while len(batch) < self.batch_size:
+                try:
+                    if urgent:
+                        item = self.queue.get_nowait()
+                    else:
+                        item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                urgent = urgent or item[2]
+            self._commit(batch)
+
+    def _commit(self, batch: list) -> None:
+        rows = [row for row, _, _ in batch]
+        try:
+            results = self.database._insert_rows(self._con, rows)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.exception("Violation batch commit failed", extra={"rows": len(rows)})
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        self.stats["batches"] += 1
+        self.stats["rows"] += len(rows)
+        self.stats["inserted"] += sum(results)
+        for (_, future, _), inserted in zip(batch, results):
+            future.set_result(inserted)
@@ -1,9 +1,54 @@
 """Main entry point for the Farcaster monitoring application."""
+import argparse
+import os
+from core.components import get_profiler, get_token_ledger
+from database.retention import RetentionManager
 from monitor import FarcasterMonitor
+from scheduler import AdaptiveScheduler
+from sharding import ShardedMonitor
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Farcaster Monitoring Agent")
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Keep running and poll each user at an adaptive interval instead of a single sweep'
+    )
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=None,
+        help='Number of days to look back (default: 7 for a sweep, 1 per daemon poll)'
+    )
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=1,
+        help='Split users across this many worker processes for a sweep (default: 1)'
+    )
+    parser.add_argument(
+        '--rescan',
+        action='store_true',
+        help='Re-run the rules over locally stored casts instead of fetching (--days limits the window)'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='DIR',
+        help='Write cProfile stats and tracemalloc snapshots of each sweep or daemon poll to DIR '
+             '(same as PROFILE_DIR; PROFILE_SAMPLE_EVERY=N profiles one in N)'
+    )
+    return parser.parse_args()
 
 
 def main():
     """Main application entry point."""
+    args = parse_args()
+    if args.profile:
+        # Through the environment, so sharded worker processes profile too
+        os.environ["PROFILE_DIR"] = args.profile
+    
     print("=" * 60)
     print("   Farcaster Monitoring Agent")
     print("=" * 60)
@@ -33,12 +78,39 @@ def main():
         ]
     )
     
-    # Monitor all configured users
-    print("\n" + "=" * 60)
-    print("   Starting Monitoring Process")
-    print("=" * 60)
-    
-    results = monitor.monitor_all_users(days=7)
+    if args.daemon:
+        print("\n" + "=" * 60)
+        print("   Starting Monitoring Daemon (Ctrl+C to stop)")
+        print("=" * 60)
+        
+        scheduler = AdaptiveScheduler(monitor, days=args.days or 1)
+        scheduler.install_signal_handlers()
+        retention = RetentionManager(monitor.database, cast_store=monitor.cast_store).start()
+        try:
+            results = scheduler.run()
+        finally:
+            retention.stop()
+    elif args.rescan:
+        print("\n" + "=" * 60)
+        print("   Re-scanning Stored Casts")
+        print("=" * 60)
+        
+        with get_profiler().profile("rescan"):
+            results = monitor.rescan_all_users(days=args.days)
+    else:
+        # Monitor all configured users
+        print("\n" + "=" * 60)
+        print("   Starting Monitoring Process")
+        print("=" * 60)
+        
+        if args.processes > 1:
+            sharded = ShardedMonitor(monitor.user_specs, processes=args.processes, database=monitor.database)
+            results = sharded.monitor_all_users(days=args.days or 7)
+            for user_id, error in sharded.errors.items():
+                print(f"  ! User {user_id} failed: {error}")
+        else:
+            with get_profiler().profile("sweep"):
+                results = monitor.monitor_all_users(days=args.days or 7)
     
     # Print summary
     print("\n" + "=" * 60)
@@ -50,6 +122,13 @@ def main():
     print("\nPer-user breakdown:")
     for user_id, count in results.items():
         print(f"  - User {user_id}: {count} violations")
+    usage = get_token_ledger().get_stats()
+    if usage["totals"]["calls"]:
+        totals = usage["totals"]
+        print(f"\nLLM calls: {totals['calls']} ({totals['prompt_tokens']} prompt + "
+              f"{totals['completion_tokens']} completion tokens, ${totals['cost']:.4f})")
+        for rule, rule_usage in usage["by_rule"].items():
+            print(f"  - {rule}: {rule_usage['calls']} calls, {rule_usage['total_tokens']} tokens")
     print("=" * 60)
 
 
@@ -1,10 +1,23 @@
 """Main monitoring orchestrator for Farcaster content."""
-from typing import List, Dict
+from typing import Collection, Dict, Iterable, Iterator, List, Set
 from core.base_agent import BaseAgent
-from core.settings import get_openrouter_api_key
-from database.violations_db import ViolationsDatabase
-from connectors.farcaster_api import FarcasterAPI
-from rules.rule_engine import RuleEngine, ForbiddenWordsRule, LLMBasedRule
+from core.components import get_agent, get_cast_store, get_database, get_farcaster_api, get_verdict_index
+from core.deadline import DeadlineExceeded, check_deadline
+from core.log import get_logger
+from core.models import Post
+from core.settings import (
+    get_cast_store_enabled,
+    get_fast_model,
+    get_near_duplicate_enabled,
+    get_neynar_feed_chunk_size,
+)
+from rules.near_duplicate import VerdictMatch
+from rules.rule_engine import RuleEngine, ForbiddenWordsRule, LLMBasedRule, build_local_rule
+
+logger = get_logger("monitor")
+
+# Casts buffered before they are written to the cast store while streaming
+STORE_BATCH_SIZE = 100
 
 
 class FarcasterMonitor:
@@ -13,25 +26,98 @@ class FarcasterMonitor:
     def __init__(self, api_key: str | None = None):
         """Initialize the Farcaster monitor.
         
+        The LLM agent, Neynar connector, database and cast store are created
+        on first use and shared process-wide (see core.components).
+        
         Args:
             api_key: OpenRouter API key for LLM. If None, reads from settings.
         """
-        self.api_key = api_key or get_openrouter_api_key()
-        self.agent = BaseAgent(model=None, api_key=self.api_key)
-        self.database = ViolationsDatabase()
-        self.farcaster_api = FarcasterAPI()
+        self.api_key = api_key
+        self._agent = None
+        self._database = None
+        self._farcaster_api = None
+        self._cast_store = None
         self.rule_engine = RuleEngine()
+        # Plain rule specs per user, so rule sets can be rebuilt in other processes
+        self.user_specs: Dict[str, Dict] = {}
+        
+        logger.info("Monitor initialized", extra={"model": get_fast_model()})
+    
+    @property
+    def agent(self) -> BaseAgent:
+        """LLM agent; the shared one unless an explicit API key was given."""
+        if self._agent is None:
+            self._agent = BaseAgent(model=None, api_key=self.api_key) if self.api_key else get_agent()
+        return self._agent
+    
+    @agent.setter
+    def agent(self, value: BaseAgent) -> None:
+        self._agent = value
+    
+    @property
+    def database(self):
+        """Violations database (shared per database path)."""
+        if self._database is None:
+            self._database = get_database()
+        return self._database
+    
+    @database.setter
+    def database(self, value) -> None:
+        self._database = value
+    
+    @property
+    def farcaster_api(self):
+        """Neynar connector (shared)."""
+        if self._farcaster_api is None:
+            self._farcaster_api = get_farcaster_api()
+        return self._farcaster_api
+    
+    @farcaster_api.setter
+    def farcaster_api(self, value) -> None:
+        self._farcaster_api = value
+    
+    @property
+    def cast_store(self):
+        """Local store of fetched casts (shared per database path), or None if disabled."""
+        if self._cast_store is None and get_cast_store_enabled():
+            self._cast_store = get_cast_store(getattr(self.database, "db_path", None))
+        return self._cast_store
+    
+    @cast_store.setter
+    def cast_store(self, value) -> None:
+        self._cast_store = value
+    
+    def store_casts(self, posts: List[Post]) -> int:
+        """Keep fetched casts in the cast store so they can be re-scanned later.
         
-        print(f"Monitor initialized with model: {self.agent.model}")
+        Args:
+            posts: Fetched post records
+            
+        Returns:
+            Number of casts newly stored
+        """
+        if not posts or self.cast_store is None:
+            return 0
+        try:
+            return self.cast_store.add_casts(posts)
+        except Exception as e:
+            logger.warning("Failed to store casts", extra={"casts": len(posts), "error": str(e)})
+            return 0
     
     def add_user_with_rules(self, user_id: str, forbidden_words: List[str] = None,
-                           llm_rules: List[Dict[str, str]] = None) -> None:
+                           llm_rules: List[Dict[str, str]] = None,
+                           local_rules: List[Dict] = None) -> None:
         """Configure monitoring rules for a specific user.
         
         Args:
             user_id: Farcaster user ID (FID as string)
             forbidden_words: List of words that are not allowed for this user
             llm_rules: List of dicts with 'name' and 'description' for LLM-based rules
+            local_rules: List of local rule specs (regex, phrase, domain, mention,
+                hashtag, combined with all/any/not), see rules.rule_engine.build_local_rule
+            
+        Raises:
+            ValueError: If a local rule spec is invalid
         """
         rules = []
         
@@ -39,82 +125,328 @@ class FarcasterMonitor:
         if forbidden_words:
             rules.append(ForbiddenWordsRule(forbidden_words))
         
+        # Local rules run before the LLM and are matched in a single pass
+        for rule_spec in local_rules or []:
+            rules.append(build_local_rule(rule_spec))
+        
         # Add LLM-based rules if provided
         if llm_rules:
+            verdict_index = get_verdict_index() if get_near_duplicate_enabled() else None
             for rule_spec in llm_rules:
                 rules.append(LLMBasedRule(
                     agent=self.agent,
                     rule_description=rule_spec.get("description", ""),
-                    rule_name=rule_spec.get("name", "Custom Rule")
+                    rule_name=rule_spec.get("name", "Custom Rule"),
+                    verdict_index=verdict_index,
+                    on_reuse=self._record_verdict_reuse
                 ))
         
         self.rule_engine.add_user_rules(user_id, rules)
+        self.user_specs[user_id] = {
+            "forbidden_words": list(forbidden_words or []),
+            "llm_rules": [dict(rule_spec) for rule_spec in llm_rules or []],
+            "local_rules": [dict(rule_spec) for rule_spec in local_rules or []],
+        }
+    
+    def _record_verdict_reuse(self, post: Dict, rule_name: str, match: VerdictMatch) -> None:
+        """Store where a reused near-duplicate verdict came from."""
+        try:
+            self.database.record_verdict_reuse(
+                post_id=post.get("post_id", ""),
+                author_id=post.get("author_id", ""),
+                rule=rule_name,
+                source_post_id=match.source_post_id,
+                distance=match.distance,
+                violates=match.violates
+            )
+        except Exception as e:
+            logger.warning("Failed to record verdict reuse", extra={"post_id": post.get("post_id"), "error": str(e)})
     
-    def monitor_user(self, fid: int, days: int = 7) -> int:
+    def monitor_user(self, fid: int, days: int = 7, unevaluated: Dict[str, List[str]] | None = None,
+                     skip_post_ids: Collection[str] = (), errors: Dict[str, str] | None = None) -> int:
         """Monitor a specific user's casts for violations.
         
+        Casts are checked page by page as they are fetched, so only one page
+        is held in memory at a time.
+        
         Args:
             fid: Farcaster user ID
             days: Number of days to look back
+            unevaluated: Collects what the request deadline cut off, see ``scan_casts``
+            skip_post_ids: Casts already checked (and stored) this sweep,
+                which are neither checked nor stored again
+            errors: Collects a failed fetch, see ``monitor_all_users``
             
         Returns:
             Number of new violations found
         """
-        print(f"\n--- Monitoring User FID: {fid} ---")
-        
+        logger.debug("Monitoring user", extra={"fid": fid, "days": days})
+        casts = self._fetch_stream(fid, self.farcaster_api.iter_user_casts(fid, days=days), errors)
+        if skip_post_ids:
+            casts = (cast for cast in casts if cast.post_id not in skip_post_ids)
+        return self.scan_casts(fid, casts, store=True, unevaluated=unevaluated)
+    
+    @classmethod
+    def _fetch_stream(cls, fid: int, casts: Iterator[Post],
+                      errors: Dict[str, str] | None = None) -> Iterator[Post]:
+        """Pass casts through, ending the stream with a log entry if fetching fails."""
         try:
-            user_casts = self.farcaster_api.get_user_casts(fid, days=days)
+            yield from casts
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            print(f"ERROR: Failed to fetch casts for FID {fid}: {e}")
-            return 0
+            logger.error("Failed to fetch casts", extra={"fid": fid, "error": str(e)})
+            cls._record_error(errors, str(fid), e)
+    
+    def scan_casts(self, fid: int, user_casts: Iterable[Post], store: bool = False,
+                   unevaluated: Dict[str, List[str]] | None = None) -> int:
+        """Check casts of a user for violations.
         
+        If the request deadline passes, the scan stops: no more casts are
+        fetched, and the casts already fetched but not checked are still
+        stored (so a later re-scan can check them) and listed in
+        ``unevaluated``.
+        
+        Args:
+            fid: Farcaster user ID the casts belong to
+            user_casts: Post records; any iterable, consumed once
+            store: Also keep the casts in the cast store, in batches
+            unevaluated: Filled with user_id -> IDs of unchecked casts when
+                the deadline cut the scan short (an empty list if no fetched
+                cast was left)
+            
+        Returns:
+            Number of new violations found
+        """
         violations_found = 0
+        scanned = 0
+        pending: List[Post] = []
+        skipped: List[Post] = []
+        casts = iter(user_casts)
         
-        if not user_casts:
-            print("No casts to analyze.")
-            return 0
+        try:
+            for cast in casts:
+                if store:
+                    pending.append(cast)
+                    if len(pending) >= STORE_BATCH_SIZE:
+                        self.store_casts(pending)
+                        pending = []
+                try:
+                    check_deadline("checking casts")
+                    violations_found += self.process_post(cast)
+                except DeadlineExceeded:
+                    skipped.append(cast)
+                    raise
+                scanned += 1
+        except DeadlineExceeded:
+            rest = self._fetched_rest(casts)
+            skipped.extend(rest)
+            if store:
+                pending.extend(rest)
+            self._record_unevaluated(unevaluated, str(fid), skipped)
+            logger.warning("Deadline reached, scan incomplete", extra={
+                "fid": fid,
+                "casts": scanned,
+                "unevaluated_casts": len(skipped),
+            })
+        if pending:
+            self.store_casts(pending)
         
-        print(f"\n--- Scanning {len(user_casts)} casts for rule violations ---")
+        if not scanned:
+            logger.debug("No casts to analyze", extra={"fid": fid})
+            return 0
         
-        for cast in user_casts:
-            violations = self.rule_engine.check_post(cast)
-            
-            for violated, rule_description in violations:
-                if violated:
-                    if self.database.add_violation(
-                        post_id=cast['post_id'],
-                        author_id=cast['author_id'],
-                        rule=rule_description,
-                        timestamp=cast['timestamp'],
-                        content=cast['content']
-                    ):
-                        violations_found += 1
-        
-        print(f"\n--- Analysis Complete ---")
-        print(f"New violations found: {violations_found}")
+        logger.info("User scan complete", extra={"fid": fid, "casts": scanned, "new_violations": violations_found})
         
         return violations_found
     
-    def monitor_all_users(self, days: int = 7) -> Dict[str, int]:
+    def process_post(self, post: Dict) -> int:
+        """Check a single post against its author's rules and record violations.
+        
+        Args:
+            post: Post dictionary containing 'post_id', 'author_id', 'content' and 'timestamp'
+            
+        Returns:
+            Number of new violations recorded for this post
+            
+        Raises:
+            DeadlineExceeded: The request deadline passed; nothing was recorded
+        """
+        new_violations = 0
+        for violated, rule_description in self.rule_engine.check_post(post):
+            if violated:
+                if self.database.add_violation(
+                    post_id=post['post_id'],
+                    author_id=post['author_id'],
+                    rule=rule_description,
+                    timestamp=post['timestamp'],
+                    content=post['content']
+                ):
+                    new_violations += 1
+        return new_violations
+    
+    @staticmethod
+    def _fetched_rest(casts: Iterator[Post]) -> List[Post]:
+        """Collect the casts a stream still holds, stopping at the next fetch past the deadline."""
+        rest = []
+        try:
+            for cast in casts:
+                rest.append(cast)
+        except DeadlineExceeded:
+            pass
+        return rest
+    
+    @staticmethod
+    def _record_unevaluated(unevaluated: Dict[str, List[str]] | None, user_id: str,
+                            posts: Iterable[Post]) -> None:
+        """Note a user whose scan the deadline cut short, with the casts left unchecked."""
+        if unevaluated is not None:
+            unevaluated.setdefault(user_id, []).extend(post["post_id"] for post in posts)
+    
+    @staticmethod
+    def _record_error(errors: Dict[str, str] | None, user_id: str, error: Exception) -> None:
+        """Note the first error that cut a user's sweep short."""
+        if errors is not None:
+            errors.setdefault(user_id, str(error))
+    
+    def monitor_all_users(self, days: int = 7, bulk: bool = True,
+                          unevaluated: Dict[str, List[str]] | None = None,
+                          errors: Dict[str, str] | None = None) -> Dict[str, int]:
         """Monitor all configured users.
         
+        In bulk mode users are fetched in chunks with the filtered feed, and
+        each page is checked and stored before the next one is requested.
+        Once the request deadline passes, the remaining users are only noted
+        in ``unevaluated``.
+        
         Args:
             days: Number of days to look back
+            bulk: Fetch casts for many users per request; a chunk whose bulk
+                fetch fails falls back to per-user requests, which skip the
+                casts the feed pages already delivered
+            unevaluated: Collects what the request deadline cut off, see ``scan_casts``
+            errors: Filled with user_id -> first error for users whose casts
+                failed to fetch or check; their counts only cover what succeeded
             
         Returns:
             Dictionary mapping user_id to violation count
         """
         results = {}
-        
-        for user_id in self.rule_engine.user_rules.keys():
+        fids = []
+        # A snapshot, as other requests may configure users during the sweep
+        for user_id in list(self.rule_engine.user_rules):
             try:
-                fid = int(user_id)
-                violations = self.monitor_user(fid, days=days)
-                results[user_id] = violations
+                fids.append(int(user_id))
+                results[user_id] = 0
             except ValueError:
-                print(f"Skipping invalid FID: {user_id}")
+                logger.warning("Skipping invalid FID", extra={"user_id": user_id})
+        
+        chunk_size = max(1, get_neynar_feed_chunk_size()) if bulk else 1
+        for start in range(0, len(fids), chunk_size):
+            chunk = fids[start:start + chunk_size]
+            handled: Set[str] = set()
+            if bulk and self._scan_feed_chunk(chunk, days, results, unevaluated, handled, errors):
+                continue
+            for fid in chunk:
+                try:
+                    results[str(fid)] += self.monitor_user(fid, days=days, unevaluated=unevaluated,
+                                                           skip_post_ids=handled, errors=errors)
+                except Exception as e:
+                    logger.exception("Error monitoring user", extra={"user_id": str(fid)})
+                    self._record_error(errors, str(fid), e)
+        
+        return results
+    
+    def _scan_feed_chunk(self, chunk: List[int], days: int, results: Dict[str, int],
+                         unevaluated: Dict[str, List[str]] | None = None,
+                         handled: Set[str] | None = None,
+                         errors: Dict[str, str] | None = None) -> bool:
+        """Check one chunk of users page by page from the filtered feed.
+        
+        Args:
+            handled: Filled with the IDs of the casts checked, so a fallback
+                after a failed page does not check them a second time
+            errors: Collects casts that failed to check, see ``monitor_all_users``
+        
+        Returns:
+            False if the bulk fetch failed and the chunk needs per-user requests
+        """
+        if handled is None:
+            handled = set()
+        pages = self.farcaster_api.iter_feed_pages(chunk, days=days, chunk_size=len(chunk))
+        while True:
+            try:
+                page = next(pages, None)
+            except DeadlineExceeded:
+                self._record_chunk_unevaluated(chunk, [], unevaluated)
+                return True
             except Exception as e:
-                print(f"Error monitoring user {user_id}: {e}")
-                results[user_id] = 0
+                logger.warning("Bulk fetch failed, fetching per user", extra={"fids": len(chunk), "error": str(e)})
+                return False
+            if page is None:
+                return True
+            self.store_casts(page)
+            for index, post in enumerate(page):
+                if post.author_id not in results:
+                    continue
+                try:
+                    check_deadline("checking casts")
+                    results[post.author_id] += self.process_post(post)
+                except DeadlineExceeded:
+                    rest = [unchecked for unchecked in page[index:] if unchecked.author_id in results]
+                    self._record_chunk_unevaluated(chunk, rest, unevaluated)
+                    return True
+                except Exception as e:
+                    logger.exception("Error monitoring user", extra={"user_id": post.author_id})
+                    self._record_error(errors, post.author_id, e)
+                handled.add(post.post_id)
+    
+    def _record_chunk_unevaluated(self, chunk: List[int], posts: List[Post],
+                                  unevaluated: Dict[str, List[str]] | None) -> None:
+        """Note every user of a feed chunk the deadline cut short, with their unchecked casts."""
+        for fid in chunk:
+            self._record_unevaluated(unevaluated, str(fid), [post for post in posts if post.author_id == str(fid)])
+        logger.warning("Deadline reached, feed chunk incomplete", extra={
+            "fids": len(chunk),
+            "unevaluated_casts": len(posts),
+        })
+    
+    def rescan_user(self, user_id: str, days: int | None = None,
+                    unevaluated: Dict[str, List[str]] | None = None) -> int:
+        """Run a user's current rules over their stored casts, without fetching.
         
+        Args:
+            user_id: Farcaster user ID (FID as string)
+            days: Only re-scan casts from the last N days (None = all stored)
+            unevaluated: Collects what the request deadline cut off, see ``scan_casts``
+            
+        Returns:
+            Number of new violations found
+        """
+        if self.cast_store is None:
+            logger.warning("Cast store disabled, nothing to re-scan", extra={"user_id": user_id})
+            return 0
+        fid = int(user_id)
+        return self.scan_casts(fid, self.cast_store.iter_casts(user_id, days=days), unevaluated=unevaluated)
+    
+    def rescan_all_users(self, days: int | None = None,
+                         unevaluated: Dict[str, List[str]] | None = None) -> Dict[str, int]:
+        """Re-scan the stored casts of all configured users.
+        
+        Args:
+            days: Only re-scan casts from the last N days (None = all stored)
+            unevaluated: Collects what the request deadline cut off, see ``scan_casts``
+            
+        Returns:
+            Dictionary mapping user_id to new violation count
+        """
+        results = {}
+        for user_id in list(self.rule_engine.user_rules):
+            try:
+                results[user_id] = self.rescan_user(user_id, days=days, unevaluated=unevaluated)
+            except ValueError:
+                logger.warning("Skipping invalid FID", extra={"user_id": user_id})
+            except Exception:
+                logger.exception("Error re-scanning user", extra={"user_id": user_id})
+                results[user_id] = 0
         return results
@@ -0,0 +1,93 @@
+"""Compact, cache-friendly prompts for LLM rules.
+
+Every rule sends the same system message, so providers that cache prompt
+prefixes can reuse it across rules and users. The rule text comes next and
+the cast last, so checks of one rule share an even longer prefix. Cast text
+is normalized before it is sent: URLs are reduced to their host, long
+@mentions and runs of mentions are shortened, whitespace is collapsed, and
+the result is cut to a token budget.
+"""
+import re
+from typing import Dict, List
+
+# Only the verdict is asked for: a reason would add completion tokens nobody reads
+SYSTEM_PROMPT = (
+    "You are a content moderator. Does the post violate the rule? "
+    'Reply with JSON only: {"violates": true|false}'
+)
+
+# Rough characters per token of English text, used to estimate budgets
+CHARS_PER_TOKEN = 4
+
+# Mentions longer than this many characters (without the @) are shortened
+MENTION_MAX_CHARS = 20
+# Mentions kept from a run of consecutive mentions
+MENTION_RUN_MAX = 3
+
+_TRUNCATED = " …[truncated]"
+
+_URL = re.compile(r"(?:https?://|www\.)([^\s/?#:]+)[^\s]*", re.IGNORECASE)
+_MENTION = re.compile(r"@([\w.-]{%d,})" % (MENTION_MAX_CHARS + 1))
+_MENTION_RUN = re.compile(r"@[\w.-]+(?:\s+@[\w.-]+){%d,}" % MENTION_RUN_MAX)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens of a text from its length."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _host(match: re.Match) -> str:
+    host = match.group(1).lower()
+    return f"[link: {host.removeprefix('www.')}]"
+
+
+def _mention_run(match: re.Match) -> str:
+    mentions = match.group(0).split()
+    return " ".join(mentions[:MENTION_RUN_MAX]) + f" (+{len(mentions) - MENTION_RUN_MAX} more)"
+
+
+def normalize_cast(text: str, max_tokens: int = 0) -> str:
+    """Shorten cast text for an LLM prompt without changing what it says.
+
+    Args:
+        text: Cast text
+        max_tokens: Estimated token budget (0 = no limit); longer text is
+            cut at a word boundary and marked as truncated
+
+    Returns:
+        The normalized text
+    """
+    text = _URL.sub(_host, text or "")
+    text = _MENTION.sub(lambda m: "@" + m.group(1)[:MENTION_MAX_CHARS] + "…", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    text = _MENTION_RUN.sub(_mention_run, text)
+    if max_tokens > 0 and len(text) > max_tokens * CHARS_PER_TOKEN:
+        cut = text[:max_tokens * CHARS_PER_TOKEN - len(_TRUNCATED)]
+        space = cut.rfind(" ")
+        if space > len(cut) * 0.8:
+            cut = cut[:space]
+        text = cut.rstrip() + _TRUNCATED
+    return text
+
+
+def rule_prompt(rule_description: str) -> str:
+    """Build the part of the user message that is the same for every check of a rule."""
+    return f"Rule: {_WHITESPACE.sub(' ', rule_description).strip()}\n\nPost: "
+
+
+def build_messages(rule_header: str, content: str, max_tokens: int = 0) -> List[Dict[str, str]]:
+    """Build the chat messages of one rule check.
+
+    Args:
+        rule_header: The rule's prompt from rule_prompt
+        content: Cast text
+        max_tokens: Estimated token budget of the cast text (0 = no limit)
+
+    Returns:
+        System and user messages, with the shared parts first
+    """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": rule_header + normalize_cast(content, max_tokens)},
+    ]
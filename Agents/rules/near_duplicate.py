@@ -0,0 +1,201 @@
+"""SimHash index for reusing rule verdicts across near-duplicate casts."""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple
+
+from core.settings import (
+    get_near_duplicate_max_distance,
+    get_near_duplicate_max_entries,
+    get_near_duplicate_ttl_s,
+)
+
+_WORD = re.compile(r"\w+")
+# Parts that vary between copies of the same spam and are hashed as placeholders
+_URL = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+_MENTION = re.compile(r"@[\w.-]+")
+_NUMBER = re.compile(r"\d+")
+# Words that flip a statement; casts must contain the same ones to share a verdict
+_NEGATION = re.compile(
+    r"\b(?:not|no|never|nor|none|nothing|nobody|nowhere|neither|without|cannot|"
+    r"\w+n['\u2019]t|dont|doesnt|didnt|isnt|arent|wasnt|werent|wont|cant|couldnt|shouldnt|wouldnt|aint)\b",
+    re.IGNORECASE,
+)
+
+# Word n-gram sizes used as features; longer shingles make word order count
+SHINGLE_SIZES = (1, 2, 3)
+
+FINGERPRINT_BITS = 64
+# Per-bit vote counters are packed into 16-bit lanes of one integer
+_LANE_BITS = 16
+_LANE_MASK = (1 << _LANE_BITS) - 1
+# _BYTE_LANES[b] spreads the 8 bits of byte b into 8 lanes
+_BYTE_LANES = [
+    sum(((b >> i) & 1) << (_LANE_BITS * i) for i in range(8))
+    for b in range(256)
+]
+
+
+def _normalize(text: str) -> str:
+    text = _URL.sub(" url ", text.lower())
+    text = _MENTION.sub(" mention ", text)
+    return _NUMBER.sub("0", text)
+
+
+@lru_cache(maxsize=4096)
+def simhash(text: str) -> int:
+    """Compute the 64-bit SimHash of a text's word shingles.
+
+    Features are the words and the word pairs and triples, so texts with the
+    same words in a different order, or with one word inserted, get
+    fingerprints several bits apart. URLs, mentions and numbers are hashed
+    as placeholders, since copies of the same spam differ mostly in those.
+    Results are cached, so several rules checking the same cast hash it once.
+
+    Args:
+        text: Cast content
+
+    Returns:
+        64-bit fingerprint
+    """
+    words = _WORD.findall(_normalize(text))
+    features = [
+        " ".join(words[i:i + size])
+        for size in SHINGLE_SIZES
+        for i in range(len(words) - size + 1)
+    ] or [text]
+
+    # Add up every feature's bits lane-wise, one byte of the hash at a time
+    votes = 0
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for byte in range(8):
+            votes += _BYTE_LANES[(h >> (8 * byte)) & 0xFF] << (8 * _LANE_BITS * byte)
+
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        # A bit is set when most features have it set
+        if 2 * ((votes >> (_LANE_BITS * bit)) & _LANE_MASK) > len(features):
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+@lru_cache(maxsize=4096)
+def negations(text: str) -> tuple[str, ...]:
+    """Get the negating words of a text, in order.
+
+    SimHash cannot tell "is a scam" from "is not a scam" reliably, so
+    verdicts are only shared between texts with the same negations.
+    """
+    return tuple(word.lower().replace("'", "").replace("\u2019", "") for word in _NEGATION.findall(text))
+
+
+class VerdictMatch(NamedTuple):
+    """A stored verdict found for a near-duplicate text."""
+    violates: bool
+    source_post_id: str | None
+    distance: int
+
+
+class NearDuplicateIndex:
+    """Recent verdicts indexed by SimHash, per rule scope.
+
+    Lookups return a verdict stored under the same scope whose fingerprint is
+    at most ``max_distance`` bits away. Fingerprints are split into
+    ``max_distance + 1`` bands; by the pigeonhole principle a fingerprint
+    within the distance matches at least one band exactly, so only entries
+    sharing a band are compared. The index keeps at most ``max_entries``
+    verdicts, each for ``ttl_s`` seconds.
+    """
+
+    def __init__(self, max_distance: int | None = None, max_entries: int | None = None,
+                 ttl_s: float | None = None):
+        """Initialize the index.
+
+        Args:
+            max_distance: Largest Hamming distance treated as a duplicate. If None, reads from settings.
+            max_entries: Maximum stored verdicts. If None, reads from settings.
+            ttl_s: Seconds a verdict can be reused. If None, reads from settings.
+        """
+        self.max_distance = max(0, max_distance if max_distance is not None else get_near_duplicate_max_distance())
+        self.max_entries = max(1, max_entries or get_near_duplicate_max_entries())
+        self.ttl_s = ttl_s if ttl_s is not None else get_near_duplicate_ttl_s()
+        bands = min(FINGERPRINT_BITS, self.max_distance + 1)
+        width = FINGERPRINT_BITS // bands
+        self._bands = [(i * width, (1 << (width if i < bands - 1 else FINGERPRINT_BITS - i * width)) - 1)
+                       for i in range(bands)]
+        # entry id -> (scope, fingerprint, violates, source_post_id, stored_at), oldest first
+        self._entries: OrderedDict[int, tuple] = OrderedDict()
+        self._buckets: Dict[tuple, List[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0, "stored": 0, "evicted": 0}
+
+    def _keys(self, scope, fingerprint: int) -> List[tuple]:
+        return [(scope, band, (fingerprint >> shift) & mask) for band, (shift, mask) in enumerate(self._bands)]
+
+    def _evict_oldest(self) -> None:
+        entry_id, (scope, fingerprint, _, _, _) = self._entries.popitem(last=False)
+        for key in self._keys(scope, fingerprint):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.remove(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+        self.stats["evicted"] += 1
+
+    def _prune(self, now: float) -> None:
+        while self._entries:
+            stored_at = next(iter(self._entries.values()))[4]
+            if now - stored_at <= self.ttl_s:
+                break
+            self._evict_oldest()
+
+    def lookup(self, scope, fingerprint: int) -> VerdictMatch | None:
+        """Find the closest stored verdict for a fingerprint.
+
+        Args:
+            scope: Key of the rule the verdict must come from
+            fingerprint: SimHash of the text being judged
+
+        Returns:
+            The closest match within ``max_distance``, or None
+        """
+        with self._lock:
+            self.stats["lookups"] += 1
+            self._prune(time.monotonic())
+            best = None
+            for key in self._keys(scope, fingerprint):
+                for entry_id in self._buckets.get(key, ()):
+                    _, stored, violates, source_post_id, _ = self._entries[entry_id]
+                    distance = (stored ^ fingerprint).bit_count()
+                    if distance <= self.max_distance and (best is None or distance < best.distance):
+                        best = VerdictMatch(violates, source_post_id, distance)
+            if best is not None:
+                self.stats["hits"] += 1
+            return best
+
+    def add(self, scope, fingerprint: int, violates: bool, source_post_id: str | None) -> None:
+        """Store a verdict for later near-duplicates.
+
+        Args:
+            scope: Key of the rule that produced the verdict
+            fingerprint: SimHash of the judged text
+            violates: The verdict
+            source_post_id: Post the verdict was made for
+        """
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (scope, fingerprint, violates, source_post_id, time.monotonic())
+            for key in self._keys(scope, fingerprint):
+                self._buckets.setdefault(key, []).append(entry_id)
+            self.stats["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
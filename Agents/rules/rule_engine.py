@@ -1,6 +1,14 @@
 """Rule engine for checking violations in posts."""
-from typing import Dict, List, Protocol
+import re
+from typing import Callable, Dict, List, Protocol
 from core.base_agent import BaseAgent
+from core.deadline import check_deadline
+from core.log import get_logger
+from core.settings import get_llm_cast_token_budget
+from .llm_prompt import build_messages, rule_prompt
+from .near_duplicate import NearDuplicateIndex, VerdictMatch, negations, simhash
+
+logger = get_logger("rules")
 
 
 class Rule(Protocol):
@@ -26,8 +34,74 @@ class Rule(Protocol):
         ...
 
 
-class ForbiddenWordsRule:
-    """Rule that checks for specific forbidden words."""
+# Tokens the local rule indexes are looked up with
+_WORD = re.compile(r"\w+")
+_MENTION = re.compile(r"@(?<![\w@#]@)(\w[\w-]*(?:\.\w[\w-]*)*)")
+_HASHTAG = re.compile(r"#(?<![\w@#]#)(\w+)")
+_HOST = re.compile(r"(?<![\w@#.-])(\w[\w-]*(?:\.\w[\w-]*)+)")
+
+
+class PatternRule:
+    """Base class for local rules matched against the post content.
+    
+    Pattern rules of a user are evaluated together by ``LocalRuleMatcher``;
+    ``check`` builds a matcher for the single rule when used on its own.
+    """
+    
+    # Which index of LocalRuleMatcher the rule is looked up in
+    kind = ""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._matcher = None
+    
+    def leaves(self) -> List["PatternRule"]:
+        """Get the pattern rules this rule depends on."""
+        return [self]
+    
+    def evaluate(self, matched: Callable[["PatternRule"], bool]) -> bool:
+        """Evaluate the rule from per-pattern match results."""
+        return matched(self)
+    
+    def check(self, post: Dict) -> bool:
+        """Check if the post matches this rule."""
+        if self._matcher is None:
+            self._matcher = LocalRuleMatcher([self])
+        return self._matcher.check_post(post)[0]
+    
+    def get_description(self) -> str:
+        """Get rule description."""
+        return self.name
+
+
+def _string_list(values, kind: str) -> List[str]:
+    """Get a rule's values as a list, wrapping a lone string.
+    
+    Raises:
+        ValueError: If the values are not a string or a list of strings
+    """
+    if isinstance(values, str):
+        return [values]
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise ValueError(f"{kind} rule values must be a list of strings, got {values!r}")
+    return values
+
+
+def _clean(values: List[str], strip: str, kind: str) -> List[str]:
+    cleaned = [value.strip().lstrip(strip).lower() for value in values if value.strip().lstrip(strip)]
+    if not cleaned:
+        raise ValueError(f"{kind} rule needs at least one value")
+    return cleaned
+
+
+class ForbiddenWordsRule(PatternRule):
+    """Rule that checks for specific forbidden words.
+    
+    A word matches where it appears between spaces (or the ends) of the
+    lowercased content; it is a local rule evaluated by ``LocalRuleMatcher``.
+    """
+    
+    kind = "word"
     
     def __init__(self, forbidden_words: List[str]):
         """Initialize with a list of forbidden words.
@@ -35,51 +109,336 @@ class ForbiddenWordsRule:
         Args:
             forbidden_words: List of words that are not allowed
         """
-        self.forbidden_words = [word.lower() for word in forbidden_words]
+        self.forbidden_words = [word.lower() for word in _string_list(forbidden_words, "Forbidden words")]
+        super().__init__(f"Used forbidden word ({'/'.join(self.forbidden_words)})")
+        # Words split like the content, so matching on tokens equals the space-padded substring test
+        self.phrases = [tuple(word.split(" ")) for word in self.forbidden_words]
+
+
+class RegexRule(PatternRule):
+    """Rule matching an arbitrary regular expression."""
     
-    def check(self, post: Dict) -> bool:
-        """Check if post contains forbidden words."""
-        content_lower = post.get("content", "").lower()
-        return any(f' {word} ' in f' {content_lower} ' for word in self.forbidden_words)
+    kind = "regex"
     
-    def get_description(self) -> str:
-        """Get rule description."""
-        return f"Used forbidden word ({'/'.join(self.forbidden_words)})"
+    def __init__(self, pattern: str, name: str | None = None, ignore_case: bool = True):
+        """Initialize the regex rule.
+        
+        Raises:
+            ValueError: If the expression does not compile
+        """
+        if not isinstance(pattern, str):
+            raise ValueError(f"Regex rule pattern must be a string, got {pattern!r}")
+        super().__init__(name or f"Matched pattern ({pattern})")
+        try:
+            self.regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern {pattern!r}: {e}") from e
+
+
+class PhraseRule(PatternRule):
+    """Rule matching phrases as consecutive words, ignoring case and punctuation."""
+    
+    kind = "phrase"
+    
+    def __init__(self, phrases: List[str], name: str | None = None):
+        phrases = _string_list(phrases, "Phrase")
+        super().__init__(name or f"Used forbidden phrase ({'/'.join(phrases)})")
+        self.phrases = [tuple(_WORD.findall(phrase.lower())) for phrase in _clean(phrases, "", "Phrase")]
+        if not all(self.phrases):
+            raise ValueError("Phrases must contain at least one word")
+
+
+class DomainRule(PatternRule):
+    """Rule matching links to domains or any of their subdomains."""
+    
+    kind = "domain"
+    
+    def __init__(self, domains: List[str], name: str | None = None):
+        domains = _string_list(domains, "Domain")
+        super().__init__(name or f"Linked to domain ({'/'.join(domains)})")
+        self.values = [domain.strip(".") for domain in _clean(domains, "", "Domain")]
+
+
+class MentionRule(PatternRule):
+    """Rule matching @-mentions of the given usernames."""
+    
+    kind = "mention"
+    
+    def __init__(self, usernames: List[str], name: str | None = None):
+        usernames = _string_list(usernames, "Mention")
+        super().__init__(name or f"Mentioned ({'/'.join('@' + u.lstrip('@') for u in usernames)})")
+        self.values = _clean(usernames, "@", "Mention")
+
+
+class HashtagRule(PatternRule):
+    """Rule matching the given hashtags."""
+    
+    kind = "hashtag"
+    
+    def __init__(self, tags: List[str], name: str | None = None):
+        tags = _string_list(tags, "Hashtag")
+        super().__init__(name or f"Used hashtag ({'/'.join('#' + t.lstrip('#') for t in tags)})")
+        self.values = _clean(tags, "#", "Hashtag")
+
+
+class AllOfRule:
+    """Local rule violated when all of its child rules are."""
+    
+    def __init__(self, rules: List, name: str | None = None):
+        if not rules:
+            raise ValueError("Combined rule needs at least one child rule")
+        self.rules = rules
+        self.name = name or " AND ".join(rule.get_description() for rule in rules)
+        self._matcher = None
+    
+    def leaves(self) -> List[PatternRule]:
+        """Get the pattern rules this rule depends on."""
+        return [leaf for rule in self.rules for leaf in rule.leaves()]
+    
+    def evaluate(self, matched: Callable[[PatternRule], bool]) -> bool:
+        """Evaluate the rule from per-pattern match results."""
+        return all(rule.evaluate(matched) for rule in self.rules)
+    
+    check = PatternRule.check
+    get_description = PatternRule.get_description
+
+
+class AnyOfRule(AllOfRule):
+    """Local rule violated when any of its child rules is."""
+    
+    def __init__(self, rules: List, name: str | None = None):
+        super().__init__(rules, name or " OR ".join(rule.get_description() for rule in rules))
+    
+    def evaluate(self, matched: Callable[[PatternRule], bool]) -> bool:
+        """Evaluate the rule from per-pattern match results."""
+        return any(rule.evaluate(matched) for rule in self.rules)
+
+
+class NotRule(AllOfRule):
+    """Local rule violated when its child rule is not."""
+    
+    def __init__(self, rule, name: str | None = None):
+        super().__init__([rule], name or f"NOT ({rule.get_description()})")
+    
+    def evaluate(self, matched: Callable[[PatternRule], bool]) -> bool:
+        """Evaluate the rule from per-pattern match results."""
+        return not self.rules[0].evaluate(matched)
+
+
+def is_local_rule(rule) -> bool:
+    """Check if a rule can be evaluated by ``LocalRuleMatcher``."""
+    return isinstance(rule, (PatternRule, AllOfRule))
+
+
+class LocalRuleMatcher:
+    """Evaluates a set of local rules with one pass over the post content.
+    
+    Phrases, forbidden words, domains, mentions and hashtags of all rules are
+    merged into hash indexes. The lowercased content is tokenized once per token kind and each
+    token is looked up, attributing every hit to the rules it came from, so
+    the cost does not grow with the number of rules. Arbitrary regex rules cannot be
+    merged this way; they are searched only when a rule still needs them.
+    """
+    
+    # Largest index still prefiltered with one substring check per entry
+    SUBSTRING_PREFILTER_MAX = 32
+    
+    def __init__(self, rules: List):
+        """Initialize the matcher.
+        
+        Args:
+            rules: Local rules (see ``is_local_rule``)
+        """
+        self.rules = rules
+        self._phrases: Dict[str, List[tuple]] = {}
+        self._words: Dict[str, List[tuple]] = {}
+        self._values: Dict[str, Dict[str, List[PatternRule]]] = {
+            "domain": {}, "mention": {}, "hashtag": {},
+        }
+        for rule in rules:
+            for leaf in rule.leaves():
+                if leaf.kind in ("phrase", "word"):
+                    index = self._phrases if leaf.kind == "phrase" else self._words
+                    for words in leaf.phrases:
+                        index.setdefault(words[0], []).append((words, leaf))
+                elif leaf.kind in self._values:
+                    for value in leaf.values:
+                        self._values[leaf.kind].setdefault(value, []).append(leaf)
+    
+    def _phrase_hits(self, index: Dict[str, List[tuple]], words: List[str], hits: set) -> None:
+        """Add the phrases of an index found as consecutive words."""
+        if index.keys().isdisjoint(words):
+            return
+        for i, word in enumerate(words):
+            for phrase, leaf in index.get(word, ()):
+                if tuple(words[i:i + len(phrase)]) == phrase:
+                    hits.add(id(leaf))
+    
+    def _prefilter(self, index: Dict, text: str) -> bool:
+        """Check if the text may contain an entry of an index."""
+        # For small indexes, substring checks skip tokenizing posts that cannot match
+        return bool(index) and (len(index) > self.SUBSTRING_PREFILTER_MAX or any(key in text for key in index))
+    
+    def _hits(self, content: str) -> set:
+        """Get the ids of all non-regex patterns found in the content."""
+        hits = set()
+        text = content.lower()
+        
+        if self._prefilter(self._phrases, text):
+            self._phrase_hits(self._phrases, _WORD.findall(text), hits)
+        # Forbidden words are delimited by single spaces only, like ForbiddenWordsRule always was
+        if self._prefilter(self._words, text):
+            self._phrase_hits(self._words, text.split(" "), hits)
+        
+        mentions, hashtags, domains = self._values["mention"], self._values["hashtag"], self._values["domain"]
+        if mentions and "@" in text:
+            for user in _MENTION.findall(text):
+                hits.update(id(leaf) for leaf in mentions.get(user, ()))
+        if hashtags and "#" in text:
+            for tag in _HASHTAG.findall(text):
+                hits.update(id(leaf) for leaf in hashtags.get(tag, ()))
+        if self._prefilter(domains, text):
+            for host in _HOST.findall(text):
+                # The host itself or any parent domain
+                parts = host.split(".")
+                for i in range(len(parts) - 1):
+                    hits.update(id(leaf) for leaf in domains.get(".".join(parts[i:]), ()))
+        return hits
+    
+    def check_post(self, post: Dict) -> List[bool]:
+        """Evaluate every rule against a post.
+        
+        Args:
+            post: Post dictionary to check
+            
+        Returns:
+            One violated flag per rule, in rule order
+        """
+        content = post.get("content", "")
+        hits = self._hits(content)
+        regex_results: Dict[int, bool] = {}
+        
+        def matched(leaf: PatternRule) -> bool:
+            if leaf.kind != "regex":
+                return id(leaf) in hits
+            key = id(leaf)
+            if key not in regex_results:
+                regex_results[key] = leaf.regex.search(content) is not None
+            return regex_results[key]
+        
+        return [rule.evaluate(matched) for rule in self.rules]
+
+
+_PATTERN_RULE_TYPES = {
+    "regex": lambda spec: RegexRule(spec["pattern"], spec.get("name"), spec.get("ignore_case", True)),
+    "phrase": lambda spec: PhraseRule(spec.get("phrases") or [spec["phrase"]], spec.get("name")),
+    "domain": lambda spec: DomainRule(spec.get("domains") or [spec["domain"]], spec.get("name")),
+    "mention": lambda spec: MentionRule(spec.get("users") or [spec["user"]], spec.get("name")),
+    "hashtag": lambda spec: HashtagRule(spec.get("tags") or [spec["tag"]], spec.get("name")),
+}
+
+
+def build_local_rule(spec: Dict):
+    """Build a local rule from its JSON specification.
+    
+    Leaf types are ``regex`` (``pattern``, optional ``ignore_case``),
+    ``phrase`` (``phrases``), ``domain`` (``domains``), ``mention``
+    (``users``) and ``hashtag`` (``tags``). They combine with ``all`` and
+    ``any`` (``rules``) and ``not`` (``rule``). Every type takes an optional
+    ``name``, used as the recorded rule description.
+    
+    Args:
+        spec: Rule specification, e.g.
+            {"type": "all", "name": "Shill", "rules": [{"type": "domain", "domains": ["pump.fun"]},
+             {"type": "phrase", "phrases": ["buy now"]}]}
+        
+    Returns:
+        Local rule object
+        
+    Raises:
+        ValueError: If the specification is invalid
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"Local rule must be an object, got {type(spec).__name__}")
+    rule_type = spec.get("type")
+    try:
+        if rule_type in _PATTERN_RULE_TYPES:
+            return _PATTERN_RULE_TYPES[rule_type](spec)
+        if rule_type == "all":
+            return AllOfRule([build_local_rule(child) for child in spec["rules"]], spec.get("name"))
+        if rule_type == "any":
+            return AnyOfRule([build_local_rule(child) for child in spec["rules"]], spec.get("name"))
+        if rule_type == "not":
+            return NotRule(build_local_rule(spec["rule"]), spec.get("name"))
+    except KeyError as e:
+        raise ValueError(f"Local rule of type '{rule_type}' is missing field {e}") from e
+    raise ValueError(f"Unknown local rule type: {rule_type!r}")
 
 
 class LLMBasedRule:
-    """Rule that uses LLM to detect violations based on custom criteria."""
+    """Rule that uses LLM to detect violations based on custom criteria.
+    
+    With a verdict index, a post nearly identical to one already judged
+    under the same rule name and description gets that verdict without an
+    LLM call, and ``on_reuse`` is told where the verdict came from. Prompts
+    are built by ``llm_prompt``: a system message shared by all rules, then
+    the rule, then the normalized cast text.
+    """
     
-    def __init__(self, agent: BaseAgent, rule_description: str, rule_name: str):
+    def __init__(self, agent: BaseAgent, rule_description: str, rule_name: str,
+                 verdict_index: NearDuplicateIndex | None = None,
+                 on_reuse: Callable[[Dict, str, VerdictMatch], None] | None = None,
+                 cast_token_budget: int | None = None):
         """Initialize LLM-based rule.
         
         Args:
             agent: BaseAgent instance for LLM calls
             rule_description: Description of what constitutes a violation
             rule_name: Short name for this rule
+            verdict_index: Index of recent verdicts to reuse for near-duplicates
+            on_reuse: Called with (post, rule_name, match) when a verdict is reused
+            cast_token_budget: Estimated tokens of cast text sent per check
+                (0 = no limit). If None, reads from settings.
         """
         self.agent = agent
         self.rule_description = rule_description
         self.rule_name = rule_name
+        self.verdict_index = verdict_index
+        self.on_reuse = on_reuse
+        self.cast_token_budget = cast_token_budget if cast_token_budget is not None else get_llm_cast_token_budget()
+        self._rule_prompt = rule_prompt(rule_description)
+        # Rules with the same name and description share verdicts
+        self.verdict_scope = (rule_name, rule_description)
     
     def check(self, post: Dict) -> bool:
         """Check if post violates the rule using LLM."""
-        messages = [
-            {
-                "role": "system",
-                "content": f"""You are a content moderator. Analyze if the following post violates this rule:
-{self.rule_description}
-
-Respond with a JSON object: {{"violates": true/false, "reason": "brief explanation"}}"""
-            },
-            {
-                "role": "user",
-                "content": f"Post content: {post.get('content', '')}"
-            }
-        ]
+        content = post.get("content", "")
+        fingerprint = None
+        if self.verdict_index is not None and content.strip():
+            fingerprint = simhash(content)
+            # Casts with different negations never share a verdict
+            scope = (self.verdict_scope, negations(content))
+            match = self.verdict_index.lookup(scope, fingerprint)
+            if match is not None:
+                logger.debug("Reusing near-duplicate verdict", extra={
+                    "post_id": post.get("post_id"),
+                    "source_post_id": match.source_post_id,
+                    "distance": match.distance,
+                    "rule": self.rule_name,
+                })
+                if self.on_reuse is not None:
+                    self.on_reuse(post, self.rule_name, match)
+                return match.violates
         
-        result = self.agent.safe_llm_json(messages, fallback={"violates": False})
-        return result.get("violates", False)
+        messages = build_messages(self._rule_prompt, content, self.cast_token_budget)
+        fallback = {"violates": False}
+        result = self.agent.safe_llm_json(messages, fallback=fallback, user_id=post.get("author_id"),
+                                          rule=self.rule_name)
+        violates = result.get("violates", False)
+        # Failed requests return the fallback, which is not a verdict worth reusing
+        if fingerprint is not None and result is not fallback:
+            self.verdict_index.add(scope, fingerprint, bool(violates), post.get("post_id"))
+        return violates
     
     def get_description(self) -> str:
         """Get rule description."""
@@ -98,19 +457,40 @@ class UserRuleSet:
         """
         self.user_id = user_id
         self.rules = rules
+        # Local pattern rules are evaluated together in one pass
+        self._local_rules = [rule for rule in rules if is_local_rule(rule)]
+        self._local_matcher = LocalRuleMatcher(self._local_rules) if self._local_rules else None
     
     def check_post(self, post: Dict) -> List[tuple[bool, str]]:
         """Check a post against all rules for this user.
         
+        Local pattern rules always run; other rules, such as LLM-based ones,
+        are only started while the request deadline, if any, has time left.
+        
         Args:
             post: Post dictionary to check
             
         Returns:
             List of (violated, rule_description) tuples
+            
+        Raises:
+            DeadlineExceeded: The deadline passed before all rules were checked
         """
+        local_results = {}
+        if self._local_matcher is not None:
+            local_results = {
+                id(rule): violated
+                for rule, violated in zip(self._local_rules, self._local_matcher.check_post(post))
+            }
+        
         violations = []
         for rule in self.rules:
-            if rule.check(post):
+            if id(rule) in local_results:
+                violated = local_results[id(rule)]
+            else:
+                check_deadline("checking rule " + rule.get_description())
+                violated = rule.check(post)
+            if violated:
                 violations.append((True, rule.get_description()))
         return violations
 
@@ -130,7 +510,7 @@ class RuleEngine:
             rules: List of Rule objects
         """
         self.user_rules[user_id] = UserRuleSet(user_id, rules)
-        print(f"Added {len(rules)} rules for user {user_id}")
+        logger.debug("Added user rules", extra={"user_id": user_id, "rules": len(rules)})
     
     def get_user_rules(self, user_id: str) -> UserRuleSet | None:
         """Get the rule set for a specific user.
@@ -151,6 +531,9 @@ class RuleEngine:
             
         Returns:
             List of (violated, rule_description) tuples
+            
+        Raises:
+            DeadlineExceeded: The request deadline passed before all rules were checked
         """
         author_id = post.get("author_id")
         if not author_id:
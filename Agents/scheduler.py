@@ -0,0 +1,227 @@
+"""Long-running scheduler that polls each monitored user at an adaptive rate."""
+import heapq
+import itertools
+import random
+import signal
+import threading
+import time
+from typing import Dict, List
+
+from core.components import get_profiler
+from core.llm_scheduler import Priority, llm_priority
+from core.log import get_logger
+from core.settings import (
+    get_scheduler_jitter,
+    get_scheduler_max_interval_s,
+    get_scheduler_min_interval_s,
+    get_scheduler_target_casts_per_poll,
+)
+from monitor import FarcasterMonitor
+
+logger = get_logger("scheduler")
+
+
+class UserPollState:
+    """Polling state for a single monitored user."""
+
+    def __init__(self, user_id: str, interval_s: float, generation: int = 0):
+        """Initialize the poll state.
+
+        Args:
+            user_id: Farcaster user ID (FID as string)
+            interval_s: Initial poll interval in seconds
+            generation: Tags this state's queue entries; a user removed and
+                added again gets a new state with a new generation
+        """
+        self.user_id = user_id
+        self.generation = generation
+        self.interval_s = interval_s
+        self.rate_per_s = 0.0
+        self.last_poll: float | None = None
+        self.seen_post_ids: set[str] | None = None
+        self.polls = 0
+        self.new_casts = 0
+        self.new_violations = 0
+
+
+class AdaptiveScheduler:
+    """Polls every configured user independently with a warm monitor.
+
+    Each user's interval is derived from an exponentially weighted estimate of
+    their posting rate, aiming for ``target_casts_per_poll`` new casts per
+    poll: busy users are polled often, dormant users back off towards
+    ``max_interval_s``. Only casts not seen in the previous poll are run
+    through the rule engine, so repeated polls do not repeat LLM calls.
+    """
+
+    # Weight of the newest observation in the posting rate estimate
+    RATE_SMOOTHING = 0.3
+    # Interval growth factor when a poll finds nothing new
+    IDLE_BACKOFF = 2.0
+
+    def __init__(self, monitor: FarcasterMonitor, days: int = 1,
+                 min_interval_s: float | None = None, max_interval_s: float | None = None,
+                 target_casts_per_poll: float | None = None, jitter: float | None = None):
+        """Initialize the scheduler.
+
+        Args:
+            monitor: Configured FarcasterMonitor, kept warm between polls
+            days: Look-back window of each poll in days
+            min_interval_s: Shortest poll interval. If None, reads from settings.
+            max_interval_s: Longest poll interval. If None, reads from settings.
+            target_casts_per_poll: New casts a poll should find on average
+            jitter: Relative random spread applied to each interval (0.1 = ±10%)
+        """
+        self.monitor = monitor
+        self.days = days
+        self.min_interval_s = min_interval_s if min_interval_s is not None else get_scheduler_min_interval_s()
+        self.max_interval_s = max(self.min_interval_s, max_interval_s if max_interval_s is not None
+                                  else get_scheduler_max_interval_s())
+        self.target_casts_per_poll = (target_casts_per_poll if target_casts_per_poll is not None
+                                      else get_scheduler_target_casts_per_poll())
+        self.jitter = jitter if jitter is not None else get_scheduler_jitter()
+        self.states: Dict[str, UserPollState] = {}
+        # (due, user_id, generation); entries of removed or replaced states are stale
+        self._queue: List[tuple[float, str, int]] = []
+        self._generations = itertools.count(1)
+        # Configured IDs that are not FIDs, warned about once and never polled
+        self.invalid_user_ids: set[str] = set()
+        self._stop = threading.Event()
+
+    def sync_users(self) -> None:
+        """Schedule users added to the rule engine and drop removed ones."""
+        configured = set(self.monitor.rule_engine.user_rules.keys())
+        now = time.monotonic()
+        for user_id in configured - self.states.keys() - self.invalid_user_ids:
+            try:
+                int(user_id)
+            except ValueError:
+                self.invalid_user_ids.add(user_id)
+                logger.warning("Skipping invalid FID", extra={"user_id": user_id})
+                continue
+            state = self.states[user_id] = UserPollState(user_id, self.min_interval_s, next(self._generations))
+            # Spread the first polls so startup does not burst
+            heapq.heappush(self._queue, (now + random.uniform(0, self.min_interval_s * self.jitter),
+                                         user_id, state.generation))
+        for user_id in self.states.keys() - configured:
+            del self.states[user_id]
+        self.invalid_user_ids &= configured
+        # Stale entries are otherwise only dropped when they come due
+        while self._queue and not self._is_current(self._queue[0]):
+            heapq.heappop(self._queue)
+
+    def _is_current(self, entry: tuple[float, str, int]) -> bool:
+        """Check if a queue entry belongs to the user's current poll state."""
+        state = self.states.get(entry[1])
+        return state is not None and state.generation == entry[2]
+
+    def next_interval(self, state: UserPollState) -> float:
+        """Compute the next poll interval from the user's posting rate."""
+        if state.rate_per_s > 0:
+            interval = self.target_casts_per_poll / state.rate_per_s
+        else:
+            interval = state.interval_s * self.IDLE_BACKOFF
+        interval = min(self.max_interval_s, max(self.min_interval_s, interval))
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def poll_user(self, state: UserPollState) -> int:
+        """Fetch a user's casts and evaluate the ones not seen before.
+
+        Args:
+            state: Poll state of the user
+
+        Returns:
+            Number of new violations recorded
+        """
+        now = time.monotonic()
+        casts = self.monitor.farcaster_api.get_user_casts(int(state.user_id), days=self.days)
+        fetched_ids = {cast["post_id"] for cast in casts}
+        if state.seen_post_ids is None:
+            new_casts = casts
+        else:
+            new_casts = [cast for cast in casts if cast["post_id"] not in state.seen_post_ids]
+        # Casts outside the latest fetch cannot reappear, so this stays bounded
+        state.seen_post_ids = fetched_ids
+        self.monitor.store_casts(new_casts)
+
+        # The first poll evaluates the whole look-back window; later polls only new casts
+        new_violations = 0
+        with llm_priority(Priority.BACKFILL if state.polls == 0 else Priority.FRESH):
+            for cast in new_casts:
+                new_violations += self.monitor.process_post(cast)
+
+        if state.last_poll is not None:
+            observed = len(new_casts) / max(1e-6, now - state.last_poll)
+            state.rate_per_s = (self.RATE_SMOOTHING * observed
+                                + (1 - self.RATE_SMOOTHING) * state.rate_per_s)
+        state.last_poll = now
+        state.polls += 1
+        state.new_casts += len(new_casts)
+        state.new_violations += new_violations
+        return new_violations
+
+    def run(self, max_polls: int | None = None) -> Dict[str, int]:
+        """Poll users until stopped.
+
+        Args:
+            max_polls: Stop after this many polls in total (None = run until stopped)
+
+        Returns:
+            Dictionary mapping user_id to new violations found while running
+        """
+        polls = 0
+        logger.info("Scheduler started", extra={
+            "min_interval_s": self.min_interval_s,
+            "max_interval_s": self.max_interval_s,
+            "days": self.days,
+        })
+        while not self._stop.is_set() and (max_polls is None or polls < max_polls):
+            self.sync_users()
+            if not self._queue:
+                self._stop.wait(self.min_interval_s)
+                continue
+
+            due, user_id, _ = self._queue[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                # Wake up early on shutdown, and at least every min interval to pick up new users
+                self._stop.wait(min(delay, self.min_interval_s))
+                continue
+            entry = heapq.heappop(self._queue)
+            if not self._is_current(entry):
+                continue
+            state = self.states[user_id]
+
+            try:
+                with get_profiler().profile("poll"):
+                    new_violations = self.poll_user(state)
+            except Exception as e:
+                new_violations = 0
+                state.rate_per_s *= 1 - self.RATE_SMOOTHING
+                logger.error("Poll failed", extra={"user_id": user_id, "error": str(e)})
+            polls += 1
+
+            state.interval_s = self.next_interval(state)
+            heapq.heappush(self._queue, (time.monotonic() + state.interval_s, user_id, state.generation))
+            logger.info("Polled user", extra={
+                "user_id": user_id,
+                "new_violations": new_violations,
+                "rate_per_hour": round(state.rate_per_s * 3600, 2),
+                "next_poll_s": round(state.interval_s, 1),
+            })
+
+        logger.info("Scheduler stopped", extra={"polls": polls})
+        return {user_id: state.new_violations for user_id, state in self.states.items()}
+
+    def stop(self) -> None:
+        """Ask the run loop to exit after the current poll."""
+        self._stop.set()
+
+    def install_signal_handlers(self) -> None:
+        """Stop gracefully on SIGINT and SIGTERM."""
+        def handle(signum, frame):
+            logger.info("Shutdown signal received", extra={"signal": signum})
+            self.stop()
+
+        signal.signal(signal.SIGINT, handle)
+        signal.signal(signal.SIGTERM, handle)
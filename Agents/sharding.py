@@ -0,0 +1,230 @@
+"""Multi-process sharded monitoring with a single database writer.
+
+Configured users are split across worker processes with a consistent hash
+ring. Workers fetch casts and run the rule engine; instead of writing to
+SQLite themselves they send violation rows to the coordinator, where a
+single ``ViolationWriter`` thread group-commits them to ``ViolationsDatabase``.
+"""
+import bisect
+import hashlib
+import multiprocessing
+import queue
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Dict, List
+
+from core.components import get_database, get_profiler, get_token_ledger
+from core.log import get_logger
+from core.settings import get_shard_processes, get_writer_batch_size, get_writer_flush_interval_s
+from database.violations_db import ViolationsDatabase
+from database.writer import ViolationWriter
+
+logger = get_logger("sharding")
+
+# Message kinds sent from workers to the coordinator
+_VIOLATION = "violation"
+_VERDICT_REUSE = "verdict_reuse"
+_USER_DONE = "user_done"
+_WORKER_DONE = "worker_done"
+_TOKEN_USAGE = "token_usage"
+
+
+class ConsistentHashRing:
+    """Consistent hash ring mapping keys to shard numbers."""
+
+    def __init__(self, shards: int, replicas: int = 64):
+        """Initialize the ring.
+
+        Args:
+            shards: Number of shards
+            replicas: Virtual nodes per shard, smoothing the distribution
+        """
+        self.shards = shards
+        points = []
+        for shard in range(shards):
+            for replica in range(replicas):
+                points.append((self._hash(f"shard-{shard}#{replica}"), shard))
+        points.sort()
+        self._hashes = [h for h, _ in points]
+        self._shards = [s for _, s in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def shard_for(self, key: str) -> int:
+        """Get the shard owning a key."""
+        idx = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._shards[idx]
+
+    def assign(self, keys: List[str]) -> Dict[int, List[str]]:
+        """Group keys by owning shard."""
+        groups: Dict[int, List[str]] = defaultdict(list)
+        for key in keys:
+            groups[self.shard_for(key)].append(key)
+        return dict(groups)
+
+
+class QueuedViolationSink:
+    """Stand-in for ViolationsDatabase inside workers; forwards rows to the writer."""
+
+    def __init__(self, out_queue):
+        self.out_queue = out_queue
+
+    def add_violation(self, post_id: str, author_id: str, rule: str, timestamp: str, content: str) -> bool:
+        """Queue a violation for the coordinator's writer.
+
+        Returns:
+            True, as the row was queued; whether it is new is decided by the writer
+        """
+        self.out_queue.put((_VIOLATION, (post_id, author_id, rule, timestamp, (content or "")[:200])))
+        return True
+    
+    def record_verdict_reuse(self, **reuse) -> bool:
+        """Forward a near-duplicate verdict reuse record to the coordinator."""
+        self.out_queue.put((_VERDICT_REUSE, reuse))
+        return False
+
+
+def _shard_worker(shard: int, user_specs: Dict[str, Dict], days: int, out_queue) -> None:
+    """Monitor one shard of users in a worker process."""
+    from monitor import FarcasterMonitor
+
+    try:
+        monitor = FarcasterMonitor()
+        monitor.database = QueuedViolationSink(out_queue)
+        for user_id, spec in user_specs.items():
+            monitor.add_user_with_rules(user_id=user_id, **spec)
+    except Exception as e:
+        logger.exception("Shard worker failed to start", extra={"shard": shard})
+        for user_id in user_specs:
+            out_queue.put((_USER_DONE, (user_id, 0, str(e))))
+        out_queue.put((_WORKER_DONE, shard))
+        return
+
+    # Per user: violations queued for the writer (the sink counts every row it queues)
+    queued: Dict[str, int] = {}
+    errors: Dict[str, str] = {}
+    try:
+        # Fetches the whole shard with bulk feed requests
+        with get_profiler().profile(f"shard-{shard}"):
+            queued = monitor.monitor_all_users(days=days, errors=errors)
+        for user_id in user_specs.keys() - queued.keys():
+            errors[user_id] = f"invalid FID: {user_id}"
+    except Exception as e:
+        logger.exception("Shard sweep failed", extra={"shard": shard})
+        errors = {user_id: str(e) for user_id in user_specs}
+    for user_id in user_specs:
+        out_queue.put((_USER_DONE, (user_id, queued.get(user_id, 0), errors.get(user_id))))
+    # Spawned workers start with an empty ledger, so this is the shard's own usage
+    out_queue.put((_TOKEN_USAGE, get_token_ledger().entries()))
+    out_queue.put((_WORKER_DONE, shard))
+
+
+class ShardedMonitor:
+    """Coordinator running FarcasterMonitor sweeps across worker processes."""
+
+    def __init__(self, user_specs: Dict[str, Dict], processes: int | None = None,
+                 database: ViolationsDatabase | None = None, batch_size: int | None = None,
+                 flush_interval_s: float | None = None):
+        """Initialize the coordinator.
+
+        Args:
+            user_specs: Rule specs per user, as kept in FarcasterMonitor.user_specs
+            processes: Number of worker processes. If None, reads from settings.
+            database: Database the writer commits to. If None, uses the default.
+            batch_size: Maximum rows per commit. If None, reads from settings.
+            flush_interval_s: Maximum age of a pending row. If None, reads from settings.
+        """
+        self.user_specs = user_specs
+        self.processes = max(1, processes or get_shard_processes())
+        self.database = database or get_database()
+        self.batch_size = batch_size or get_writer_batch_size()
+        self.flush_interval_s = flush_interval_s if flush_interval_s is not None else get_writer_flush_interval_s()
+        self.ring = ConsistentHashRing(self.processes)
+        # Outcome of the last sweep: violations queued per user (new or not)
+        # and the first error of each user whose sweep failed
+        self.queued: Dict[str, int] = {}
+        self.errors: Dict[str, str] = {}
+
+    def monitor_all_users(self, days: int = 7) -> Dict[str, int]:
+        """Monitor all configured users across worker processes.
+
+        Args:
+            days: Number of days to look back
+
+        Returns:
+            Dictionary mapping user_id to new violation count; ``queued`` and
+            ``errors`` hold the rest of the sweep's outcome
+        """
+        assignments = self.ring.assign(list(self.user_specs.keys()))
+        # Spawned workers start with fresh logging and no inherited threads
+        ctx = multiprocessing.get_context("spawn")
+        out_queue = ctx.Queue()
+        workers = []
+        for shard, user_ids in assignments.items():
+            specs = {user_id: self.user_specs[user_id] for user_id in user_ids}
+            process = ctx.Process(target=_shard_worker, args=(shard, specs, days, out_queue),
+                                  name=f"monitor-shard-{shard}", daemon=True)
+            process.start()
+            workers.append(process)
+        logger.info("Sharded sweep started", extra={
+            "shards": len(workers),
+            "users": len(self.user_specs),
+        })
+
+        results = {user_id: 0 for user_id in self.user_specs}
+        self._drain(out_queue, len(workers), workers, results)
+        for process in workers:
+            process.join()
+        logger.info("Sharded sweep finished", extra={
+            "users": len(results),
+            "queued_violations": sum(self.queued.values()),
+            "new_violations": sum(results.values()),
+            "failed_users": len(self.errors),
+        })
+        return results
+
+    def _drain(self, out_queue, worker_count: int, workers, results: Dict[str, int]) -> None:
+        """Collect messages from workers and hand violation rows to the writer."""
+        self.queued = {}
+        self.errors = {}
+        writer = ViolationWriter(self.database, self.batch_size, self.flush_interval_s)
+        submitted: List[tuple[str, Future]] = []
+        finished = 0
+        try:
+            while finished < worker_count:
+                try:
+                    kind, payload = out_queue.get(timeout=1.0)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in workers):
+                        # A worker died without reporting; do not wait forever
+                        logger.error("Shard workers exited without reporting")
+                        break
+                    continue
+
+                if kind == _VIOLATION:
+                    try:
+                        row = self.database.encode_row(payload)
+                    except ValueError as e:
+                        logger.warning("Violation row rejected", extra={"post_id": payload[0], "error": str(e)})
+                        continue
+                    submitted.append((payload[1], writer.submit(row)))
+                elif kind == _VERDICT_REUSE:
+                    self.database.record_verdict_reuse(**payload)
+                elif kind == _TOKEN_USAGE:
+                    get_token_ledger().merge(payload)
+                elif kind == _USER_DONE:
+                    user_id, queued, error = payload
+                    self.queued[user_id] = queued
+                    if error:
+                        self.errors[user_id] = error
+                        logger.warning("User monitoring failed", extra={"user_id": user_id, "error": error})
+                elif kind == _WORKER_DONE:
+                    finished += 1
+        finally:
+            writer.stop()
+
+        for author_id, future in submitted:
+            if author_id in results and not future.exception() and future.result():
+                results[author_id] += 1
@@ -0,0 +1,17 @@
+"""Shared test setup: import path, placeholder credentials and scratch databases."""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("NEYNAR_API_KEY", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    """Path of a scratch SQLite database."""
+    return str(tmp_path / "violations.db")
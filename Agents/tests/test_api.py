@@ -0,0 +1,115 @@
+"""REST API routes, through the Flask test client."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    # Routes build the database and monitor on first use, from these settings
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_PATH", str(tmp_path_factory.mktemp("api") / "violations.db"))
+        mp.setenv("VIOLATION_WRITER_ENABLED", "false")
+        from api import server
+        yield server
+        from core.components import reset_components
+        reset_components()
+
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
+
+
+def test_llm_usage_failure_answers_500_with_the_error(server, client, monkeypatch):
+    def fail(request_data):
+        raise RuntimeError("ledger unavailable")
+
+    monkeypatch.setattr(server.api, "process_request", fail)
+    response = client.get("/api/llm/usage?user_ids=1,2")
+    assert response.status_code == 500
+    assert response.get_json() == {"success": False, "error": "ledger unavailable"}
+
+
+def test_llm_usage_reports_totals(client):
+    response = client.get("/api/llm/usage")
+    assert response.status_code == 200
+    assert response.get_json()["success"] is True
+
+
+def add_violation(server, post_id, author_id, content="buy now"):
+    assert server.api.database.add_violation(post_id, author_id, "Spam", "2026-10-01T12:00:00Z", content)
+
+
+def test_unchanged_violations_answer_304_until_a_write(server, client):
+    add_violation(server, "0xetag1", "501")
+    first = client.get("/api/violations/all")
+    assert first.status_code == 200 and first.headers["ETag"]
+
+    cached = client.get("/api/violations/all", headers={"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+    assert cached.data == b""
+    assert cached.headers["ETag"] == first.headers["ETag"]
+
+    add_violation(server, "0xetag2", "502")
+    changed = client.get("/api/violations/all", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != first.headers["ETag"]
+
+
+def test_per_user_etag_ignores_other_users_writes(server, client):
+    add_violation(server, "0xetag3", "503")
+    first = client.get("/api/violations?user_ids=503")
+    assert first.status_code == 200
+
+    add_violation(server, "0xetag4", "504")
+    cached = client.get("/api/violations?user_ids=503", headers={"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_compressed_representation_tag_also_answers_304(server, client):
+    for i in range(20):
+        add_violation(server, f"0xgzip{i}", "505", content="x" * 150)
+    first = client.get("/api/violations?user_ids=505", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert first.headers["ETag"].endswith('-gzip"')
+
+    cached = client.get("/api/violations?user_ids=505",
+                        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_failed_read_is_not_tagged(server, client, monkeypatch):
+    add_violation(server, "0xetag5", "506")
+    monkeypatch.setattr(server.api, "process_request", lambda request_data: {"success": False, "error": "busy"})
+    failed = client.get("/api/violations/all")
+    assert failed.status_code == 200 and failed.get_json()["success"] is False
+    assert "ETag" not in failed.headers
+    monkeypatch.undo()
+
+    # A client that cached nothing from the failure gets the data next time
+    recovered = client.get("/api/violations/all")
+    assert recovered.get_json()["success"] is True
+    assert recovered.headers["ETag"]
+
+
+def test_import_opens_no_database(tmp_path):
+    db_path = tmp_path / "violations.db"
+    env = dict(os.environ, DATABASE_PATH=str(db_path), VIOLATION_WRITER_ENABLED="false")
+    subprocess.run([sys.executable, "-c", "import api.server"], env=env, check=True,
+                   cwd=Path(__file__).resolve().parents[1], timeout=60)
+    assert not db_path.exists()
+
+
+def test_retention_is_built_and_started_once(server):
+    retention = server.start_retention()
+    try:
+        assert server.start_retention() is retention
+    finally:
+        server.stop_retention()
+    assert server.start_retention() is not retention
+    server.stop_retention()
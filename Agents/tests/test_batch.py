@@ -0,0 +1,47 @@
+"""JSONL batch mode keeps input order while running requests concurrently."""
+import io
+import json
+import threading
+import time
+
+from api.json_api import process_json_lines
+
+
+class SlowFirstAPI:
+    """API stand-in where earlier requests take longer, so they finish last."""
+
+    def __init__(self, count):
+        self.count = count
+        self.finished = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def process_request(self, request_data):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.02 * (self.count - request_data["n"]))
+        with self._lock:
+            self.running -= 1
+            self.finished.append(request_data["n"])
+        return {"success": request_data["n"] != 3, "n": request_data["n"]}
+
+
+def test_output_follows_input_order_when_completions_finish_out_of_order():
+    api = SlowFirstAPI(count=6)
+    lines = [json.dumps({"action": "get_violations", "n": n}) + "\n" for n in range(6)]
+    lines.insert(2, "\n")
+    lines.insert(4, "{not json\n")
+    output = io.StringIO()
+
+    failures = process_json_lines(lines, output, concurrency=4, api=api)
+
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    # The blank line is skipped; the malformed one gets an error in its place
+    assert [r.get("n") for r in responses] == [0, 1, 2, None, 3, 4, 5]
+    assert responses[3]["error"].startswith("Invalid JSON")
+    # Request 3 reports failure and the malformed line counts too
+    assert failures == 2
+    assert api.finished != sorted(api.finished)
+    assert api.max_running > 1
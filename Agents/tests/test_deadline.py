@@ -0,0 +1,89 @@
+"""Request deadlines cut LLM timeouts and stop rule evaluation."""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.base_agent import BaseAgent
+from core.deadline import DeadlineExceeded, deadline_scope
+from core.models import Post
+from monitor import FarcasterMonitor
+from rules.rule_engine import LLMBasedRule, UserRuleSet
+
+
+class FakeCompletions:
+    """OpenAI ``chat.completions`` stand-in recording each call's timeout."""
+
+    def __init__(self, delay_s=0.0, error=None):
+        self.delay_s = delay_s
+        self.error = error
+        self.timeouts = []
+
+    def create(self, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay_s)
+        if self.error is not None:
+            raise self.error
+        message = SimpleNamespace(content='{"violates": true}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def make_agent(completions) -> BaseAgent:
+    agent = BaseAgent(model="test-model", api_key="test")
+    agent.request_timeout_s = 45.0
+    agent._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return agent
+
+
+def llm_rule(agent, name):
+    return LLMBasedRule(agent=agent, rule_description=name, rule_name=name, cast_token_budget=0)
+
+
+def test_llm_timeout_is_cut_to_the_time_left():
+    completions = FakeCompletions()
+    agent = make_agent(completions)
+    with deadline_scope(2.0):
+        assert agent.safe_llm_json([{"role": "user", "content": "x"}]) == {"violates": True}
+    assert 0 < completions.timeouts[0] <= 2.0
+
+    agent.safe_llm_json([{"role": "user", "content": "x"}])
+    assert completions.timeouts[1] is None
+
+
+def test_retry_delay_past_the_deadline_raises_instead_of_sleeping(monkeypatch):
+    monkeypatch.setattr("core.base_agent.get_fallback_models", lambda: [])
+    agent = make_agent(FakeCompletions(error=ConnectionError("down")))
+    agent.retry_delays_s = [15.0]
+    started = time.monotonic()
+    with deadline_scope(1.0), pytest.raises(DeadlineExceeded):
+        agent.safe_llm_json([{"role": "user", "content": "x"}], fallback={"violates": False})
+    assert time.monotonic() - started < 1.0
+
+
+def test_expired_deadline_stops_rule_evaluation():
+    completions = FakeCompletions(delay_s=0.3)
+    agent = make_agent(completions)
+    rules = UserRuleSet("1", [llm_rule(agent, "First"), llm_rule(agent, "Second")])
+    with deadline_scope(0.2), pytest.raises(DeadlineExceeded):
+        rules.check_post({"post_id": "0x1", "author_id": "1", "content": "gm"})
+    assert len(completions.timeouts) == 1
+
+
+def test_scan_cut_short_reports_unevaluated_casts(db_path):
+    from database.violations_db import ViolationsDatabase
+
+    completions = FakeCompletions(delay_s=0.15)
+    monitor = FarcasterMonitor()
+    monitor.agent = make_agent(completions)
+    monitor.database = ViolationsDatabase(str(db_path), background_writer=False)
+    monitor.rule_engine.add_user_rules("1", [llm_rule(monitor.agent, "Any")])
+    casts = [Post(f"0x{i}", "1", f"cast {i}", "2026-10-01T00:00:00Z") for i in range(10)]
+
+    unevaluated = {}
+    with deadline_scope(0.4):
+        found = monitor.scan_casts(1, casts, unevaluated=unevaluated)
+    checked = len(completions.timeouts)
+    assert 0 < checked < 10
+    assert found == len(monitor.database.get_all_violations())
+    assert len(unevaluated["1"]) == 10 - found
+    assert unevaluated["1"] == [cast.post_id for cast in casts[found:]]
@@ -0,0 +1,56 @@
+"""LLM slot scheduling by priority class and per-user fairness."""
+import threading
+import time
+
+import pytest
+
+from core.llm_scheduler import LLMDeadlineExceeded, LLMScheduler, Priority, llm_priority
+
+
+def wait_until(condition, timeout_s=5.0):
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def grant_order(requests):
+    """Queue (user_id, priority) requests behind a held slot, in order, and record who gets a slot."""
+    scheduler = LLMScheduler(max_concurrency=1)
+    order = []
+
+    def request(user_id, priority):
+        with llm_priority(priority), scheduler.slot(user_id):
+            order.append(user_id)
+
+    with scheduler.slot("holder"):
+        threads = []
+        for queued, (user_id, priority) in enumerate(requests, start=1):
+            thread = threading.Thread(target=request, args=(user_id, priority))
+            thread.start()
+            threads.append(thread)
+            # Enqueue one at a time, so the queue order is the list order
+            wait_until(lambda: scheduler.get_stats()["queued"] == queued)
+    for thread in threads:
+        thread.join(5)
+    return order
+
+
+def test_users_take_turns_within_a_class():
+    order = grant_order([("a", Priority.FRESH)] * 4 + [("b", Priority.FRESH)] * 2 + [("c", Priority.FRESH)])
+    assert order == ["a", "b", "c", "a", "b", "a", "a"]
+
+
+def test_higher_classes_are_served_first():
+    order = grant_order([("batch", Priority.BACKFILL), ("poll", Priority.FRESH), ("user", Priority.INTERACTIVE)])
+    assert order == ["user", "poll", "batch"]
+
+
+def test_waiting_request_gives_up_at_its_deadline():
+    scheduler = LLMScheduler(max_concurrency=1)
+    with scheduler.slot("holder"):
+        with llm_priority(Priority.FRESH, deadline_s=0.05), pytest.raises(LLMDeadlineExceeded):
+            with scheduler.slot("late"):
+                pass
+    stats = scheduler.get_stats()
+    assert stats["queued"] == 0 and stats["classes"]["fresh"]["expired"] == 1
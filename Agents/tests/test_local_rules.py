@@ -0,0 +1,76 @@
+"""Local rule DSL validation and per-rule attribution."""
+import time
+
+import pytest
+
+from core.deadline import deadline_scope
+from rules.rule_engine import ForbiddenWordsRule, PhraseRule, UserRuleSet, build_local_rule
+
+SHILL = {"type": "all", "name": "Shill", "rules": [
+    {"type": "domain", "domains": ["pump.fun"]},
+    {"type": "phrase", "phrases": ["buy now"]},
+]}
+
+
+@pytest.mark.parametrize("spec", [
+    {"type": "phrase", "phrases": ["buy", 3]},
+    {"type": "domain", "domains": {"pump.fun": True}},
+    {"type": "mention", "users": None, "user": 5},
+    {"type": "hashtag", "tags": [["ad"]]},
+    {"type": "regex", "pattern": ["x"]},
+    {"type": "any", "rules": [{"type": "phrase"}]},
+    {"type": "phrase", "phrases": ["  "]},
+    {"type": "nope"},
+    "phrase",
+])
+def test_invalid_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        build_local_rule(spec)
+
+
+@pytest.mark.parametrize("spec, content", [
+    ({"type": "phrase", "phrases": "buy"}, "you should buy"),
+    ({"type": "domain", "domains": "pump.fun"}, "see app.pump.fun/x"),
+    ({"type": "mention", "users": "@alice"}, "hi @alice"),
+    ({"type": "hashtag", "tags": "#ad"}, "great #ad"),
+])
+def test_lone_string_is_one_value_not_characters(spec, content):
+    rule = build_local_rule(spec)
+    assert rule.check({"content": content})
+    # Iterating the string would have matched any single character
+    assert not rule.check({"content": "u s @a #a p"})
+    assert "/" not in rule.get_description()
+
+
+def test_violations_are_attributed_to_the_rules_that_matched():
+    rules = [
+        build_local_rule(SHILL),
+        build_local_rule({"type": "hashtag", "tags": ["ad"], "name": "Undisclosed ad"}),
+        ForbiddenWordsRule(["scam"]),
+        build_local_rule({"type": "not", "name": "No gm", "rule": {"type": "phrase", "phrases": ["gm"]}}),
+    ]
+    rule_set = UserRuleSet("1", rules)
+
+    found = rule_set.check_post({"content": "gm! buy now at https://pump.fun/coin #ad"})
+    assert found == [(True, "Shill"), (True, "Undisclosed ad")]
+
+    found = rule_set.check_post({"content": "this is a scam"})
+    assert found == [(True, "Used forbidden word (scam)"), (True, "No gm")]
+
+
+def test_forbidden_words_keep_space_boundaries():
+    rule = ForbiddenWordsRule(["Scam", "buy now"])
+    assert rule.check({"content": "total SCAM here"})
+    assert rule.check({"content": "please buy now"})
+    assert not rule.check({"content": "scam!"})
+    assert not rule.check({"content": "scammer"})
+    assert not rule.check({"content": "buy  now"})
+    assert rule.get_description() == "Used forbidden word (scam/buy now)"
+
+
+def test_forbidden_words_run_with_other_local_rules_after_the_deadline():
+    rule_set = UserRuleSet("1", [ForbiddenWordsRule(["scam"]), PhraseRule(["rug"])])
+    with deadline_scope(0.001):
+        time.sleep(0.01)
+        found = rule_set.check_post({"content": "scam and rug"})
+    assert found == [(True, "Used forbidden word (scam)"), (True, "Used forbidden phrase (rug)")]
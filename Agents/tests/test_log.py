@@ -0,0 +1,47 @@
+"""Log sampling keeps per-user records and never drops warnings or errors."""
+import io
+import json
+import logging
+
+import pytest
+
+from core.log import ROOT_LOGGER_NAME, SamplingFilter, configure_logging, get_logger, shutdown_logging
+
+
+@pytest.fixture
+def log_output():
+    stream = io.StringIO()
+    configure_logging(level=logging.DEBUG, stream=stream, force=True)
+    yield stream
+    configure_logging(stream=None, force=True)
+
+
+def emitted(stream) -> list:
+    shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_errors_for_200_users_are_all_emitted(log_output):
+    logger = get_logger("test")
+    for fid in range(200):
+        logger.error("Failed to fetch casts", extra={"fid": fid})
+    records = [r for r in emitted(log_output) if r["msg"] == "Failed to fetch casts"]
+    assert sorted(r["fid"] for r in records) == list(range(200))
+
+
+def test_info_summaries_of_different_users_are_not_repeats(log_output):
+    logger = get_logger("test")
+    for fid in range(50):
+        logger.info("User scan complete", extra={"fid": fid, "casts": 3})
+    assert len([r for r in emitted(log_output) if r["msg"] == "User scan complete"]) == 50
+
+
+def test_repeats_for_one_user_are_sampled():
+    sampler = SamplingFilter(burst=2, every=5, window_s=60)
+    logger = logging.getLogger(f"{ROOT_LOGGER_NAME}.sampling")
+    records = [logger.makeRecord(logger.name, logging.INFO, "", 0, "Retrying", (), None,
+                                 extra={"user_id": "7"}) for _ in range(12)]
+    passed = [record for record in records if sampler.filter(record)]
+    # Two of the burst, then the 5th and 10th after it
+    assert len(passed) == 4
+    assert passed[2].suppressed == 4
@@ -0,0 +1,53 @@
+"""Bulk feed scans falling back to per-user fetches."""
+from core.models import Post
+from database.violations_db import ViolationsDatabase
+from monitor import FarcasterMonitor
+
+
+class CountingAgent:
+    """Stand-in for BaseAgent finding a violation in every cast."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def safe_llm_json(self, messages, fallback=None, user_id=None, rule=None):
+        self.calls += 1
+        return {"violates": True}
+
+
+class FlakyFeedApi:
+    """Neynar stand-in whose filtered feed fails after its first page."""
+
+    def __init__(self, casts):
+        self.casts = casts
+        self.user_fetches = []
+
+    def iter_feed_pages(self, fids, days=7, chunk_size=None):
+        yield [cast for cast in self.casts if int(cast.author_id) in fids][:2]
+        raise ConnectionError("feed unavailable")
+
+    def iter_user_casts(self, fid, days=7):
+        self.user_fetches.append(fid)
+        yield from (cast for cast in self.casts if cast.author_id == str(fid))
+
+
+def cast(post_id, author_id):
+    return Post(post_id, author_id, f"cast {post_id}", "2026-10-18T12:00:00Z")
+
+
+def test_failed_feed_falls_back_only_for_casts_not_yet_checked(db_path, monkeypatch):
+    monkeypatch.setenv("NEAR_DUPLICATE_ENABLED", "false")
+    monitor = FarcasterMonitor()
+    monitor.agent = CountingAgent()
+    monitor.database = ViolationsDatabase(str(db_path), background_writer=False)
+    monitor.cast_store = None
+    monitor.farcaster_api = FlakyFeedApi([cast("0x1", "1"), cast("0x2", "1"), cast("0x3", "1"), cast("0x4", "2")])
+    monitor.add_user_with_rules("1", llm_rules=[{"name": "Any", "description": "Everything"}])
+    monitor.add_user_with_rules("2", llm_rules=[{"name": "Any", "description": "Everything"}])
+
+    results = monitor.monitor_all_users(days=1)
+
+    assert results == {"1": 3, "2": 1}
+    assert monitor.agent.calls == 4
+    assert sorted(monitor.farcaster_api.user_fetches) == [1, 2]
+    assert len(monitor.database.get_all_violations()) == 4
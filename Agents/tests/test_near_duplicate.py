@@ -0,0 +1,68 @@
+"""Near-duplicate verdict reuse and non-reuse."""
+import random
+
+from rules.near_duplicate import NearDuplicateIndex, negations, simhash
+from rules.rule_engine import LLMBasedRule
+
+
+class CountingAgent:
+    """Stand-in for BaseAgent answering every check with a fixed verdict."""
+
+    def __init__(self, violates: bool = True):
+        self.violates = violates
+        self.calls = 0
+
+    def safe_llm_json(self, messages, fallback=None, user_id=None, rule=None):
+        self.calls += 1
+        return {"violates": self.violates}
+
+
+def distance(a: str, b: str) -> int:
+    return (simhash(a) ^ simhash(b)).bit_count()
+
+
+def make_rule(agent, index) -> LLMBasedRule:
+    return LLMBasedRule(agent=agent, rule_description="No scam promotion", rule_name="Scam",
+                        verdict_index=index, cast_token_budget=0)
+
+
+def test_spam_copies_with_other_links_and_numbers_reuse_the_verdict():
+    agent = CountingAgent()
+    rule = make_rule(agent, NearDuplicateIndex(max_distance=2, max_entries=100, ttl_s=60))
+    assert rule.check({"post_id": "0x1", "author_id": "1",
+                       "content": "Claim 500 free tokens now at https://a.example/x1 @alice"})
+    assert rule.check({"post_id": "0x2", "author_id": "1",
+                       "content": "Claim 750 free tokens now at https://b.example/y2 @bob"})
+    assert agent.calls == 1
+
+
+def test_negated_variant_is_not_reused():
+    agent = CountingAgent()
+    rule = make_rule(agent, NearDuplicateIndex(max_distance=2, max_entries=100, ttl_s=60))
+    rule.check({"post_id": "0x1", "author_id": "1", "content": "this token is a scam, do not buy"})
+    agent.violates = False
+    assert rule.check({"post_id": "0x2", "author_id": "1", "content": "this token is not a scam, do buy"}) is False
+    assert agent.calls == 2
+
+
+def test_negations_are_part_of_the_key():
+    assert negations("this is not a scam, don't worry") == ("not", "dont")
+    assert negations("this is a scam") == ()
+
+
+def test_reordered_words_are_far_apart():
+    assert distance("this token is a scam, do not buy", "this token is not a scam, do buy") > 2
+
+
+def test_single_word_insertions_rarely_stay_within_default_distance():
+    rng = random.Random(7)
+    vocab = ("this token is a project new drop mint now free claim your airdrop today wallet link "
+             "here best ever moon soon join us gm frens").split()
+    close = 0
+    trials = 300
+    for _ in range(trials):
+        words = [rng.choice(vocab) for _ in range(17)]
+        edited = list(words)
+        edited.insert(rng.randrange(len(words) + 1), rng.choice(["scam", "rug", "fake", "fraud"]))
+        close += distance(" ".join(words), " ".join(edited)) <= 2
+    assert close / trials < 0.05
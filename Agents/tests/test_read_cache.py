@@ -0,0 +1,75 @@
+"""Read responses cached by write generation."""
+import pytest
+
+from api.json_api import MonitoringAPI
+from core.components import get_database, reset_components
+from database.violations_db import ViolationsDatabase
+
+
+@pytest.fixture
+def api(db_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(db_path))
+    monkeypatch.setenv("VIOLATION_WRITER_ENABLED", "false")
+    reset_components()
+    yield MonitoringAPI()
+    reset_components()
+
+
+def count_queries(monkeypatch) -> list:
+    calls = []
+    database = get_database()
+    original = database.get_violations_by_author
+
+    def counted(author_id):
+        calls.append(author_id)
+        return original(author_id)
+
+    monkeypatch.setattr(database, "get_violations_by_author", counted)
+    return calls
+
+
+def read(api, user_id="7"):
+    response = api.process_request({"action": "get_violations", "user_ids": [user_id]})
+    assert response["success"]
+    return [v["post_id"] for v in response["violations_by_user"][user_id]]
+
+
+def test_repeated_read_is_served_from_the_cache(api, monkeypatch):
+    get_database().add_violation("0x1", "7", "Spam", "2026-10-01T00:00:00Z", "x")
+    calls = count_queries(monkeypatch)
+    assert read(api) == ["0x1"]
+    assert read(api) == ["0x1"]
+    assert calls == ["7"]
+
+
+def test_write_makes_the_cached_read_stale(api, monkeypatch):
+    database = get_database()
+    database.add_violation("0x1", "7", "Spam", "2026-10-01T00:00:00Z", "x")
+    calls = count_queries(monkeypatch)
+    assert read(api) == ["0x1"]
+    generation = database.get_write_generation()
+
+    database.add_violation("0x2", "7", "Spam", "2026-10-02T00:00:00Z", "y")
+    assert database.get_write_generation() > generation
+    assert read(api) == ["0x2", "0x1"]
+    assert calls == ["7", "7"]
+
+
+def test_write_by_another_connection_makes_the_cached_read_stale(api, db_path):
+    get_database().add_violation("0x1", "7", "Spam", "2026-10-01T00:00:00Z", "x")
+    assert read(api) == ["0x1"]
+
+    # Another process writing the same file, seen through PRAGMA data_version
+    ViolationsDatabase(str(db_path), background_writer=False).add_violation(
+        "0x2", "7", "Spam", "2026-10-02T00:00:00Z", "y")
+    assert read(api) == ["0x2", "0x1"]
+
+
+def test_duplicate_insert_keeps_the_cache(api, monkeypatch):
+    database = get_database()
+    database.add_violation("0x1", "7", "Spam", "2026-10-01T00:00:00Z", "x")
+    calls = count_queries(monkeypatch)
+    read(api)
+    assert not database.add_violation("0x1", "7", "Spam", "2026-10-01T00:00:00Z", "x")
+    read(api)
+    assert calls == ["7"]
@@ -0,0 +1,52 @@
+"""Retention rollups are not double-counted by later re-scans."""
+from datetime import datetime, timedelta, timezone
+
+from core.models import Post
+from database.cast_store import CastStore
+from database.violations_db import ViolationsDatabase
+from monitor import FarcasterMonitor
+
+
+def iso_days_ago(days: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def total(counts) -> int:
+    return sum(row["count"] for row in counts)
+
+
+def test_rescan_after_retention_does_not_count_rolled_up_violations(tmp_path):
+    monitor = FarcasterMonitor()
+    monitor.database = ViolationsDatabase(str(tmp_path / "violations.db"), background_writer=False)
+    monitor.cast_store = CastStore(str(tmp_path / "casts.db"))
+    monitor.cast_store.add_casts([
+        Post("0xold", "7", "a scam from long ago", iso_days_ago(20)),
+        Post("0xnew", "7", "a recent scam", iso_days_ago(1)),
+    ])
+    monitor.add_user_with_rules("7", forbidden_words=["scam"])
+
+    assert monitor.rescan_all_users(days=None) == {"7": 2}
+    assert monitor.database.apply_retention(retention_days=10) == 1
+    assert total(monitor.database.get_violation_counts()) == 2
+
+    # The stored old cast is still there and matches again
+    assert monitor.rescan_all_users(days=None) == {"7": 0}
+    assert monitor.database.apply_retention(retention_days=10) == 0
+    assert total(monitor.database.get_violation_counts()) == 2
+    assert [v["post_id"] for v in monitor.database.get_all_violations()] == ["0xnew"]
+
+
+def test_writer_batches_skip_rows_before_the_retention_cutoff(db_path):
+    database = ViolationsDatabase(str(db_path), background_writer=False)
+    database.add_violation("0x1", "7", "Spam", iso_days_ago(20), "old")
+    database.apply_retention(retention_days=10)
+
+    assert database.add_violations([
+        ("0x1", "7", "Spam", iso_days_ago(20), "old"),
+        ("0x2", "7", "Spam", iso_days_ago(1), "new"),
+    ]) == [False, True]
+    assert not database.add_violation("0x3", "7", "Spam", iso_days_ago(15), "older than cutoff")
+    # A longer window later does not reopen days already rolled up
+    database.apply_retention(retention_days=30)
+    assert not database.add_violation("0x3", "7", "Spam", iso_days_ago(15), "older than cutoff")
+    assert total(database.get_violation_counts()) == 2
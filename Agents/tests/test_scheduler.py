@@ -0,0 +1,70 @@
+"""Adaptive scheduler queue bookkeeping."""
+from collections import Counter
+from types import SimpleNamespace
+
+from scheduler import AdaptiveScheduler
+
+
+class FakeMonitor:
+    """Monitor stand-in counting polls per user."""
+
+    def __init__(self, user_ids):
+        self.rule_engine = SimpleNamespace(user_rules=dict.fromkeys(user_ids))
+        self.polls = Counter()
+        self.farcaster_api = SimpleNamespace(get_user_casts=self.get_user_casts)
+
+    def get_user_casts(self, fid, days=1):
+        self.polls[str(fid)] += 1
+        return []
+
+    def store_casts(self, casts):
+        return 0
+
+    def process_post(self, post):
+        return 0
+
+
+def make_scheduler(monitor) -> AdaptiveScheduler:
+    return AdaptiveScheduler(monitor, min_interval_s=0.001, max_interval_s=0.001, jitter=0.0)
+
+
+def test_re_added_user_is_polled_once_per_cycle():
+    monitor = FakeMonitor(["1", "2"])
+    scheduler = make_scheduler(monitor)
+    scheduler.sync_users()
+    del monitor.rule_engine.user_rules["1"]
+    scheduler.sync_users()
+    monitor.rule_engine.user_rules["1"] = None
+    scheduler.sync_users()
+
+    assert sorted(user_id for _, user_id, _ in scheduler._queue) == ["1", "2"]
+    scheduler.run(max_polls=40)
+    assert abs(monitor.polls["1"] - monitor.polls["2"]) <= 1
+
+
+def test_stale_entries_are_dropped_when_they_come_due():
+    monitor = FakeMonitor(["1", "2", "3"])
+    scheduler = make_scheduler(monitor)
+    scheduler.sync_users()
+    for _ in range(3):
+        del monitor.rule_engine.user_rules["3"]
+        scheduler.sync_users()
+        monitor.rule_engine.user_rules["3"] = None
+        scheduler.sync_users()
+
+    scheduler.run(max_polls=30)
+    assert monitor.polls == {"1": 10, "2": 10, "3": 10}
+    assert len(scheduler._queue) == 3
+
+
+def test_non_numeric_user_is_skipped_with_one_warning(caplog):
+    monitor = FakeMonitor(["1", "alice"])
+    scheduler = make_scheduler(monitor)
+    scheduler.run(max_polls=10)
+
+    assert monitor.polls == {"1": 10}
+    assert scheduler.invalid_user_ids == {"alice"}
+    assert "alice" not in scheduler.states
+    warnings = [r for r in caplog.records if r.getMessage() == "Skipping invalid FID"]
+    assert [r.user_id for r in warnings] == ["alice"]
+    assert not [r for r in caplog.records if r.getMessage() == "Poll failed"]
@@ -0,0 +1,105 @@
+"""Schema v2 author IDs and the v1 to v2 migration."""
+import sqlite3
+
+import pytest
+
+from database.violations_db import SCHEMA_VERSION, ViolationsDatabase
+
+V1_ROWS = [
+    (1, "0xa", "194", "Spam", "2026-10-01T12:00:00Z", "buy now"),
+    (2, "0xb", "alice.eth", "Spam", "2026-10-02T08:30:00.250Z", "pump it"),
+    (3, "0xc", "bob", "Scam", "2026-10-03T00:00:00+02:00", "free tokens"),
+    (4, "0xd", "007", "Scam", "2026-10-04T10:00:00", "gm"),
+]
+V1_ROLLUPS = [
+    ("2026-09-01", "194", "Spam", 3),
+    ("2026-09-01", "alice.eth", "Spam", 2),
+    ("2026-09-01", "7", "Scam", 1),
+    ("2026-09-01", "007", "Scam", 4),
+]
+
+
+@pytest.fixture
+def v1_path(db_path):
+    con = sqlite3.connect(db_path)
+    con.executescript("""
+        CREATE TABLE violations (
+            id INTEGER PRIMARY KEY,
+            post_id TEXT NOT NULL,
+            author_id TEXT NOT NULL,
+            rule_violated TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            content_snippet TEXT,
+            UNIQUE(post_id, rule_violated)
+        );
+        CREATE TABLE violation_daily_counts (
+            day TEXT NOT NULL,
+            author_id TEXT NOT NULL,
+            rule_violated TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (day, author_id, rule_violated)
+        );
+    """)
+    con.executemany("INSERT INTO violations VALUES (?, ?, ?, ?, ?, ?)", V1_ROWS)
+    con.executemany("INSERT INTO violation_daily_counts VALUES (?, ?, ?, ?)", V1_ROLLUPS)
+    con.commit()
+    con.close()
+    return str(db_path)
+
+
+def test_v1_file_round_trips_through_the_migration(v1_path):
+    database = ViolationsDatabase(v1_path, background_writer=False)
+
+    rows = {row["id"]: row for row in database.get_all_violations()}
+    assert {i: (r["post_id"], r["author_id"], r["rule_violated"], r["content_snippet"]) for i, r in rows.items()} == {
+        1: ("0xa", "194", "Spam", "buy now"),
+        2: ("0xb", "alice.eth", "Spam", "pump it"),
+        3: ("0xc", "bob", "Scam", "free tokens"),
+        4: ("0xd", "7", "Scam", "gm"),
+    }
+    assert [rows[i]["timestamp"] for i in (1, 2, 3, 4)] == [
+        "2026-10-01T12:00:00.000Z",
+        "2026-10-02T08:30:00.250Z",
+        "2026-10-02T22:00:00.000Z",
+        "2026-10-04T10:00:00.000Z",
+    ]
+    # Non-numeric authors are neither dropped nor merged into one another
+    assert [row["post_id"] for row in database.get_violations_by_author("alice.eth")] == ["0xb"]
+    assert [row["post_id"] for row in database.get_violations_by_author("bob")] == ["0xc"]
+    assert database.get_violations_by_author("0") == []
+
+    rollups = {(row["author_id"], row["rule_violated"]): row["count"]
+               for row in database.get_violation_counts(since_day="2026-09-01")
+               if row["day"] == "2026-09-01"}
+    assert rollups == {("194", "Spam"): 3, ("alice.eth", "Spam"): 2, ("7", "Scam"): 5}
+
+    con = sqlite3.connect(v1_path)
+    assert con.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert con.execute("SELECT typeof(author_id), COUNT(*) FROM violations GROUP BY 1 ORDER BY 1").fetchall() == [
+        ("integer", 2), ("text", 2),
+    ]
+    con.close()
+
+    # Opening again does not migrate twice
+    assert len(ViolationsDatabase(v1_path, background_writer=False).get_all_violations()) == 4
+
+
+def test_migration_counts_normalized_author_ids(v1_path, caplog):
+    ViolationsDatabase(v1_path, background_writer=False)
+    warnings = [r for r in caplog.records if r.getMessage().startswith("Violations with numeric author IDs")]
+    assert [r.rows for r in warnings] == [1]
+
+
+def test_any_non_empty_author_id_is_accepted(db_path):
+    database = ViolationsDatabase(str(db_path), background_writer=False)
+    for author_id in ("194", "alice.eth", "user-1", "٣", "inf"):
+        assert database.add_violation(f"0x{author_id}", author_id, "Spam", "2026-10-01T00:00:00Z", "x")
+        assert [row["author_id"] for row in database.get_violations_by_author(author_id)] == [author_id]
+    assert database.get_change_token(["alice.eth"]) != (0, 0)
+
+
+@pytest.mark.parametrize("author_id", ["", "   ", None, "1e3", "3.5", "99999999999999999999", True])
+def test_author_ids_sqlite_would_change_are_rejected(db_path, author_id):
+    database = ViolationsDatabase(str(db_path), background_writer=False)
+    with pytest.raises(ValueError):
+        database.add_violation("0x1", author_id, "Spam", "2026-10-01T00:00:00Z", "x")
@@ -0,0 +1,50 @@
+"""Shard workers report per-user outcomes to the coordinator."""
+import queue
+
+import monitor
+from core.models import Post
+from database.violations_db import ViolationsDatabase
+from sharding import ShardedMonitor, _shard_worker
+
+
+class FeedlessApi:
+    """Neynar stand-in without a bulk feed; fetching user 2 fails."""
+
+    def __init__(self, casts):
+        self.casts = casts
+
+    def iter_feed_pages(self, fids, days=7, chunk_size=None):
+        yield from ()
+        raise ConnectionError("feed unavailable")
+
+    def iter_user_casts(self, fid, days=7):
+        if fid == 2:
+            raise ConnectionError("user 2 unavailable")
+        yield from (cast for cast in self.casts if cast.author_id == str(fid))
+
+
+def test_worker_reports_queued_rows_and_user_errors(db_path, monkeypatch):
+    monkeypatch.setenv("CAST_STORE_ENABLED", "false")
+    casts = [Post(f"0x{i}", "1", "buy spam now", "2026-10-18T12:00:00Z") for i in range(3)]
+
+    class ShardMonitor(monitor.FarcasterMonitor):
+        def __init__(self):
+            super().__init__()
+            self.farcaster_api = FeedlessApi(casts)
+            self.cast_store = None
+
+    monkeypatch.setattr(monitor, "FarcasterMonitor", ShardMonitor)
+    specs = {user_id: {"forbidden_words": ["spam"]} for user_id in ("1", "2", "alice")}
+    out_queue = queue.Queue()
+    _shard_worker(0, specs, 1, out_queue)
+
+    database = ViolationsDatabase(str(db_path), background_writer=False)
+    # Already recorded, so queued again but not new
+    database.add_violation("0x0", "1", "Used forbidden word (spam)", "2026-10-18T12:00:00Z", "buy spam now")
+    sharded = ShardedMonitor(specs, processes=1, database=database, flush_interval_s=0.01)
+    results = {user_id: 0 for user_id in specs}
+    sharded._drain(out_queue, 1, [], results)
+
+    assert sharded.queued == {"1": 3, "2": 0, "alice": 0}
+    assert results == {"1": 2, "2": 0, "alice": 0}
+    assert sharded.errors == {"2": "user 2 unavailable", "alice": "invalid FID: alice"}
@@ -0,0 +1,69 @@
+"""Background writer shutdown and late submits."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from database.violations_db import ViolationsDatabase
+from database.writer import ViolationWriter, WriterClosed
+
+TIMESTAMP = "2025-10-22T15:30:00.000Z"
+
+
+def test_submit_after_stop_is_rejected(db_path):
+    db = ViolationsDatabase(db_path, background_writer=False)
+    writer = ViolationWriter(db, batch_size=10, flush_interval_s=0.01)
+    queued = writer.submit(db.encode_row(("0x1", "1", "Rule", TIMESTAMP, "text")))
+    writer.stop()
+    assert queued.result(timeout=5) is True
+    with pytest.raises(WriterClosed):
+        writer.submit(db.encode_row(("0x2", "1", "Rule", TIMESTAMP, "text")))
+
+
+def test_add_violation_after_stop_writer_inserts_directly(db_path):
+    db = ViolationsDatabase(db_path, background_writer=True)
+    writer = db.writer
+    db.stop_writer()
+    # A caller that read the writer before it was stopped
+    db.writer = writer
+    assert db.add_violation("0x1", "1", "Rule", TIMESTAMP, "text") is True
+    db.writer = None
+    assert len(db.get_violations_by_author("1")) == 1
+
+
+def test_concurrent_inserts_during_stop_all_complete(db_path):
+    db = ViolationsDatabase(db_path, background_writer=True)
+    start = threading.Event()
+
+    def insert(i: int) -> bool:
+        start.wait()
+        return db.add_violation(f"0x{i}", str(i % 5), "Rule", TIMESTAMP, "text")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(insert, i) for i in range(200)]
+        start.set()
+        db.stop_writer()
+        results = [future.result(timeout=10) for future in futures]
+    assert all(results)
+    assert len(db.get_all_violations()) == 200
+
+
+def test_rows_queued_when_writer_fails_are_not_left_pending(db_path):
+    db = ViolationsDatabase(db_path, background_writer=False)
+    ready = threading.Event()
+    release = threading.Event()
+
+    def blocked_connect():
+        ready.set()
+        release.wait()
+        raise OSError("cannot open database")
+
+    db._connect = blocked_connect
+    writer = ViolationWriter(db, batch_size=10, flush_interval_s=0.01)
+    ready.wait()
+    pending = writer.submit(("0x1", 1, "Rule", 0, "text"))
+    release.set()
+    with pytest.raises(WriterClosed):
+        pending.result(timeout=5)
+    with pytest.raises(WriterClosed):
+        writer.submit(("0x2", 1, "Rule", 0, "text"))
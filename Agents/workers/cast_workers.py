@@ -0,0 +1,135 @@
+"""Worker pool evaluating pushed casts against the rule engine."""
+import queue
+import threading
+import time
+from typing import Dict
+
+from core.llm_scheduler import Priority, llm_priority
+from core.log import get_logger
+from core.settings import get_webhook_queue_size, get_webhook_workers
+
+logger = get_logger("workers")
+
+# Sentinel telling a worker thread to exit
+_STOP = object()
+
+
+class CastWorkerPool:
+    """Bounded queue of casts drained by a pool of worker threads.
+
+    Each worker stores the casts it takes off the queue in the cast store
+    and runs ``FarcasterMonitor.process_post`` (rule check plus violation
+    insert) on them.
+    """
+
+    def __init__(self, monitor, workers: int | None = None, max_queue: int | None = None):
+        """Initialize the worker pool.
+
+        Args:
+            monitor: FarcasterMonitor whose rule engine and database are used
+            workers: Number of worker threads. If None, reads from settings.
+            max_queue: Maximum queued casts. If None, reads from settings.
+        """
+        self.monitor = monitor
+        self.workers = max(1, workers or get_webhook_workers())
+        self.queue: queue.Queue = queue.Queue(maxsize=max(1, max_queue or get_webhook_queue_size()))
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.stats = {"queued": 0, "rejected": 0, "processed": 0, "failed": 0, "new_violations": 0}
+
+    def start(self) -> "CastWorkerPool":
+        """Start the worker threads if they are not running yet."""
+        with self._lock:
+            if self._threads:
+                return self
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"cast-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info("Cast worker pool started", extra={"workers": self.workers})
+        return self
+
+    def submit(self, post: Dict) -> bool:
+        """Queue a post for evaluation without blocking.
+
+        Args:
+            post: Post dictionary
+
+        Returns:
+            True if queued, False if the queue is full
+        """
+        try:
+            self.queue.put_nowait((post, time.monotonic()))
+        except queue.Full:
+            self._count("rejected")
+            logger.warning("Cast queue full, rejecting cast", extra={"post_id": post.get("post_id")})
+            return False
+        self._count("queued")
+        return True
+
+    def stop(self, drain: bool = True, timeout: float | None = None) -> None:
+        """Stop the worker threads.
+
+        Args:
+            drain: Process casts already queued before stopping
+            timeout: Maximum seconds to wait for each worker
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+        if not drain:
+            try:
+                while True:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+            except queue.Empty:
+                pass
+        for _ in threads:
+            self.queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+        logger.info("Cast worker pool stopped", extra=dict(self.stats))
+
+    def join(self) -> None:
+        """Block until every queued cast has been processed."""
+        self.queue.join()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get counters and the current queue depth."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["queue_depth"] = self.queue.qsize()
+        stats["workers"] = len(self._threads)
+        return stats
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def _run(self) -> None:
+        # Pushed casts are new, so their LLM requests go ahead of backfill
+        with llm_priority(Priority.FRESH):
+            self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                post, enqueued_at = item
+                try:
+                    self.monitor.store_casts([post])
+                    new_violations = self.monitor.process_post(post)
+                except Exception:
+                    self._count("failed")
+                    logger.exception("Failed to process cast", extra={"post_id": post.get("post_id")})
+                    continue
+                self._count("processed")
+                self._count("new_violations", new_violations)
+                logger.debug("Processed pushed cast", extra={
+                    "post_id": post.get("post_id"),
+                    "new_violations": new_violations,
+                    "latency_s": round(time.monotonic() - enqueued_at, 4),
+                })
+            finally:
+                self.queue.task_done()